@@ -0,0 +1,60 @@
+"""
+Entidade que descreve a estrutura de um processador de imagem.
+"""
+from dataclasses import dataclass, field
+from typing import FrozenSet, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ProcessorDescriptor:
+    """
+    Metadados declarativos de um processador, usados no planejamento
+    (divisão em tiles, fusão, reuso de buffers e paralelismo).
+    
+    Attributes:
+        kind: Categoria da operação ('point', 'linear', 'derivative',
+              'morphological', 'local', 'color', 'global', 'generic')
+        radius: Raio da vizinhança lida por pixel (halo necessário para
+                processar em tiles); 0 para operações pontuais e None se
+                a saída depende da imagem inteira (ex: Otsu, equalização)
+        point_operation: Se cada pixel de saída depende apenas do valor do
+                         mesmo pixel de entrada
+        input_channels: Quantidades de canais aceitas na entrada
+        output_channels: Canais de saída (None = igual à entrada)
+        output_dtype: Tipo dos dados de saída
+        in_place: Se o processador pode escrever no buffer de entrada
+        commutes_with: Categorias com as quais a operação comuta
+                       (a ordem de aplicação não altera o resultado)
+        cost_per_pixel: Custo aproximado em operações por pixel e canal
+    """
+    kind: str = 'generic'
+    radius: Optional[int] = None
+    point_operation: bool = False
+    input_channels: Tuple[int, ...] = (1, 3)
+    output_channels: Optional[int] = None
+    output_dtype: str = 'uint8'
+    in_place: bool = False
+    commutes_with: FrozenSet[str] = field(default_factory=frozenset)
+    cost_per_pixel: float = 1.0
+    
+    def is_tileable(self) -> bool:
+        """Retorna True se pode ser processado em tiles com halo finito."""
+        return self.radius is not None
+    
+    def commutes(self, other: 'ProcessorDescriptor') -> bool:
+        """Retorna True se a ordem entre os dois processadores é indiferente."""
+        return other.kind in self.commutes_with or self.kind in other.commutes_with
+    
+    def channels_for(self, input_channels: int) -> int:
+        """
+        Calcula o número de canais de saída.
+        
+        Args:
+            input_channels: Canais da imagem de entrada
+        
+        Returns:
+            Canais da imagem de saída
+        """
+        if self.output_channels is None:
+            return input_channels
+        return self.output_channels
@@ -3,6 +3,7 @@ Interface para processadores de imagem.
 """
 from abc import ABC, abstractmethod
 from domain.entities.image import Image
+from domain.entities.processor_descriptor import ProcessorDescriptor
 
 
 class ImageProcessorInterface(ABC):
@@ -20,3 +21,34 @@ class ImageProcessorInterface(ABC):
             Imagem processada
         """
         pass
+    
+    def at_scale(self, scale: float) -> 'ImageProcessorInterface':
+        """
+        Retorna um processador equivalente para a imagem reescalada.
+        
+        Processadores com vizinhança (kernels) devem reescalar seus
+        parâmetros para que o preview em resolução reduzida fique
+        visualmente equivalente ao resultado em resolução completa.
+        Por padrão o processador não depende da escala.
+        
+        Args:
+            scale: Fator de escala da imagem (0.25 = um quarto do tamanho)
+            
+        Returns:
+            Processador com parâmetros ajustados
+        """
+        return self
+    
+    def describe(self) -> ProcessorDescriptor:
+        """
+        Descreve estruturalmente o processador.
+        
+        Permite que pipelines planejem divisão em tiles, fusão, reuso de
+        buffers e paralelismo sem tratar cada classe como caso especial.
+        O padrão é conservador: vizinhança desconhecida e sem escrita
+        no buffer de entrada.
+        
+        Returns:
+            Descritor com raio, canais, tipo de saída e custo estimado
+        """
+        return ProcessorDescriptor()
@@ -0,0 +1,212 @@
+"""
+Detecção facial assíncrona para vídeo em tempo real.
+
+Os frames são enviados a uma thread de trabalho (o OpenCV libera o GIL
+durante o cascade). Apenas o frame pendente mais recente é mantido, e
+os consumidores leem sempre o último resultado concluído, sem esperar.
+"""
+
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from infrastructure.face_detection import FaceDetector, FacePoint
+from infrastructure.frame_timing import FrameTimer
+
+
+class FaceDetectionResult:
+    """Resultado de uma detecção concluída."""
+    
+    def __init__(
+        self,
+        faces: List[Tuple[int, int, int, int]],
+        points: np.ndarray,
+        timestamp: float,
+        frame_id: int
+    ):
+        """
+        Inicializa resultado.
+        
+        Args:
+            faces: Retângulos (x, y, w, h) das faces
+            points: Pontos faciais (K, P, 2) int32
+            timestamp: Instante (time.perf_counter) em que o frame foi enviado
+            frame_id: Número sequencial do frame analisado
+        """
+        self.faces = faces
+        self.points = points
+        self.timestamp = timestamp
+        self.frame_id = frame_id
+    
+    @property
+    def age(self) -> float:
+        """Tempo, em segundos, desde o envio do frame analisado."""
+        return time.perf_counter() - self.timestamp
+
+
+class AsyncFaceDetector:
+    """
+    Executa um FaceDetector em uma thread de trabalho.
+    
+    O laço de captura envia cada frame com submit(). detect_faces e
+    detect_with_points têm a mesma assinatura do FaceDetector, de modo que
+    os overlays podem usá-lo diretamente, mas apenas leem o último
+    resultado: nunca bloqueiam nem enviam frames já desenhados.
+    """
+    
+    def __init__(self, detector: Optional[FaceDetector] = None, max_age: float = 0.5):
+        """
+        Inicializa o detector assíncrono.
+        
+        Args:
+            detector: Detector usado pela thread (padrão: com rastreamento)
+            max_age: Idade máxima (s) de um resultado para ainda ser usado
+        """
+        self.detector = detector if detector is not None else FaceDetector(detection_interval=5, eye_interval=10)
+        self.max_age = max_age
+        
+        # Instrumentação opcional (tempo de cada detecção na thread)
+        self.timer: Optional[FrameTimer] = None
+        
+        # Caixa de correio: um frame pendente e o último resultado
+        self._condition = threading.Condition()
+        self._pending: Optional[Tuple[np.ndarray, float, int]] = None
+        self._result: Optional[FaceDetectionResult] = None
+        self._frame_counter = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Inicia a thread de trabalho."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        
+        self._thread = threading.Thread(target=self._run, name="face-detection", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Encerra a thread de trabalho e aguarda o término."""
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._condition.notify_all()
+        
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def submit(self, frame: np.ndarray) -> int:
+        """
+        Envia um frame para detecção, substituindo o pendente (se houver).
+        
+        Args:
+            frame: Imagem BGR
+        
+        Returns:
+            Número sequencial atribuído ao frame
+        """
+        if not self._running:
+            self.start()
+        
+        with self._condition:
+            self._frame_counter += 1
+            self._pending = (frame.copy(), time.perf_counter(), self._frame_counter)
+            self._condition.notify()
+            
+            return self._frame_counter
+    
+    def latest(self) -> Optional[FaceDetectionResult]:
+        """
+        Retorna o último resultado concluído, sem bloquear.
+        
+        Returns:
+            Último resultado ou None se ainda não há nenhum
+        """
+        with self._condition:
+            return self._result
+    
+    def detect_faces(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """
+        Retorna as faces do último resultado disponível.
+        
+        Args:
+            image: Frame atual (não é analisado; mantido por compatibilidade)
+        
+        Returns:
+            Lista de retângulos (x, y, w, h); vazia se o resultado está velho
+        """
+        result = self._recent_result()
+        return result.faces if result is not None else []
+    
+    def detect_with_points(
+        self,
+        image: np.ndarray
+    ) -> List[Tuple[Tuple[int, int, int, int], List[FacePoint]]]:
+        """
+        Retorna faces e pontos do último resultado disponível.
+        
+        Args:
+            image: Frame atual (não é analisado; mantido por compatibilidade)
+        
+        Returns:
+            Lista de tuplas (face_rect, face_points)
+        """
+        result = self._recent_result()
+        if result is None:
+            return []
+        return [
+            (face, self.detector.to_face_points(points))
+            for face, points in zip(result.faces, result.points)
+        ]
+    
+    def detect_with_points_array(self, image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retorna faces e pontos do último resultado disponível como arrays.
+        
+        Args:
+            image: Frame atual (não é analisado; mantido por compatibilidade)
+        
+        Returns:
+            Tupla (faces (K, 4) int32, pontos (K, P, 2) int32)
+        """
+        result = self._recent_result()
+        if result is None:
+            points_count = len(self.detector.FACE_POINT_LAYOUT)
+            return np.zeros((0, 4), dtype=np.int32), np.zeros((0, points_count, 2), dtype=np.int32)
+        return np.asarray(result.faces, dtype=np.int32).reshape(-1, 4), result.points
+    
+    def _recent_result(self) -> Optional[FaceDetectionResult]:
+        """Retorna o último resultado, se recente o bastante."""
+        result = self.latest()
+        
+        if result is None or result.age > self.max_age:
+            return None
+        return result
+    
+    def _run(self):
+        """Laço da thread: processa sempre o frame pendente mais recente."""
+        while True:
+            with self._condition:
+                while self._running and self._pending is None:
+                    self._condition.wait()
+                
+                if not self._running:
+                    return
+                
+                frame, timestamp, frame_id = self._pending
+                self._pending = None
+            
+            start = time.perf_counter_ns()
+            faces = [tuple(int(v) for v in face) for face in self.detector.detect_faces(frame)]
+            points = self.detector.get_face_points_array(frame, faces)
+            
+            if self.timer is not None:
+                self.timer.record("deteccao (thread)", time.perf_counter_ns() - start)
+            result = FaceDetectionResult(faces, points, timestamp, frame_id)
+            
+            with self._condition:
+                self._result = result
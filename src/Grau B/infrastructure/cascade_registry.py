@@ -0,0 +1,118 @@
+"""
+Registro de Haar Cascades compartilhado pelo processo.
+
+Cada cascade é procurado e carregado (parse do XML) apenas na primeira
+vez em que é pedido, normalmente na primeira detecção, e a mesma
+instância é reutilizada por todos os detectores. Abrir um editor não
+paga o carregamento se nenhum efeito facial for ligado.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import cv2
+
+
+class CascadeRegistry:
+    """
+    Carrega Haar Cascades sob demanda e mede o tempo de carregamento.
+    """
+    
+    # Arquivo XML de cada cascade conhecido
+    CASCADE_FILES = {
+        'face': 'haarcascade_frontalface_default.xml',
+        'eye': 'haarcascade_eye.xml',
+    }
+    
+    def __init__(self, search_dirs: Optional[List[str]] = None):
+        """
+        Inicializa o registro (nenhum arquivo é lido aqui).
+        
+        Args:
+            search_dirs: Pastas onde os XML são procurados, em ordem
+                         (padrão: OpenCV instalado via pip e assets/haarcascades)
+        """
+        if search_dirs is None:
+            search_dirs = [
+                # OpenCV instalado via pip
+                getattr(getattr(cv2, 'data', None), 'haarcascades', ''),
+                # Caminho local
+                'assets/haarcascades/',
+            ]
+        self.search_dirs = [directory for directory in search_dirs if directory]
+        
+        self._lock = threading.Lock()
+        self._cascades: Dict[str, Optional['cv2.CascadeClassifier']] = {}
+        
+        # Tempo (s) gasto procurando e carregando cada cascade
+        self.load_times: Dict[str, float] = {}
+    
+    def get(self, name: str) -> Optional['cv2.CascadeClassifier']:
+        """
+        Retorna o cascade, carregando-o no primeiro pedido.
+        
+        Args:
+            name: Nome do cascade ('face' ou 'eye')
+        
+        Returns:
+            Classificador carregado ou None se o XML não foi encontrado
+        """
+        # Caminho rápido, sem lock, depois do primeiro carregamento
+        if name in self._cascades:
+            return self._cascades[name]
+        
+        with self._lock:
+            if name not in self._cascades:
+                self._cascades[name] = self._load(name)
+            return self._cascades[name]
+    
+    def is_loaded(self, name: str) -> bool:
+        """Informa se o cascade já foi procurado (encontrado ou não)."""
+        return name in self._cascades
+    
+    def _load(self, name: str) -> Optional['cv2.CascadeClassifier']:
+        """Procura o XML nas pastas e faz o parse, medindo o tempo."""
+        start = time.perf_counter()
+        cascade = None
+        
+        # Builds do OpenCV sem o módulo objdetect clássico não têm cascades
+        search_dirs = self.search_dirs if hasattr(cv2, 'CascadeClassifier') else []
+        
+        for directory in search_dirs:
+            path = Path(directory) / self.CASCADE_FILES[name]
+            if path.exists():
+                cascade = cv2.CascadeClassifier(str(path))
+                if cascade.empty():
+                    cascade = None
+                    continue
+                break
+        
+        self.load_times[name] = time.perf_counter() - start
+        
+        if cascade is not None:
+            print(f"✅ Haar Cascade carregado: {path} ({self.load_times[name] * 1000:.1f}ms)")
+        elif name == 'face':
+            print("⚠️ Haar Cascade não encontrado. Usando detecção simples.")
+        
+        return cascade
+
+
+_registry: Optional[CascadeRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def cascade_registry() -> CascadeRegistry:
+    """
+    Retorna o registro de cascades do processo (criado no primeiro uso).
+    
+    Returns:
+        Instância compartilhada por todos os detectores
+    """
+    global _registry
+    
+    with _registry_lock:
+        if _registry is None:
+            _registry = CascadeRegistry()
+        return _registry
@@ -0,0 +1,158 @@
+"""
+Serviço de análise facial por frame.
+
+Um único detector é compartilhado por todos os efeitos faciais. A
+detecção roda no máximo uma vez por frame e o resultado (retângulos e
+pontos faciais) fica em cache até o próximo frame.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from infrastructure.async_face_detection import AsyncFaceDetector
+from infrastructure.face_detection import FaceDetector, FacePoint
+from infrastructure.frame_timing import FrameTimer
+
+
+class FaceAnalysisService:
+    """
+    Análise facial compartilhada, com cache por frame.
+    
+    O dono (ex: o editor de webcam) chama begin_frame() uma vez por frame;
+    os efeitos chamam detect_faces / detect_with_points quantas vezes
+    quiserem, com a mesma assinatura do FaceDetector.
+    """
+    
+    def __init__(self, detector: Optional[FaceDetector] = None, asynchronous: bool = False):
+        """
+        Inicializa o serviço.
+        
+        Args:
+            detector: Detector usado (padrão: com rastreamento entre detecções)
+            asynchronous: Se a detecção roda em uma thread de trabalho
+        """
+        self.detector = detector if detector is not None else FaceDetector(detection_interval=5, eye_interval=10)
+        self.async_detector = AsyncFaceDetector(self.detector) if asynchronous else None
+        
+        self.frame_id = 0
+        self._frame: Optional[np.ndarray] = None
+        
+        # Instrumentação opcional (tempo pago pelo frame na análise facial)
+        self._timer: Optional[FrameTimer] = None
+        
+        # Cache do frame atual
+        self._faces: Optional[List[Tuple[int, int, int, int]]] = None
+        self._points: Optional[np.ndarray] = None
+    
+    @property
+    def timer(self) -> Optional[FrameTimer]:
+        """Medidor de tempo (repassado ao detector assíncrono)."""
+        return self._timer
+    
+    @timer.setter
+    def timer(self, timer: Optional[FrameTimer]):
+        self._timer = timer
+        if self.async_detector is not None:
+            self.async_detector.timer = timer
+    
+    def begin_frame(self, frame: np.ndarray) -> int:
+        """
+        Registra um novo frame e invalida o cache.
+        
+        Args:
+            frame: Frame original (antes de filtros e overlays)
+        
+        Returns:
+            Identificador do frame
+        """
+        self.frame_id += 1
+        self._frame = frame
+        self._faces = None
+        self._points = None
+        
+        if self.async_detector is not None:
+            self.async_detector.submit(frame)
+        
+        return self.frame_id
+    
+    def detect_faces(self, image: Optional[np.ndarray] = None) -> List[Tuple[int, int, int, int]]:
+        """
+        Retorna as faces do frame atual (detectadas uma única vez).
+        
+        Args:
+            image: Usado apenas se nenhum frame foi registrado ainda
+        
+        Returns:
+            Lista de retângulos (x, y, w, h)
+        """
+        self._analyze(image)
+        return self._faces
+    
+    def detect_with_points(
+        self,
+        image: Optional[np.ndarray] = None
+    ) -> List[Tuple[Tuple[int, int, int, int], List[FacePoint]]]:
+        """
+        Retorna faces e pontos faciais do frame atual.
+        
+        Args:
+            image: Usado apenas se nenhum frame foi registrado ainda
+        
+        Returns:
+            Lista de tuplas (face_rect, face_points)
+        """
+        _, points = self.detect_with_points_array(image)
+        return [(face, self.detector.to_face_points(face_points)) for face, face_points in zip(self._faces, points)]
+    
+    def detect_with_points_array(self, image: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Retorna faces e pontos faciais do frame atual como arrays.
+        
+        Args:
+            image: Usado apenas se nenhum frame foi registrado ainda
+        
+        Returns:
+            Tupla (faces (K, 4) int32, pontos (K, P, 2) int32)
+        """
+        self._analyze(image)
+        
+        faces = np.asarray(self._faces, dtype=np.int32).reshape(-1, 4)
+        if self._points is None:
+            if self._timer is None:
+                self._points = self.detector.get_face_points_array(self._frame, faces)
+            else:
+                with self._timer.measure("pontos faciais"):
+                    self._points = self.detector.get_face_points_array(self._frame, faces)
+        
+        return faces, self._points
+    
+    def stop(self):
+        """Encerra a thread de detecção, se houver."""
+        if self.async_detector is not None:
+            self.async_detector.stop()
+    
+    def _analyze(self, image: Optional[np.ndarray]):
+        """Preenche o cache do frame atual, se ainda vazio."""
+        if self._frame is None:
+            if image is None:
+                raise ValueError("No frame registered: call begin_frame() first")
+            self.begin_frame(image)
+        
+        if self._faces is not None:
+            return
+        
+        if self._timer is None:
+            self._detect()
+        else:
+            with self._timer.measure("deteccao facial"):
+                self._detect()
+    
+    def _detect(self):
+        """Detecta as faces do frame atual (ou lê o último resultado assíncrono)."""
+        if self.async_detector is not None:
+            # Último resultado concluído, congelado para o restante do frame
+            faces, self._points = self.async_detector.detect_with_points_array(self._frame)
+            self._faces = [tuple(face) for face in faces.tolist()]
+        else:
+            self._faces = [tuple(int(v) for v in face) for face in self.detector.detect_faces(self._frame)]
@@ -7,7 +7,12 @@ Usa Haar Cascades do OpenCV para detectar faces e pontos faciais.
 import cv2
 import numpy as np
 from typing import List, Tuple, Optional
-from pathlib import Path
+
+from infrastructure.cascade_registry import CascadeRegistry, cascade_registry
+
+
+# Cascade ainda não obtido do registro (None significa "sem cascade")
+_UNSET = object()
 
 
 class FacePoint:
@@ -27,51 +32,184 @@ class FacePoint:
         self.name = name
 
 
+class TrackedFace:
+    """Face acompanhada entre detecções completas."""
+    
+    # Tamanho (maior lado) do modelo usado na correlação
+    TEMPLATE_SIZE = 48
+    
+    def __init__(self, gray: np.ndarray, rect: Tuple[int, int, int, int]):
+        """
+        Inicializa o rastreamento a partir de uma detecção.
+        
+        Args:
+            gray: Frame em grayscale onde a face foi detectada
+            rect: Retângulo da face (x, y, w, h)
+        """
+        x, y, w, h = rect
+        self.rect = rect
+        
+        # Correlação feita em escala reduzida: custo independe do tamanho da face
+        self.scale = min(1.0, self.TEMPLATE_SIZE / max(w, h))
+        self.template = cv2.resize(
+            gray[y:y + h, x:x + w],
+            (max(1, int(w * self.scale)), max(1, int(h * self.scale))),
+            interpolation=cv2.INTER_AREA
+        )
+
+
+class EyeEstimate:
+    """Posição dos olhos de uma face, relativa ao retângulo da face."""
+    
+    def __init__(self, face_rect: Tuple[int, int, int, int], previous: np.ndarray, current: np.ndarray):
+        """
+        Inicializa estimativa.
+        
+        Args:
+            face_rect: Retângulo (x, y, w, h) da face associada
+            previous: Posição relativa (2, 2) da medição anterior
+            current: Posição relativa (2, 2) da última medição
+        """
+        self.face_rect = face_rect
+        self.previous = previous
+        self.current = current
+    
+    def at(self, progress: float) -> np.ndarray:
+        """
+        Extrapola a partir da última medição, com a velocidade entre as
+        duas últimas medições (nunca além de um intervalo).
+        
+        Args:
+            progress: Fração (0-1) do intervalo entre medições já decorrida
+            
+        Returns:
+            Posição relativa (2, 2) dos olhos (esquerdo, direito)
+        """
+        return self.current + (self.current - self.previous) * min(1.0, progress)
+
+
 class FaceDetector:
     """
     Detecta faces e pontos faciais em imagens.
     
-    Usa Haar Cascades pré-treinados do OpenCV.
+    Usa Haar Cascades pré-treinados do OpenCV. A busca é feita em uma
+    resolução de trabalho fixa, de modo que o custo não depende da
+    resolução da câmera. Em vídeo, pode detectar apenas a cada N frames
+    e rastrear as faces por correlação nos frames intermediários.
     """
     
-    def __init__(self):
-        """Inicializa detector facial."""
-        # Tenta carregar Haar Cascade para detecção de face
-        self.face_cascade = None
-        self.eye_cascade = None
-        
-        # Caminhos possíveis dos Haar Cascades
-        cascade_paths = [
-            # OpenCV instalado via pip
-            cv2.data.haarcascades + 'haarcascade_frontalface_default.xml',
-            # Caminho local
-            'assets/haarcascades/haarcascade_frontalface_default.xml',
-        ]
+    # Menor janela aceita pelo cascade frontal padrão (treinado em 24x24)
+    MIN_CASCADE_SIZE = 24
+    
+    # Pontos faciais estimados geometricamente: nome e posição como fração
+    # (numerador, denominador) da largura e da altura da face
+    FACE_POINT_LAYOUT = (
+        ("centro", (1, 2), (1, 2)),
+        ("olho_esquerdo", (1, 3), (1, 3)),
+        ("olho_direito", (2, 3), (1, 3)),
+        ("nariz", (1, 2), (2, 3)),
+        ("boca", (1, 2), (5, 6)),
+        ("bochecha_esquerda", (1, 4), (1, 2)),
+        ("bochecha_direita", (3, 4), (1, 2)),
+        ("testa", (1, 2), (1, 6)),
+        ("queixo", (1, 2), (1, 1)),
+        ("canto_esq_superior", (1, 8), (1, 3)),
+        ("canto_dir_superior", (7, 8), (1, 3)),
+    )
+    
+    # Nome do ponto -> índice no eixo P dos arrays de pontos
+    FACE_POINT_INDEX = {name: i for i, (name, _, _) in enumerate(FACE_POINT_LAYOUT)}
+    
+    # Olhos geométricos (fração da face), usados enquanto não há medição
+    DEFAULT_EYES = np.array([(1 / 3, 1 / 3), (2 / 3, 1 / 3)], dtype=np.float32)
+    
+    # Largura para a qual a metade superior da face é reduzida na busca dos olhos
+    EYE_ROI_WIDTH = 96
+    
+    # Numeradores e denominadores (P, 2) usados no cálculo vetorizado
+    _POINT_NUMERATORS = np.array([(fx[0], fy[0]) for _, fx, fy in FACE_POINT_LAYOUT], dtype=np.int32)
+    _POINT_DENOMINATORS = np.array([(fx[1], fy[1]) for _, fx, fy in FACE_POINT_LAYOUT], dtype=np.int32)
+    
+    def __init__(
+        self,
+        detection_interval: int = 1,
+        min_confidence: float = 0.6,
+        roi_margin: float = 0.5,
+        working_width: int = 320,
+        face_size_range: Tuple[float, float] = (0.1, 0.9),
+        eye_interval: int = 0,
+        registry: Optional[CascadeRegistry] = None
+    ):
+        """
+        Inicializa detector facial.
         
-        for path in cascade_paths:
-            if Path(path).exists():
-                self.face_cascade = cv2.CascadeClassifier(path)
-                print(f"✅ Haar Cascade carregado: {path}")
-                break
+        Args:
+            detection_interval: Detecção completa a cada N frames; nos frames
+                                intermediários as faces são rastreadas
+                                (1 = detecção completa em todo frame)
+            min_confidence: Correlação mínima do rastreamento (0-1); abaixo
+                            dela a face é redetectada apenas na região ao redor
+            roi_margin: Margem da região de busca ao redor da face anterior,
+                        proporcional ao tamanho da face
+            working_width: Largura da imagem em que a busca é feita (frames
+                           maiores são reduzidos; 0 = resolução original)
+            face_size_range: Tamanho esperado da face (mínimo, máximo) como
+                             fração do menor lado do frame
+            eye_interval: Localiza os olhos com o cascade a cada N chamadas
+                          de get_face_points_array, interpolando entre
+                          medições (0 = posição geométrica fixa)
+            registry: Registro de onde os cascades são obtidos no primeiro
+                      uso (padrão: o registro do processo)
+        """
+        self.detection_interval = max(1, detection_interval)
+        self.min_confidence = min_confidence
+        self.roi_margin = roi_margin
+        self.working_width = working_width
+        self.face_size_range = face_size_range
+        self.eye_interval = max(0, eye_interval)
         
-        # Tenta carregar cascade de olhos
-        eye_paths = [
-            cv2.data.haarcascades + 'haarcascade_eye.xml',
-            'assets/haarcascades/haarcascade_eye.xml',
-        ]
+        # Estado do rastreamento (coordenadas na resolução de trabalho)
+        self.tracked_faces: List[TrackedFace] = []
+        self.frames_since_detection = 0
         
-        for path in eye_paths:
-            if Path(path).exists():
-                self.eye_cascade = cv2.CascadeClassifier(path)
-                break
-                
-        if self.face_cascade is None:
-            print("⚠️ Haar Cascade não encontrado. Usando detecção simples.")
+        # Estado da localização dos olhos (coordenadas originais)
+        self.eye_estimates: List[EyeEstimate] = []
+        self.frames_since_eye_detection = self.eye_interval
+        
+        # Cascades obtidos do registro apenas na primeira detecção
+        self.registry = registry if registry is not None else cascade_registry()
+        self._face_cascade = _UNSET
+        self._eye_cascade = _UNSET
+    
+    @property
+    def face_cascade(self) -> Optional['cv2.CascadeClassifier']:
+        """Cascade de faces (carregado no primeiro acesso; None se ausente)."""
+        if self._face_cascade is _UNSET:
+            self._face_cascade = self.registry.get('face')
+        return self._face_cascade
+    
+    @face_cascade.setter
+    def face_cascade(self, cascade: Optional['cv2.CascadeClassifier']):
+        self._face_cascade = cascade
+    
+    @property
+    def eye_cascade(self) -> Optional['cv2.CascadeClassifier']:
+        """Cascade de olhos (carregado no primeiro acesso; None se ausente)."""
+        if self._eye_cascade is _UNSET:
+            self._eye_cascade = self.registry.get('eye')
+        return self._eye_cascade
+    
+    @eye_cascade.setter
+    def eye_cascade(self, cascade: Optional['cv2.CascadeClassifier']):
+        self._eye_cascade = cascade
     
     def detect_faces(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """
         Detecta faces na imagem.
         
+        Com detection_interval > 1, frames consecutivos de vídeo são tratados
+        como sequência: entre detecções completas as faces são rastreadas.
+        
         Args:
             image: Imagem BGR
             
@@ -83,18 +221,145 @@ class FaceDetector:
             h, w = image.shape[:2]
             return [(w//4, h//4, w//2, h//2)]
         
-        # Converte para grayscale
+        # Reduz para a resolução de trabalho e converte para grayscale
+        scale = self.working_scale(image.shape[1])
+        if scale < 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
-        # Detecta faces
+        if self.detection_interval == 1:
+            faces = self._detect(gray)
+        elif not self.tracked_faces or self.frames_since_detection >= self.detection_interval:
+            # Detecção completa periódica (ou quando todas as faces foram perdidas)
+            faces = self._detect(gray)
+            self.tracked_faces = [TrackedFace(gray, face) for face in faces]
+            self.frames_since_detection = 1
+        else:
+            self.frames_since_detection += 1
+            faces = self._track(gray)
+        
+        # Retângulos de volta para a resolução original
+        return [
+            (int(fx / scale), int(fy / scale), int(fw / scale), int(fh / scale))
+            for fx, fy, fw, fh in faces
+        ]
+    
+    def working_scale(self, width: int) -> float:
+        """
+        Calcula o fator de redução para a resolução de trabalho.
+        
+        Args:
+            width: Largura do frame original
+            
+        Returns:
+            Fator (<= 1.0) aplicado ao frame antes da busca
+        """
+        if self.working_width <= 0 or width <= self.working_width:
+            return 1.0
+        return self.working_width / width
+    
+    def _detect(
+        self,
+        gray: np.ndarray,
+        min_size: Optional[Tuple[int, int]] = None,
+        max_size: Optional[Tuple[int, int]] = None
+    ) -> List[Tuple[int, int, int, int]]:
+        """
+        Executa o Haar Cascade.
+        
+        Args:
+            gray: Imagem (ou região) em grayscale, na resolução de trabalho
+            min_size: Menor face procurada (None = derivado de face_size_range)
+            max_size: Maior face procurada (None = derivado de face_size_range)
+            
+        Returns:
+            Lista de retângulos (x, y, w, h)
+        """
+        short_side = min(gray.shape[:2])
+        if min_size is None:
+            side = int(short_side * self.face_size_range[0])
+            min_size = (side, side)
+        if max_size is None:
+            side = int(short_side * self.face_size_range[1])
+            max_size = (side, side)
+        
+        min_size = tuple(max(self.MIN_CASCADE_SIZE, v) for v in min_size)
+        max_size = tuple(max(m, v) for m, v in zip(min_size, max_size))
+        
         faces = self.face_cascade.detectMultiScale(
             gray,
             scaleFactor=1.1,
             minNeighbors=5,
-            minSize=(30, 30)
+            minSize=min_size,
+            maxSize=max_size
         )
         
-        return faces
+        return [tuple(int(v) for v in face) for face in faces]
+    
+    def _track(self, gray: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """
+        Propaga as faces do frame anterior.
+        
+        Cada face é procurada por correlação (template matching) em uma
+        região expandida ao redor da posição anterior. Se a correlação cai
+        abaixo de min_confidence, o cascade roda apenas nessa região.
+        
+        Args:
+            gray: Frame atual em grayscale
+            
+        Returns:
+            Lista de retângulos (x, y, w, h)
+        """
+        img_h, img_w = gray.shape[:2]
+        tracked = []
+        
+        for face in self.tracked_faces:
+            x, y, w, h = face.rect
+            
+            # Região de busca: face anterior expandida pela margem
+            margin_x, margin_y = int(w * self.roi_margin), int(h * self.roi_margin)
+            x1, y1 = max(0, x - margin_x), max(0, y - margin_y)
+            x2, y2 = min(img_w, x + w + margin_x), min(img_h, y + h + margin_y)
+            region = gray[y1:y2, x1:x2]
+            
+            if region.shape[0] < h or region.shape[1] < w:
+                continue  # Face saiu da imagem
+            
+            small_region = cv2.resize(
+                region,
+                (max(1, int(region.shape[1] * face.scale)), max(1, int(region.shape[0] * face.scale))),
+                interpolation=cv2.INTER_AREA
+            )
+            
+            confidence = -1.0
+            if small_region.shape[0] >= face.template.shape[0] and small_region.shape[1] >= face.template.shape[1]:
+                scores = cv2.matchTemplate(small_region, face.template, cv2.TM_CCOEFF_NORMED)
+                _, confidence, _, (match_x, match_y) = cv2.minMaxLoc(scores)
+            
+            if confidence >= self.min_confidence:
+                face.rect = (
+                    x1 + int(round(match_x / face.scale)),
+                    y1 + int(round(match_y / face.scale)),
+                    w,
+                    h
+                )
+                tracked.append(face)
+                continue
+            
+            # Confiança baixa: redetecta apenas na região ao redor da face
+            candidates = self._detect(
+                region,
+                min_size=(int(w * 0.7), int(h * 0.7)),
+                max_size=(int(w * 1.5), int(h * 1.5))
+            )
+            
+            if candidates:
+                cx, cy, cw, ch = max(candidates, key=lambda c: c[2] * c[3])
+                tracked.append(TrackedFace(gray, (x1 + cx, y1 + cy, cw, ch)))
+        
+        self.tracked_faces = tracked
+        
+        return [face.rect for face in tracked]
     
     def get_face_points(
         self, 
@@ -111,40 +376,183 @@ class FaceDetector:
         Returns:
             Lista de pontos faciais
         """
-        x, y, w, h = face_rect
+        points = self.get_face_points_array(image, [face_rect], refine_eyes=False)[0]
+        return self.to_face_points(points)
+    
+    def get_face_points_array(
+        self,
+        image: np.ndarray,
+        faces,
+        refine_eyes: bool = True
+    ) -> np.ndarray:
+        """
+        Calcula os pontos de interesse de todas as faces de uma vez.
         
-        # Pontos de interesse calculados geometricamente
-        points = []
+        Com eye_interval > 0, chamadas consecutivas são tratadas como frames
+        de vídeo e os olhos vêm do cascade de olhos (ver _locate_eyes).
         
-        # Centro da face
-        points.append(FacePoint(x + w//2, y + h//2, "centro"))
+        Args:
+            image: Imagem BGR
+            faces: Retângulos (x, y, w, h) das K faces (lista ou array (K, 4))
+            refine_eyes: Se os olhos geométricos podem ser substituídos
+                         pelos localizados
+            
+        Returns:
+            Array (K, P, 2) int32 com as coordenadas (x, y) de cada ponto,
+            na ordem de FACE_POINT_LAYOUT (ver FACE_POINT_INDEX)
+        """
+        rects = np.asarray(faces, dtype=np.int32).reshape(-1, 4)
         
-        # Olhos (estimativa geométrica)
-        eye_y = y + h//3
-        points.append(FacePoint(x + w//3, eye_y, "olho_esquerdo"))
-        points.append(FacePoint(x + 2*w//3, eye_y, "olho_direito"))
+        origins = rects[:, None, 0:2]  # (K, 1, 2)
+        sizes = rects[:, None, 2:4]    # (K, 1, 2)
         
-        # Nariz
-        points.append(FacePoint(x + w//2, y + 2*h//3, "nariz"))
+        points = origins + (sizes * self._POINT_NUMERATORS) // self._POINT_DENOMINATORS
         
-        # Boca
-        points.append(FacePoint(x + w//2, y + 5*h//6, "boca"))
+        if refine_eyes and self.eye_interval > 0 and self.eye_cascade is not None and len(rects) > 0:
+            eyes = self._locate_eyes(image, rects)
+            eye_indices = [self.FACE_POINT_INDEX["olho_esquerdo"], self.FACE_POINT_INDEX["olho_direito"]]
+            points[:, eye_indices] = np.round(origins + eyes * sizes).astype(np.int32)
         
-        # Bochechas
-        points.append(FacePoint(x + w//4, y + h//2, "bochecha_esquerda"))
-        points.append(FacePoint(x + 3*w//4, y + h//2, "bochecha_direita"))
+        return points
+    
+    def _locate_eyes(self, image: np.ndarray, rects: np.ndarray) -> np.ndarray:
+        """
+        Posiciona os olhos de cada face, relativos ao retângulo da face.
         
-        # Testa
-        points.append(FacePoint(x + w//2, y + h//6, "testa"))
+        O cascade de olhos roda a cada eye_interval chamadas e sua medição
+        é usada no mesmo frame; nas intermediárias a posição é extrapolada
+        da última medição. Faces são associadas às estimativas pelo centro.
         
-        # Queixo
-        points.append(FacePoint(x + w//2, y + h, "queixo"))
+        Args:
+            image: Imagem BGR
+            rects: Retângulos (K, 4) das faces
+            
+        Returns:
+            Posições relativas (K, 2, 2) dos olhos (esquerdo, direito)
+        """
+        run_detection = self.frames_since_eye_detection >= self.eye_interval
+        progress = min(1.0, self.frames_since_eye_detection / self.eye_interval)
         
-        # Cantos da face
-        points.append(FacePoint(x + w//8, y + h//3, "canto_esq_superior"))
-        points.append(FacePoint(x + 7*w//8, y + h//3, "canto_dir_superior"))
+        estimates = []
+        eyes = np.empty((len(rects), 2, 2), dtype=np.float32)
         
-        return points
+        for i, rect in enumerate(rects.tolist()):
+            rect = tuple(rect)
+            previous = self._match_eye_estimate(rect)
+            position = previous.at(progress) if previous is not None else self.DEFAULT_EYES
+            
+            if run_detection:
+                measured = self._detect_eyes(image, rect)
+                # Olho não encontrado mantém a posição prevista
+                measured = np.where(np.isnan(measured), position, measured)
+                last = previous.current if previous is not None else measured
+                estimate = EyeEstimate(rect, last, measured)
+                position = measured
+            elif previous is not None:
+                estimate = EyeEstimate(rect, previous.previous, previous.current)
+            else:
+                estimate = EyeEstimate(rect, position, position)
+            
+            estimates.append(estimate)
+            eyes[i] = position
+        
+        self.eye_estimates = estimates
+        self.frames_since_eye_detection = 1 if run_detection else self.frames_since_eye_detection + 1
+        
+        return eyes
+    
+    def _match_eye_estimate(self, rect: Tuple[int, int, int, int]) -> Optional[EyeEstimate]:
+        """Retorna a estimativa cuja face tem o centro mais próximo (até meia face)."""
+        x, y, w, h = rect
+        center_x, center_y = x + w / 2, y + h / 2
+        
+        best, best_distance = None, max(w, h) / 2
+        for estimate in self.eye_estimates:
+            ex, ey, ew, eh = estimate.face_rect
+            distance = np.hypot(ex + ew / 2 - center_x, ey + eh / 2 - center_y)
+            if distance <= best_distance:
+                best, best_distance = estimate, distance
+        
+        return best
+    
+    def _detect_eyes(self, image: np.ndarray, rect: Tuple[int, int, int, int]) -> np.ndarray:
+        """
+        Executa o cascade de olhos na metade superior da face, em escala reduzida.
+        
+        Args:
+            image: Imagem BGR
+            rect: Retângulo (x, y, w, h) da face
+            
+        Returns:
+            Posições relativas (2, 2) dos olhos (esquerdo, direito); NaN
+            para olho não encontrado
+        """
+        eyes = np.full((2, 2), np.nan, dtype=np.float32)
+        
+        x, y, w, h = rect
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(image.shape[1], x + w), min(image.shape[0], y + h // 2)
+        if x2 - x1 < 8 or y2 - y1 < 8:
+            return eyes
+        
+        roi = image[y1:y2, x1:x2]
+        scale = min(1.0, self.EYE_ROI_WIDTH / roi.shape[1])
+        if scale < 1.0:
+            roi = cv2.resize(roi, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY) if roi.ndim == 3 else roi
+        
+        # Olhos ocupam aproximadamente de 1/8 a 1/3 da largura da face
+        min_eye = max(8, int(w * scale / 8))
+        max_eye = max(min_eye, int(w * scale / 3))
+        
+        found = self.eye_cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.1,
+            minNeighbors=3,
+            minSize=(min_eye, min_eye),
+            maxSize=(max_eye, max_eye)
+        )
+        
+        # Maior detecção em cada metade da face
+        best_area = [0, 0]
+        for ex, ey, ew, eh in found:
+            rel_x = (x1 - x + (ex + ew / 2) / scale) / w
+            rel_y = (y1 - y + (ey + eh / 2) / scale) / h
+            side = 0 if rel_x < 0.5 else 1
+            if ew * eh > best_area[side]:
+                best_area[side] = ew * eh
+                eyes[side] = (rel_x, rel_y)
+        
+        return eyes
+    
+    @classmethod
+    def to_face_points(cls, points: np.ndarray) -> List[FacePoint]:
+        """
+        Converte os pontos de uma face (P, 2) em objetos FacePoint.
+        
+        Args:
+            points: Coordenadas dos pontos de uma face
+            
+        Returns:
+            Lista de pontos faciais
+        """
+        return [
+            FacePoint(int(px), int(py), name)
+            for (name, _, _), (px, py) in zip(cls.FACE_POINT_LAYOUT, points.tolist())
+        ]
+    
+    def detect_with_points_array(self, image: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Detecta faces e seus pontos de interesse como arrays.
+        
+        Args:
+            image: Imagem BGR
+            
+        Returns:
+            Tupla (faces (K, 4) int32, pontos (K, P, 2) int32)
+        """
+        faces = np.asarray(self.detect_faces(image), dtype=np.int32).reshape(-1, 4)
+        return faces, self.get_face_points_array(image, faces)
     
     def detect_with_points(
         self, 
@@ -159,11 +567,9 @@ class FaceDetector:
         Returns:
             Lista de tuplas (face_rect, face_points)
         """
-        faces = self.detect_faces(image)
-        results = []
+        faces, points = self.detect_with_points_array(image)
         
-        for face in faces:
-            points = self.get_face_points(image, face)
-            results.append((face, points))
-        
-        return results
+        return [
+            (tuple(face), self.to_face_points(face_points))
+            for face, face_points in zip(faces.tolist(), points)
+        ]
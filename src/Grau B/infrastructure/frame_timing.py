@@ -0,0 +1,135 @@
+"""
+Instrumentação de tempo por estágio do processamento de vídeo.
+
+Cada estágio (captura, filtros, detecção facial, camadas, composição,
+exibição) registra sua duração por frame com time.perf_counter_ns. São
+mantidas janelas deslizantes das últimas medições, de onde saem os
+percentis p50/p95/p99 e a estimativa de FPS.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Tuple
+
+import numpy as np
+
+
+class FrameTimer:
+    """
+    Tempos por estágio em janelas deslizantes (seguro entre threads).
+    """
+    
+    def __init__(self, window: int = 240):
+        """
+        Inicializa o medidor.
+        
+        Args:
+            window: Número de medições mantidas por estágio
+        """
+        self.window = max(1, window)
+        
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[int]] = {}
+        self._frame_times: Deque[int] = deque(maxlen=self.window)
+        self.frames = 0
+    
+    def record(self, stage: str, duration_ns: int):
+        """
+        Registra a duração de um estágio em um frame.
+        
+        Args:
+            stage: Nome do estágio, em ASCII (as fontes do OpenCV usadas no
+                   HUD não têm acentos); a ordem de exibição é a do
+                   primeiro registro
+            duration_ns: Duração em nanossegundos
+        """
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(duration_ns)
+    
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        """
+        Mede o bloco 'with' como uma execução do estágio.
+        
+        Args:
+            stage: Nome do estágio
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter_ns() - start)
+    
+    def tick(self):
+        """Marca a conclusão de um frame (base da estimativa de FPS)."""
+        with self._lock:
+            self._frame_times.append(time.perf_counter_ns())
+            self.frames += 1
+    
+    @property
+    def fps(self) -> float:
+        """Frames por segundo na janela recente."""
+        with self._lock:
+            if len(self._frame_times) < 2:
+                return 0.0
+            elapsed = self._frame_times[-1] - self._frame_times[0]
+            return (len(self._frame_times) - 1) * 1e9 / elapsed if elapsed > 0 else 0.0
+    
+    def percentiles(self, stage: str) -> Tuple[float, float, float]:
+        """
+        Calcula os percentis do estágio na janela recente.
+        
+        Args:
+            stage: Nome do estágio
+        
+        Returns:
+            Tupla (p50, p95, p99) em milissegundos
+        """
+        with self._lock:
+            samples = np.array(self._samples.get(stage, ()), dtype=np.float64)
+        
+        if samples.size == 0:
+            return (0.0, 0.0, 0.0)
+        
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99]) / 1e6
+        return (float(p50), float(p95), float(p99))
+    
+    def stages(self) -> List[str]:
+        """Estágios registrados, na ordem do primeiro registro."""
+        with self._lock:
+            return list(self._samples)
+    
+    def report_rows(self) -> List[Tuple[str, ...]]:
+        """
+        Monta a tabela de tempos: cabeçalho com FPS e uma linha por estágio.
+        
+        Returns:
+            Linhas (estágio, p50, p95, p99) já formatadas, tempos em ms
+        """
+        rows = [(f"FPS: {self.fps:.1f}", "p50", "p95", "p99")]
+        
+        for stage in self.stages():
+            rows.append((stage,) + tuple(f"{value:.2f}" for value in self.percentiles(stage)))
+        
+        return rows
+    
+    def summary(self) -> str:
+        """Resumo textual de todos os estágios (ex: para imprimir ao sair)."""
+        lines = [f"📊 Tempos por estágio ({self.frames} frames, ms)"]
+        lines += [
+            f"   {stage:<26} {p50:>7} {p95:>7} {p99:>7}"
+            for stage, p50, p95, p99 in self.report_rows()
+        ]
+        return "\n".join(lines)
+    
+    def reset(self):
+        """Descarta todas as medições."""
+        with self._lock:
+            self._samples.clear()
+            self._frame_times.clear()
+            self.frames = 0
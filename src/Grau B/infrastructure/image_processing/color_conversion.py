@@ -3,8 +3,11 @@ Implementação de conversões de espaço de cor.
 """
 import cv2 as cv
 import numpy as np
+from typing import Optional
 from domain.entities.image import Image
+from domain.entities.processor_descriptor import ProcessorDescriptor
 from domain.interfaces.image_processor import ImageProcessorInterface
+from infrastructure.image_processing.point_operations import PointOperation
 
 
 class GrayscaleProcessor(ImageProcessorInterface):
@@ -57,6 +60,27 @@ class GrayscaleProcessor(ImageProcessorInterface):
             name=f"{image.name}_grayscale_{self.method}",
             path=None
         )
+    
+    def to_point_operation(self) -> Optional[PointOperation]:
+        """
+        Retorna a conversão como LUT identidade sobre o grayscale do OpenCV.
+        
+        Apenas o método 'opencv' usa a mesma conversão das operações
+        pontuais; os demais não podem ser fundidos.
+        """
+        if self.method != 'opencv':
+            return None
+        return PointOperation(np.arange(256, dtype=np.uint8), name="grayscale", to_grayscale=True)
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Conversão pixel a pixel para um canal."""
+        return ProcessorDescriptor(
+            kind='color',
+            radius=0,
+            point_operation=True,
+            output_channels=1,
+            cost_per_pixel=3.0 if self.method == 'opencv' else 8.0
+        )
 
 
 class HSVConverter(ImageProcessorInterface):
@@ -82,6 +106,65 @@ class HSVConverter(ImageProcessorInterface):
             name=f"{image.name}_hsv",
             path=None
         )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Conversão pixel a pixel BGR -> HSV."""
+        return ProcessorDescriptor(
+            kind='color',
+            radius=0,
+            point_operation=True,
+            input_channels=(3,),
+            output_channels=3,
+            cost_per_pixel=6.0
+        )
+
+
+class SaturationProcessor(ImageProcessorInterface):
+    """Ajusta a saturação da imagem no espaço HSV."""
+    
+    def __init__(self, factor: float = 1.5):
+        """
+        Inicializa o processador de saturação.
+        
+        Args:
+            factor: Multiplicador da saturação (< 1 dessatura, > 1 satura)
+        """
+        self.factor = factor
+    
+    def process(self, image: Image) -> Image:
+        """
+        Multiplica o canal S (HSV) da imagem.
+        
+        Args:
+            image: Imagem de entrada (RGB)
+            
+        Returns:
+            Imagem com saturação ajustada
+        """
+        if image.channels == 1:
+            return image.copy()
+        
+        hsv = cv.cvtColor(image.data, cv.COLOR_BGR2HSV)
+        hsv[:, :, 1] = cv.convertScaleAbs(hsv[:, :, 1], alpha=self.factor)
+        result = cv.cvtColor(hsv, cv.COLOR_HSV2BGR)
+        
+        return Image(
+            data=result,
+            width=image.width,
+            height=image.height,
+            channels=3,
+            name=f"{image.name}_saturation_{self.factor}",
+            path=None
+        )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Ida e volta BGR -> HSV -> BGR, pixel a pixel."""
+        return ProcessorDescriptor(
+            kind='color',
+            radius=0,
+            point_operation=True,
+            cost_per_pixel=13.0
+        )
 
 
 class ChannelSeparator(ImageProcessorInterface):
@@ -129,6 +212,16 @@ class ChannelSeparator(ImageProcessorInterface):
         
         # Se 'all', retorna a imagem original
         return image.copy()
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Extração de canal (sem vizinhança)."""
+        return ProcessorDescriptor(
+            kind='color',
+            radius=0,
+            point_operation=True,
+            output_channels=1 if self.channel in ('b', 'g', 'r', 'h', 's', 'v') else None,
+            cost_per_pixel=0.5
+        )
 
 
 class ChannelVisualizer(ImageProcessorInterface):
@@ -174,3 +267,13 @@ class ChannelVisualizer(ImageProcessorInterface):
             name=f"{image.name}_only_{self.channel}",
             path=None
         )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Zera os demais canais (sem vizinhança)."""
+        return ProcessorDescriptor(
+            kind='color',
+            radius=0,
+            point_operation=True,
+            output_channels=3,
+            cost_per_pixel=1.0
+        )
@@ -0,0 +1,250 @@
+"""
+Implementação de LUT 3D para transformações globais de cor.
+
+Transformações cuja saída depende apenas da tripla BGR de entrada
+(conversões de espaço de cor, saturação, gama, ...) são amostradas uma
+única vez em uma grade N x N x N. Cada frame passa a custar apenas uma
+consulta com interpolação trilinear, em vez de várias conversões
+completas de espaço de cor.
+"""
+import hashlib
+import inspect
+import os
+import sys
+from pathlib import Path
+from typing import Callable, List, Optional
+
+import cv2 as cv
+import numpy as np
+from domain.entities.image import Image
+from domain.entities.processor_descriptor import ProcessorDescriptor
+from domain.interfaces.image_processor import ImageProcessorInterface
+
+
+class ColorLUT3DProcessor(ImageProcessorInterface):
+    """Aplica uma LUT 3D (BGR -> BGR) com interpolação trilinear."""
+    
+    # Versão do formato da grade em cache (entra no identificador do arquivo)
+    CACHE_VERSION = 1
+    
+    def __init__(self, table: np.ndarray, name: str = "lut3d"):
+        """
+        Inicializa o processador.
+        
+        Args:
+            table: Grade (N, N, N, 3) indexada por [b, g, r] com a cor de
+                   saída BGR de cada nó
+            name: Nome da transformação (usado no nome da imagem resultante)
+        """
+        size = table.shape[0]
+        if table.shape != (size, size, size, 3) or size < 2:
+            raise ValueError("Table must have shape (N, N, N, 3) with N >= 2")
+        
+        self.size = size
+        self.name = name
+        self.table = np.asarray(table, dtype=np.float32)
+        
+        # Grade achatada em 2D para cv.remap: linhas = g, colunas = b * N + r.
+        # O remap bilinear interpola R e G; B é interpolado entre duas fatias.
+        self._table_2d = np.ascontiguousarray(
+            self.table.transpose(1, 0, 2, 3).reshape(size, size * size, 3)
+        )
+        
+        # Para cada valor 0-255: coordenada contínua na grade e peso de B
+        nodes = self.node_values(size).astype(np.float32)
+        position = np.interp(np.arange(256), nodes, np.arange(size)).astype(np.float32)
+        lower = np.clip(np.floor(position), 0, size - 2)
+        self._lut_position = position.reshape(1, 256)
+        self._lut_slice = (lower * size).astype(np.float32).reshape(1, 256)
+        self._lut_weight = (position - lower).astype(np.float32).reshape(1, 256)
+    
+    @staticmethod
+    def node_values(size: int) -> np.ndarray:
+        """Retorna os valores (0-255) amostrados em cada eixo da grade."""
+        return np.round(np.linspace(0, 255, size)).astype(np.uint8)
+    
+    def process(self, image: Image) -> Image:
+        """
+        Aplica a LUT 3D na imagem.
+        
+        Args:
+            image: Imagem de entrada (BGR)
+        
+        Returns:
+            Imagem com a transformação de cor aplicada
+        """
+        data = image.data
+        if image.channels == 1:
+            data = cv.cvtColor(data, cv.COLOR_GRAY2BGR)
+        elif image.channels == 4:
+            data = cv.cvtColor(data, cv.COLOR_BGRA2BGR)
+        
+        b, g, r = cv.split(data)
+        
+        # Coordenadas na grade via LUTs de 256 entradas (sem aritmética por pixel em Python)
+        map_x = cv.LUT(b, self._lut_slice)
+        map_x += cv.LUT(r, self._lut_position)
+        map_y = cv.LUT(g, self._lut_position)
+        
+        # Interpolação bilinear em (R, G) nas duas fatias de B vizinhas
+        lower = cv.remap(self._table_2d, map_x, map_y, cv.INTER_LINEAR)
+        map_x += self.size
+        upper = cv.remap(self._table_2d, map_x, map_y, cv.INTER_LINEAR)
+        
+        # Interpolação linear em B
+        weight = cv.LUT(b, self._lut_weight)
+        upper -= lower
+        upper *= cv.merge([weight, weight, weight])
+        lower += upper
+        
+        processed_data = cv.convertScaleAbs(lower)
+        
+        return Image(
+            data=processed_data,
+            width=image.width,
+            height=image.height,
+            channels=3,
+            name=f"{image.name}_{self.name}",
+            path=None
+        )
+    
+    @classmethod
+    def from_function(
+        cls,
+        transform: Callable[[np.ndarray], np.ndarray],
+        size: int = 33,
+        name: str = "lut3d",
+        cache_path: Optional[str] = None
+    ) -> 'ColorLUT3DProcessor':
+        """
+        Amostra uma transformação de cor na grade da LUT.
+        
+        Args:
+            transform: Função que recebe e retorna uma imagem BGR uint8
+            size: Número de nós por eixo (33 = 33x33x33)
+            name: Nome da transformação
+            cache_path: Arquivo .npy onde a grade é armazenada; se já
+                        existir, é carregado em vez de recalculado
+        
+        Returns:
+            Processador com a LUT construída
+        """
+        if cache_path is not None and Path(cache_path).exists():
+            try:
+                table = np.load(cache_path)
+                if table.shape == (size, size, size, 3):
+                    return cls(table, name=name)
+            except (OSError, ValueError, EOFError) as e:
+                # Arquivo truncado ou corrompido: recalcula e regrava
+                print(f"⚠️ LUT em cache inválida ({e}); recalculando: {cache_path}")
+        
+        # Imagem com todas as cores da grade: linhas = (b, g), colunas = r
+        nodes = cls.node_values(size)
+        b, g, r = np.meshgrid(nodes, nodes, nodes, indexing='ij')
+        lattice = np.stack([b, g, r], axis=-1).reshape(size * size, size, 3)
+        
+        output = transform(lattice)
+        if output.ndim == 2:
+            output = cv.cvtColor(output, cv.COLOR_GRAY2BGR)
+        table = output.reshape(size, size, size, 3).astype(np.float32)
+        
+        if cache_path is not None:
+            try:
+                Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+                
+                # Grava em arquivo temporário e troca: nunca deixa um .npy truncado
+                tmp_path = f"{cache_path}.tmp"
+                with open(tmp_path, "wb") as tmp_file:
+                    np.save(tmp_file, table)
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                print(f"⚠️ Não foi possível gravar a LUT em cache: {e}")
+        
+        return cls(table, name=name)
+    
+    @classmethod
+    def from_processors(
+        cls,
+        processors: List[ImageProcessorInterface],
+        size: int = 33,
+        name: str = "lut3d",
+        cache_dir: Optional[str] = "assets/cache/luts"
+    ) -> 'ColorLUT3DProcessor':
+        """
+        Constrói a LUT a partir de uma composição de processadores.
+        
+        Os processadores devem ser transformações globais de cor (a saída
+        de cada pixel depende só da sua cor). A grade fica em cache no
+        disco, identificada pelos tipos e parâmetros dos processadores.
+        
+        Args:
+            processors: Processadores na ordem de aplicação
+            size: Número de nós por eixo
+            name: Nome da transformação
+            cache_dir: Diretório do cache em disco (None desativa o cache)
+        
+        Returns:
+            Processador com a LUT construída
+        """
+        def transform(lattice: np.ndarray) -> np.ndarray:
+            image = Image(
+                data=lattice,
+                width=lattice.shape[1],
+                height=lattice.shape[0],
+                channels=3,
+                name=name
+            )
+            for processor in processors:
+                image = processor.process(image)
+                if image.channels == 1:
+                    data = cv.cvtColor(image.data, cv.COLOR_GRAY2BGR)
+                    image = Image(data, image.width, image.height, 3, image.name)
+            return image.data
+        
+        cache_path = None
+        if cache_dir is not None:
+            fingerprint = cls._fingerprint(processors)
+            cache_path = str(Path(cache_dir) / f"{name}_{size}_{fingerprint}.npy")
+        
+        return cls.from_function(transform, size=size, name=name, cache_path=cache_path)
+    
+    @classmethod
+    def _fingerprint(cls, processors: List[ImageProcessorInterface]) -> str:
+        """
+        Gera identificador estável a partir dos tipos e parâmetros.
+        
+        Inclui a versão do formato e o código-fonte do módulo de cada
+        processador: mudar a implementação invalida a LUT em cache.
+        """
+        digest = hashlib.sha1(f"v{cls.CACHE_VERSION}".encode())
+        
+        for processor in processors:
+            digest.update(type(processor).__qualname__.encode())
+            digest.update(cls._module_source(type(processor)).encode())
+            for key, value in sorted(vars(processor).items()):
+                digest.update(key.encode())
+                if isinstance(value, np.ndarray):
+                    digest.update(value.tobytes())
+                else:
+                    digest.update(repr(value).encode())
+        
+        return digest.hexdigest()[:12]
+    
+    @staticmethod
+    def _module_source(processor_type: type) -> str:
+        """Código-fonte do módulo que define o processador ('' se indisponível)."""
+        try:
+            return inspect.getsource(sys.modules[processor_type.__module__])
+        except (KeyError, OSError, TypeError):
+            return ""
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Consulta trilinear pixel a pixel, custo independente da gradação."""
+        return ProcessorDescriptor(
+            kind='color',
+            radius=0,
+            point_operation=True,
+            output_channels=3,
+            output_dtype='uint8',
+            cost_per_pixel=24.0
+        )
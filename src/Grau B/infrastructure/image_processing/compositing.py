@@ -0,0 +1,521 @@
+"""
+Composição de imagens com alfa pré-multiplicado em ponto fixo.
+
+Cada asset sobreposto (sticker, frame de sprite, filtro facial) é
+convertido uma única vez, no carregamento, para cor pré-multiplicada
+pelo alfa. A mistura é feita em inteiros de 8/16 bits diretamente na
+região de destino:
+    
+    destino = cor_pre + destino * (255 - alfa) / 255
+
+Os pixels de cada asset são classificados uma única vez em transparentes
+(ignorados), opacos (copiados) e parciais (misturados), de modo que a
+aritmética fica restrita às bordas do recorte.
+"""
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Tuple
+
+import cv2 as cv
+import numpy as np
+
+
+def _div255(values: np.ndarray) -> np.ndarray:
+    """Divide valores uint16 por 255 com arredondamento (in-place)."""
+    values += 128
+    values += values >> 8
+    values >>= 8
+    return values
+
+
+def to_bgra(image: np.ndarray, black_is_transparent: bool = False) -> np.ndarray:
+    """
+    Converte uma imagem (ou pilha de imagens) para BGRA.
+    
+    Args:
+        image: Grayscale (H, W), BGR ou BGRA (..., H, W, C) uint8
+        black_is_transparent: Em imagens sem alfa, trata pixels pretos
+                              como transparentes (em vez de opacos)
+    
+    Returns:
+        Imagem BGRA (..., H, W, 4); a própria entrada se já for BGRA
+    """
+    if image.ndim == 2:
+        image = np.repeat(image[..., None], 3, axis=-1)
+    
+    if image.shape[-1] == 4:
+        return image
+    
+    if black_is_transparent:
+        alpha = np.where(np.any(image != 0, axis=-1), 255, 0).astype(np.uint8)
+    else:
+        alpha = np.full(image.shape[:-1], 255, dtype=np.uint8)
+    
+    return np.concatenate([image, alpha[..., None]], axis=-1)
+
+
+def premultiply(bgra: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Multiplica a cor pelo alfa (em ponto fixo).
+    
+    Args:
+        bgra: Imagem ou pilha de imagens BGRA (..., H, W, 4) uint8
+    
+    Returns:
+        Tupla (cor pré-multiplicada (..., H, W, 3), alfa (..., H, W))
+    """
+    alpha = np.ascontiguousarray(bgra[..., 3])
+    color = np.multiply(bgra[..., :3], alpha[..., None], dtype=np.uint16)
+    return _div255(color).astype(np.uint8), alpha
+
+
+class AlphaRegions:
+    """
+    Classificação dos pixels de uma imagem pelo valor do alfa.
+    
+    Attributes:
+        bbox: Menor retângulo (x, y, largura, altura) com alfa > 0,
+              ou None se a imagem é totalmente transparente
+        opaque: Máscara uint8 dos pixels opacos dentro de bbox
+        partial_y: Linhas dos pixels parciais, relativas a bbox
+        partial_x: Colunas dos pixels parciais, relativas a bbox
+        partial_color: Cor pré-multiplicada dos pixels parciais (N, 3)
+        partial_inverse_alpha: 255 - alfa dos pixels parciais (N, 1)
+        sparse: Se compensa misturar só os pixels parciais em vez da
+                caixa inteira
+    """
+    
+    # Acima desta fração de pixels parciais na caixa, a mistura densa é mais barata
+    SPARSE_LIMIT = 0.35
+    
+    def __init__(self, image: 'PremultipliedImage'):
+        """
+        Analisa o canal alfa da imagem.
+        
+        Args:
+            image: Imagem pré-multiplicada
+        """
+        visible = image.alpha > 0
+        rows = np.flatnonzero(visible.any(axis=1))
+        cols = np.flatnonzero(visible.any(axis=0))
+        
+        if rows.size == 0:
+            self.bbox = None
+            self.opaque_count = self.partial_count = 0
+            self.sparse = True
+            return
+        
+        y1, y2 = int(rows[0]), int(rows[-1]) + 1
+        x1, x2 = int(cols[0]), int(cols[-1]) + 1
+        self.bbox = (x1, y1, x2 - x1, y2 - y1)
+        
+        opaque = image.alpha[y1:y2, x1:x2] == 255
+        partial = visible[y1:y2, x1:x2] & ~opaque
+        self.opaque = opaque.view(np.uint8)
+        self.partial_y, self.partial_x = np.nonzero(partial)
+        self.partial_color = image.color[y1 + self.partial_y, x1 + self.partial_x]
+        self.partial_inverse_alpha = image.inverse_alpha[y1 + self.partial_y, x1 + self.partial_x]
+        
+        self.opaque_count = int(np.count_nonzero(self.opaque))
+        self.partial_count = int(self.partial_y.size)
+        self.sparse = self.partial_count <= self.SPARSE_LIMIT * self.opaque.size
+
+
+class PremultipliedImage:
+    """
+    Imagem com alfa pré-multiplicado pronta para composição.
+    
+    Attributes:
+        color: Cor BGR já multiplicada pelo alfa (H, W, 3) uint8
+        alpha: Canal alfa (H, W) uint8
+        inverse_alpha: 255 - alfa, com eixo de canal (H, W, 1) uint8
+    """
+    
+    def __init__(self, color: np.ndarray, alpha: np.ndarray):
+        """
+        Inicializa a imagem pré-multiplicada.
+        
+        Args:
+            color: Cor BGR pré-multiplicada (H, W, 3) uint8
+            alpha: Canal alfa (H, W) uint8
+        """
+        self.color = np.ascontiguousarray(color, dtype=np.uint8)
+        self.alpha = np.ascontiguousarray(alpha, dtype=np.uint8)
+        self.inverse_alpha = (255 - self.alpha)[:, :, None]
+        self._regions: Optional[AlphaRegions] = None
+    
+    @property
+    def width(self) -> int:
+        """Largura em pixels."""
+        return self.color.shape[1]
+    
+    @property
+    def height(self) -> int:
+        """Altura em pixels."""
+        return self.color.shape[0]
+    
+    @property
+    def regions(self) -> AlphaRegions:
+        """Regiões transparente/opaca/parcial (analisadas no primeiro uso)."""
+        if self._regions is None:
+            self._regions = AlphaRegions(self)
+        return self._regions
+    
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos buffers."""
+        return self.color.nbytes + self.alpha.nbytes + self.inverse_alpha.nbytes
+    
+    @classmethod
+    def empty(cls, width: int, height: int) -> 'PremultipliedImage':
+        """
+        Cria uma camada totalmente transparente.
+        
+        Args:
+            width: Largura
+            height: Altura
+        
+        Returns:
+            Imagem pré-multiplicada vazia
+        """
+        return cls(
+            np.zeros((height, width, 3), dtype=np.uint8),
+            np.zeros((height, width), dtype=np.uint8)
+        )
+    
+    @classmethod
+    def from_bgra(cls, image: np.ndarray, black_is_transparent: bool = False) -> 'PremultipliedImage':
+        """
+        Converte uma imagem carregada do disco.
+        
+        Args:
+            image: Imagem grayscale, BGR ou BGRA (uint8)
+            black_is_transparent: Em imagens sem alfa, trata pixels pretos
+                                  como transparentes (em vez de opacos)
+        
+        Returns:
+            Imagem pré-multiplicada
+        """
+        premultiplied, alpha = premultiply(to_bgra(image, black_is_transparent))
+        
+        result = cls(premultiplied, alpha)
+        result.regions  # Asset carregado: analisa as regiões já no carregamento
+        return result
+    
+    def resize(self, width: int, height: int) -> 'PremultipliedImage':
+        """
+        Redimensiona a imagem (interpolar cor pré-multiplicada evita halos).
+        
+        Args:
+            width: Nova largura
+            height: Nova altura
+        
+        Returns:
+            Nova imagem pré-multiplicada
+        """
+        width, height = max(1, width), max(1, height)
+        if (width, height) == (self.width, self.height):
+            return self
+        
+        bgra = np.dstack([self.color, self.alpha])
+        resized = cv.resize(bgra, (width, height), interpolation=cv.INTER_AREA)
+        
+        # Garante cor <= alfa após a interpolação (invariante da pré-multiplicação)
+        alpha = resized[:, :, 3]
+        color = np.minimum(resized[:, :, :3], alpha[:, :, None])
+        
+        return PremultipliedImage(color, alpha)
+    
+    def crop(self, x: int, y: int, width: int, height: int) -> 'PremultipliedImage':
+        """
+        Recorta uma região (os buffers são views, sem cópia).
+        
+        Args:
+            x: Posição X do canto superior esquerdo
+            y: Posição Y do canto superior esquerdo
+            width: Largura da região
+            height: Altura da região
+        
+        Returns:
+            Imagem pré-multiplicada da região
+        """
+        region = PremultipliedImage.__new__(PremultipliedImage)
+        region.color = self.color[y:y + height, x:x + width]
+        region.alpha = self.alpha[y:y + height, x:x + width]
+        region.inverse_alpha = self.inverse_alpha[y:y + height, x:x + width]
+        region._regions = None
+        return region
+
+
+class ResizeCache:
+    """
+    Cache LRU de assets redimensionados.
+    
+    O tamanho pedido é quantizado, de modo que pequenas variações no
+    tamanho da face entre frames reutilizam a mesma versão redimensionada
+    (com sua análise de alfa) em vez de redimensionar a cada frame.
+    """
+    
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, quantum: int = 4):
+        """
+        Inicializa o cache.
+        
+        Args:
+            max_bytes: Memória máxima ocupada pelas imagens em cache
+            quantum: Passo de quantização do tamanho, em pixels
+        """
+        self.max_bytes = max_bytes
+        self.quantum = max(1, quantum)
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._images: 'OrderedDict[Hashable, PremultipliedImage]' = OrderedDict()
+    
+    def quantize(self, size: int) -> int:
+        """Arredonda um tamanho para o múltiplo de quantum mais próximo."""
+        return max(self.quantum, int(round(size / self.quantum)) * self.quantum)
+    
+    def get(
+        self,
+        key: Hashable,
+        image: PremultipliedImage,
+        width: int,
+        height: int
+    ) -> PremultipliedImage:
+        """
+        Retorna o asset no tamanho (quantizado) pedido.
+        
+        Args:
+            key: Identificador do asset e do frame (ex: ("main_sprite", 3))
+            image: Asset em tamanho original
+            width: Largura desejada
+            height: Altura desejada
+        
+        Returns:
+            Asset redimensionado
+        """
+        width, height = self.quantize(width), self.quantize(height)
+        cache_key = (key, width, height)
+        
+        if cache_key in self._images:
+            self.hits += 1
+            self._images.move_to_end(cache_key)
+            return self._images[cache_key]
+        
+        self.misses += 1
+        resized = image.resize(width, height)
+        self._images[cache_key] = resized
+        self._bytes += resized.nbytes
+        
+        while self._bytes > self.max_bytes and len(self._images) > 1:
+            _, evicted = self._images.popitem(last=False)
+            self._bytes -= evicted.nbytes
+        
+        return resized
+    
+    def clear(self):
+        """Remove todas as entradas."""
+        self._images.clear()
+        self._bytes = 0
+
+
+def clip_rect(
+    dst_shape: Tuple[int, ...],
+    x: int,
+    y: int,
+    width: int,
+    height: int
+) -> Optional[Tuple[slice, slice, slice, slice]]:
+    """
+    Recorta um retângulo aos limites do destino.
+    
+    Args:
+        dst_shape: Formato da imagem de destino
+        x: Posição X do canto superior esquerdo
+        y: Posição Y do canto superior esquerdo
+        width: Largura do retângulo
+        height: Altura do retângulo
+    
+    Returns:
+        Fatias (dst_y, dst_x, src_y, src_x) ou None se não houver interseção
+    """
+    dst_h, dst_w = dst_shape[:2]
+    
+    x1, y1 = max(0, x), max(0, y)
+    x2, y2 = min(dst_w, x + width), min(dst_h, y + height)
+    
+    if x1 >= x2 or y1 >= y2:
+        return None
+    
+    return (
+        slice(y1, y2),
+        slice(x1, x2),
+        slice(y1 - y, y2 - y),
+        slice(x1 - x, x2 - x)
+    )
+
+
+def composite(dst: np.ndarray, overlay: PremultipliedImage, x: int, y: int) -> bool:
+    """
+    Sobrepõe a imagem no destino, in-place, recortando nas bordas.
+    
+    Args:
+        dst: Imagem BGR de destino (modificada)
+        overlay: Imagem pré-multiplicada
+        x: Posição X do canto superior esquerdo
+        y: Posição Y do canto superior esquerdo
+    
+    Returns:
+        True se alguma parte foi desenhada
+    """
+    regions = overlay.regions
+    if regions.bbox is None:
+        return False
+    
+    # Apenas a caixa com alfa > 0 é considerada
+    box_x, box_y, box_w, box_h = regions.bbox
+    slices = clip_rect(dst.shape, x + box_x, y + box_y, box_w, box_h)
+    if slices is None:
+        return False
+    
+    dst_y, dst_x, src_y, src_x = slices
+    roi = dst[dst_y, dst_x]
+    color = overlay.color[box_y:box_y + box_h, box_x:box_x + box_w][src_y, src_x]
+    
+    if not regions.sparse or not dst.flags.c_contiguous:
+        # Muitas bordas: mistura densa da caixa
+        # destino * (255 - alfa) / 255 em 16 bits, depois soma a cor pré-multiplicada
+        inverse_alpha = overlay.inverse_alpha[box_y:box_y + box_h, box_x:box_x + box_w]
+        blended = np.multiply(roi, inverse_alpha[src_y, src_x], dtype=np.uint16)
+        _div255(blended)
+        blended += color
+        roi[...] = blended
+        return True
+    
+    # Pixels opacos: cópia direta com máscara, sem aritmética
+    if regions.opaque_count:
+        cv.copyTo(color, regions.opaque[src_y, src_x], roi)
+    
+    # Pixels parciais: mistura só nas bordas
+    if regions.partial_count:
+        ys, xs = regions.partial_y, regions.partial_x
+        partial_color = regions.partial_color
+        partial_inverse_alpha = regions.partial_inverse_alpha
+        
+        if (src_y.start, src_y.stop, src_x.start, src_x.stop) != (0, box_h, 0, box_w):
+            # Recortado na borda do destino: descarta pixels de fora
+            inside = (ys >= src_y.start) & (ys < src_y.stop) & (xs >= src_x.start) & (xs < src_x.stop)
+            ys, xs = ys[inside], xs[inside]
+            partial_color = partial_color[inside]
+            partial_inverse_alpha = partial_inverse_alpha[inside]
+        
+        # Índices lineares no destino (contíguo) para leitura e escrita diretas
+        pixels = dst.reshape(-1, dst.shape[2])
+        index = (ys + (dst_y.start - src_y.start)) * dst.shape[1] + xs + (dst_x.start - src_x.start)
+        
+        blended = np.multiply(np.take(pixels, index, axis=0), partial_inverse_alpha, dtype=np.uint16)
+        _div255(blended)
+        blended += partial_color
+        pixels[index] = blended
+    
+    return True
+
+
+def composite_centered(dst: np.ndarray, overlay: PremultipliedImage, center: Tuple[int, int]) -> bool:
+    """
+    Sobrepõe a imagem centralizada em um ponto.
+    
+    Args:
+        dst: Imagem BGR de destino (modificada)
+        overlay: Imagem pré-multiplicada
+        center: Posição (x, y) do centro
+    
+    Returns:
+        True se alguma parte foi desenhada
+    """
+    x_center, y_center = center
+    return composite(
+        dst,
+        overlay,
+        x_center - overlay.width // 2,
+        y_center - overlay.height // 2
+    )
+
+
+def flatten(
+    layer: PremultipliedImage,
+    overlay: PremultipliedImage,
+    x: int,
+    y: int
+) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Achata uma imagem sobre uma camada pré-multiplicada, in-place.
+    
+    Cor e alfa seguem a mesma equação "over", de modo que compor a camada
+    resultante equivale a compor cada imagem na ordem em que foi achatada.
+    
+    Args:
+        layer: Camada de destino (modificada)
+        overlay: Imagem pré-multiplicada
+        x: Posição X do canto superior esquerdo
+        y: Posição Y do canto superior esquerdo
+    
+    Returns:
+        Retângulo (x, y, largura, altura) afetado ou None
+    """
+    slices = clip_rect(layer.color.shape, x, y, overlay.width, overlay.height)
+    if slices is None:
+        return None
+    
+    dst_y, dst_x, src_y, src_x = slices
+    inverse_alpha = overlay.inverse_alpha[src_y, src_x]
+    
+    for target, source in [
+        (layer.color[dst_y, dst_x], overlay.color[src_y, src_x]),
+        (layer.alpha[dst_y, dst_x, None], overlay.alpha[src_y, src_x, None])
+    ]:
+        blended = np.multiply(target, inverse_alpha, dtype=np.uint16)
+        _div255(blended)
+        blended += source
+        target[...] = blended
+    
+    layer.inverse_alpha[dst_y, dst_x, 0] = 255 - layer.alpha[dst_y, dst_x]
+    layer._regions = None
+    
+    return (dst_x.start, dst_y.start, dst_x.stop - dst_x.start, dst_y.stop - dst_y.start)
+
+
+def merge_rects(rects: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+    """
+    Une retângulos sobrepostos até que nenhum par se intercepte.
+    
+    Cada pixel passa a pertencer a no máximo um retângulo, permitindo
+    compor uma camada região por região sem misturar um pixel duas vezes.
+    
+    Args:
+        rects: Retângulos (x, y, largura, altura)
+    
+    Returns:
+        Retângulos disjuntos cobrindo a mesma área
+    """
+    merged = [(x, y, x + w, y + h) for x, y, w, h in rects]
+    
+    changed = True
+    while changed:
+        changed = False
+        result: List[Tuple[int, int, int, int]] = []
+        
+        for rect in merged:
+            for i, other in enumerate(result):
+                if rect[0] < other[2] and other[0] < rect[2] and rect[1] < other[3] and other[1] < rect[3]:
+                    result[i] = (
+                        min(rect[0], other[0]), min(rect[1], other[1]),
+                        max(rect[2], other[2]), max(rect[3], other[3])
+                    )
+                    changed = True
+                    break
+            else:
+                result.append(rect)
+        
+        merged = result
+    
+    return [(x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in merged]
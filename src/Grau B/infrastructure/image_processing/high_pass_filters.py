@@ -4,7 +4,9 @@ Implementação de filtros passa-alta (detecção de bordas).
 import cv2 as cv
 import numpy as np
 from domain.entities.image import Image
+from domain.entities.processor_descriptor import ProcessorDescriptor
 from domain.interfaces.image_processor import ImageProcessorInterface
+from infrastructure.image_processing.multiresolution import scale_kernel_size
 
 
 class LaplacianFilterProcessor(ImageProcessorInterface):
@@ -49,6 +51,24 @@ class LaplacianFilterProcessor(ImageProcessorInterface):
             name=f"{image.name}_laplacian",
             path=None
         )
+    
+    def at_scale(self, scale: float) -> 'LaplacianFilterProcessor':
+        """Reescala o kernel (1, 3, 5 ou 7) para a resolução do preview."""
+        if scale == 1.0:
+            return self
+        
+        return LaplacianFilterProcessor(
+            kernel_size=scale_kernel_size(self.kernel_size, scale, max_size=7)
+        )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Derivada segunda em grayscale (kernel 1 usa abertura 3x3)."""
+        return ProcessorDescriptor(
+            kind='derivative',
+            radius=max(1, self.kernel_size // 2),
+            output_channels=1,
+            cost_per_pixel=2.0 * max(3, self.kernel_size) + 3
+        )
 
 
 class SobelFilterProcessor(ImageProcessorInterface):
@@ -102,3 +122,23 @@ class SobelFilterProcessor(ImageProcessorInterface):
             name=f"{image.name}_sobel_{self.direction}",
             path=None
         )
+    
+    def at_scale(self, scale: float) -> 'SobelFilterProcessor':
+        """Reescala o kernel (1, 3, 5 ou 7) para a resolução do preview."""
+        if scale == 1.0:
+            return self
+        
+        return SobelFilterProcessor(
+            kernel_size=scale_kernel_size(self.kernel_size, scale, max_size=7),
+            direction=self.direction
+        )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Gradiente em grayscale com 1 pixel de halo para kernel 3."""
+        passes = 1 if self.direction in ('x', 'y') else 2
+        return ProcessorDescriptor(
+            kind='derivative',
+            radius=max(1, self.kernel_size // 2),
+            output_channels=1,
+            cost_per_pixel=passes * 2.0 * max(3, self.kernel_size) + 3
+        )
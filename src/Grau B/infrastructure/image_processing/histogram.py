@@ -3,10 +3,43 @@ Implementação de operações com histogramas.
 """
 import cv2 as cv
 import numpy as np
+from typing import Callable, Optional, Tuple
 from domain.entities.image import Image
+from domain.entities.processor_descriptor import ProcessorDescriptor
 from domain.interfaces.image_processor import ImageProcessorInterface
 
 
+def equalize_luma(
+    data: np.ndarray,
+    equalize: Callable[[np.ndarray], np.ndarray],
+    luma: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Equaliza apenas o canal Y (luminância) de uma imagem BGR.
+    
+    Faz uma única conversão BGR -> YCrCb e uma de volta (aritmética
+    inteira do OpenCV para imagens uint8), processando só o plano Y.
+    
+    Args:
+        data: Imagem BGR uint8
+        equalize: Função que equaliza um plano uint8 (pode escrever nele)
+        luma: Buffer do plano Y reaproveitado entre chamadas (opcional)
+        
+    Returns:
+        Tupla (imagem BGR equalizada, buffer do plano Y)
+    """
+    ycrcb = cv.cvtColor(data, cv.COLOR_BGR2YCrCb)
+    
+    if luma is None or luma.shape != ycrcb.shape[:2]:
+        luma = np.empty(ycrcb.shape[:2], dtype=np.uint8)
+    
+    cv.extractChannel(ycrcb, 0, dst=luma)
+    equalized = equalize(luma)
+    cv.insertChannel(equalized, ycrcb, 0)
+    
+    return cv.cvtColor(ycrcb, cv.COLOR_YCrCb2BGR), luma
+
+
 class HistogramEqualizer(ImageProcessorInterface):
     """Aplica equalização de histograma."""
     
@@ -17,10 +50,12 @@ class HistogramEqualizer(ImageProcessorInterface):
         Args:
             color_equalization: Como equalizar imagens coloridas
                                - 'value': equaliza apenas o canal V (HSV)
+                               - 'ycrcb': equaliza apenas a luminância Y (YCrCb)
                                - 'all': equaliza todos os canais BGR
                                - 'grayscale': converte para gray e equaliza
         """
         self.color_equalization = color_equalization
+        self._luma: Optional[np.ndarray] = None  # Buffer do plano Y
     
     def process(self, image: Image) -> Image:
         """
@@ -50,6 +85,13 @@ class HistogramEqualizer(ImageProcessorInterface):
             equalized = cv.cvtColor(hsv, cv.COLOR_HSV2BGR)
             channels = 3
         
+        elif self.color_equalization == 'ycrcb':
+            # Equaliza apenas a luminância (Y) em YCrCb
+            equalized, self._luma = equalize_luma(
+                image.data, lambda plane: cv.equalizeHist(plane, plane), self._luma
+            )
+            channels = 3
+        
         else:  # 'all'
             # Equaliza todos os canais BGR separadamente
             b, g, r = cv.split(image.data)
@@ -67,6 +109,15 @@ class HistogramEqualizer(ImageProcessorInterface):
             name=f"{image.name}_equalized_{self.color_equalization}",
             path=None
         )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """A LUT de equalização depende do histograma da imagem inteira."""
+        return ProcessorDescriptor(
+            kind='global',
+            radius=None,
+            output_channels=1 if self.color_equalization == 'grayscale' else None,
+            cost_per_pixel=8.0 if self.color_equalization in ('value', 'ycrcb') else 3.0
+        )
 
 
 class HistogramCalculator:
@@ -103,16 +154,27 @@ class HistogramCalculator:
 class CLAHEProcessor(ImageProcessorInterface):
     """Aplica CLAHE (Contrast Limited Adaptive Histogram Equalization)."""
     
-    def __init__(self, clip_limit: float = 2.0, tile_grid_size: tuple = (8, 8)):
+    def __init__(
+        self,
+        clip_limit: float = 2.0,
+        tile_grid_size: tuple = (8, 8),
+        color_equalization: str = 'value'
+    ):
         """
         Inicializa o processador CLAHE.
         
         Args:
             clip_limit: Limite de contraste
             tile_grid_size: Tamanho da grade de tiles
+            color_equalization: Canal usado em imagens coloridas
+                               - 'value': canal V (HSV)
+                               - 'ycrcb': luminância Y (YCrCb)
         """
         self.clip_limit = clip_limit
         self.tile_grid_size = tile_grid_size
+        self.color_equalization = color_equalization
+        self._luma: Optional[np.ndarray] = None  # Buffer do plano Y
+        self._equalized_luma: Optional[np.ndarray] = None
     
     def process(self, image: Image) -> Image:
         """
@@ -135,6 +197,17 @@ class CLAHEProcessor(ImageProcessorInterface):
             result = clahe.apply(image.data)
             channels = 1
         
+        elif self.color_equalization == 'ycrcb':
+            # Imagem colorida - aplica apenas na luminância (Y)
+            def apply_clahe(src: np.ndarray) -> np.ndarray:
+                # CLAHE lê vizinhanças: não pode escrever no próprio plano
+                if self._equalized_luma is None or self._equalized_luma.shape != src.shape:
+                    self._equalized_luma = np.empty_like(src)
+                return clahe.apply(src, self._equalized_luma)
+            
+            result, self._luma = equalize_luma(image.data, apply_clahe, self._luma)
+            channels = 3
+        
         else:
             # Imagem colorida - aplica no canal V (HSV)
             hsv = cv.cvtColor(image.data, cv.COLOR_BGR2HSV)
@@ -150,3 +223,11 @@ class CLAHEProcessor(ImageProcessorInterface):
             name=f"{image.name}_clahe",
             path=None
         )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Histogramas por tile: depende de regiões proporcionais à imagem."""
+        return ProcessorDescriptor(
+            kind='global',
+            radius=None,
+            cost_per_pixel=12.0
+        )
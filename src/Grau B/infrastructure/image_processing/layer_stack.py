@@ -0,0 +1,231 @@
+"""
+Pilha de camadas para composição de frames.
+
+Cada camada (efeitos faciais, stickers, HUD) produz apenas um conjunto
+esparso de tiles pré-multiplicados com sua posição no frame, sem copiar
+o frame. A pilha compõe todos os tiles, na ordem das camadas, em um
+único buffer de saída: o frame é escrito uma vez, e só nos retângulos
+afetados.
+"""
+
+from functools import lru_cache
+from typing import Callable, Collection, Dict, List, Optional, Sequence, Tuple
+
+import cv2 as cv
+import numpy as np
+
+from infrastructure.frame_timing import FrameTimer
+from infrastructure.image_processing.compositing import PremultipliedImage, composite
+
+
+# Tile de uma camada: posição (x, y) do canto superior esquerdo e imagem
+Tile = Tuple[int, int, PremultipliedImage]
+
+# Fonte de tiles: recebe o frame base (somente leitura) e devolve os tiles
+TileSource = Callable[[np.ndarray], List[Tile]]
+
+
+class LayerStack:
+    """
+    Camadas ordenadas (de baixo para cima) compostas em uma única passada.
+    """
+    
+    def __init__(self, composite_stage: str = "composicao"):
+        """
+        Inicializa a pilha vazia.
+        
+        Args:
+            composite_stage: Nome do estágio de composição na instrumentação
+        """
+        self.layers: List[Tuple[str, TileSource]] = []
+        self.composite_stage = composite_stage
+        
+        # Instrumentação opcional: tempo de cada camada e da composição
+        self.timer: Optional[FrameTimer] = None
+    
+    def add_layer(self, name: str, source: TileSource):
+        """
+        Adiciona uma camada no topo da pilha.
+        
+        Args:
+            name: Nome da camada
+            source: Função que gera os tiles da camada para um frame
+        """
+        self.layers.append((name, source))
+    
+    def collect(
+        self,
+        frame: np.ndarray,
+        names: Optional[Collection[str]] = None
+    ) -> List[Tuple[str, List[Tile]]]:
+        """
+        Gera os tiles das camadas sem modificar o frame.
+        
+        Args:
+            frame: Frame base
+            names: Camadas a gerar (None = todas)
+        
+        Returns:
+            Lista de tuplas (nome da camada, tiles), de baixo para cima
+        """
+        layers = [(name, source) for name, source in self.layers if names is None or name in names]
+        
+        if self.timer is None:
+            return [(name, source(frame)) for name, source in layers]
+        
+        collected = []
+        for name, source in layers:
+            with self.timer.measure(f"camada: {name}"):
+                collected.append((name, source(frame)))
+        return collected
+    
+    def render(
+        self,
+        frame: np.ndarray,
+        in_place: bool = False,
+        collected: Optional[Dict[str, List[Tile]]] = None
+    ) -> np.ndarray:
+        """
+        Compõe todas as camadas sobre o frame.
+        
+        Args:
+            frame: Frame base (BGR)
+            in_place: Se o frame pode ser modificado (ex: saída de um
+                      filtro); senão é copiado uma única vez
+            collected: Tiles já gerados de algumas camadas (ex: sob um
+                       lock, com collect()); as demais são geradas aqui
+        
+        Returns:
+            Frame composto (o próprio frame se nenhuma camada tem tiles)
+        """
+        layer_tiles = dict(collected or {})
+        missing = [name for name, _ in self.layers if name not in layer_tiles]
+        if missing:
+            layer_tiles.update(self.collect(frame, missing))
+        
+        tiles = [tile for name, _ in self.layers for tile in layer_tiles[name]]
+        
+        if not tiles:
+            return frame
+        
+        if self.timer is None:
+            return self._composite_tiles(frame, tiles, in_place)
+        
+        with self.timer.measure(self.composite_stage):
+            return self._composite_tiles(frame, tiles, in_place)
+    
+    def _composite_tiles(self, frame: np.ndarray, tiles: List[Tile], in_place: bool) -> np.ndarray:
+        """Escreve todos os tiles em um único buffer de saída."""
+        result = frame if in_place else frame.copy()
+        
+        for x, y, image in tiles:
+            composite(result, image, x, y)
+        
+        return result
+
+
+@lru_cache(maxsize=64)
+def text_tile(
+    text: str,
+    color: Tuple[int, int, int],
+    font_scale: float,
+    thickness: int,
+    font: int = cv.FONT_HERSHEY_SIMPLEX
+) -> Tuple[PremultipliedImage, Tuple[int, int]]:
+    """
+    Rasteriza um texto em um tile pré-multiplicado (em cache).
+    
+    Args:
+        text: Texto
+        color: Cor BGR
+        font_scale: Escala da fonte (como em cv.putText)
+        thickness: Espessura do traço
+        font: Fonte do OpenCV
+    
+    Returns:
+        Tupla (tile, (dx, dy)): o tile posicionado em (x - dx, y - dy)
+        equivale a cv.putText na origem (x, y)
+    """
+    (width, height), baseline = cv.getTextSize(text, font, font_scale, thickness)
+    ascent = height + thickness
+    
+    mask = np.zeros((ascent + baseline + thickness, width + 2 * thickness), dtype=np.uint8)
+    cv.putText(mask, text, (thickness, ascent), font, font_scale, 255, thickness)
+    
+    return _solid_tile(mask, color), (thickness, ascent)
+
+
+@lru_cache(maxsize=16)
+def circle_tile(radius: int, color: Tuple[int, int, int]) -> PremultipliedImage:
+    """
+    Rasteriza um círculo preenchido em um tile pré-multiplicado (em cache).
+    
+    Args:
+        radius: Raio em pixels
+        color: Cor BGR
+    
+    Returns:
+        Tile de lado 2 * raio + 1, centrado no círculo
+    """
+    mask = np.zeros((2 * radius + 1, 2 * radius + 1), dtype=np.uint8)
+    cv.circle(mask, (radius, radius), radius, 255, -1)
+    
+    return _solid_tile(mask, color)
+
+
+def text_panel(
+    rows: Sequence[Sequence[str]],
+    font_scale: float = 0.45,
+    thickness: int = 1,
+    color: Tuple[int, int, int] = (255, 255, 255),
+    background_alpha: int = 160,
+    font: int = cv.FONT_HERSHEY_SIMPLEX
+) -> PremultipliedImage:
+    """
+    Rasteriza uma tabela de texto sobre um fundo escuro translúcido.
+    
+    Args:
+        rows: Linhas da tabela, cada uma com suas células (colunas alinhadas)
+        font_scale: Escala da fonte (como em cv.putText)
+        thickness: Espessura do traço
+        color: Cor BGR do texto
+        background_alpha: Opacidade do fundo (0-255)
+        font: Fonte do OpenCV
+    
+    Returns:
+        Painel pré-multiplicado
+    """
+    sizes = [[cv.getTextSize(cell, font, font_scale, thickness)[0] for cell in row] for row in rows]
+    line_height = max(height for row in sizes for _, height in row) * 2
+    padding = line_height // 2
+    
+    # Largura de cada coluna: a maior célula da coluna
+    column_count = max(len(row) for row in rows)
+    column_widths = [
+        max((row[c][0] for row in sizes if c < len(row)), default=0)
+        for c in range(column_count)
+    ]
+    column_x = np.cumsum([padding] + [w + padding for w in column_widths]).tolist()
+    
+    width = column_x[-1]
+    height = line_height * len(rows) + padding
+    
+    bgra = np.zeros((height, width, 4), dtype=np.uint8)
+    bgra[:, :, 3] = background_alpha
+    
+    for i, row in enumerate(rows):
+        for c, cell in enumerate(row):
+            # Primeira coluna alinhada à esquerda, demais (números) à direita
+            x = column_x[c] if c == 0 else column_x[c] + column_widths[c] - sizes[i][c][0]
+            cv.putText(bgra, cell, (x, (i + 1) * line_height), font, font_scale, color + (255,), thickness)
+    
+    return PremultipliedImage.from_bgra(bgra)
+
+
+def _solid_tile(mask: np.ndarray, color: Tuple[int, int, int]) -> PremultipliedImage:
+    """Cria um tile de cor única usando a máscara como alfa."""
+    bgra = np.empty(mask.shape + (4,), dtype=np.uint8)
+    bgra[:, :, :3] = color
+    bgra[:, :, 3] = mask
+    
+    return PremultipliedImage.from_bgra(bgra)
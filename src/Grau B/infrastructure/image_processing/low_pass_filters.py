@@ -4,7 +4,9 @@ Implementação de filtros passa-baixa (suavização).
 import cv2 as cv
 import numpy as np
 from domain.entities.image import Image
+from domain.entities.processor_descriptor import ProcessorDescriptor
 from domain.interfaces.image_processor import ImageProcessorInterface
+from infrastructure.image_processing.multiresolution import scale_kernel_size
 
 
 class MeanFilterProcessor(ImageProcessorInterface):
@@ -43,6 +45,25 @@ class MeanFilterProcessor(ImageProcessorInterface):
             name=f"{image.name}_mean_{self.kernel_size[0]}x{self.kernel_size[1]}",
             path=None
         )
+    
+    def at_scale(self, scale: float) -> 'MeanFilterProcessor':
+        """Reescala o kernel de média para a resolução do preview."""
+        if scale == 1.0:
+            return self
+        
+        return MeanFilterProcessor(
+            kernel_size=tuple(scale_kernel_size(k, scale, odd=False) for k in self.kernel_size)
+        )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Filtro linear com vizinhança do tamanho do kernel."""
+        return ProcessorDescriptor(
+            kind='linear',
+            radius=max(self.kernel_size) // 2,
+            in_place=True,
+            commutes_with=frozenset({'linear'}),
+            cost_per_pixel=float(self.kernel_size[0] * self.kernel_size[1])
+        )
 
 
 class GaussianFilterProcessor(ImageProcessorInterface):
@@ -79,3 +100,28 @@ class GaussianFilterProcessor(ImageProcessorInterface):
             name=f"{image.name}_gaussian_{self.kernel_size[0]}x{self.kernel_size[1]}",
             path=None
         )
+    
+    def at_scale(self, scale: float) -> 'GaussianFilterProcessor':
+        """Reescala kernel e sigma para a resolução do preview."""
+        if scale == 1.0:
+            return self
+        
+        return GaussianFilterProcessor(
+            kernel_size=tuple(scale_kernel_size(k, scale) for k in self.kernel_size),
+            sigma=self.sigma * scale
+        )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Filtro linear separável com vizinhança do tamanho do kernel."""
+        size = max(self.kernel_size)
+        if size <= 0:
+            # Kernel calculado pelo OpenCV a partir do sigma (~3 sigma)
+            size = 2 * int(round(3 * self.sigma)) + 1
+        
+        return ProcessorDescriptor(
+            kind='linear',
+            radius=size // 2,
+            in_place=True,
+            commutes_with=frozenset({'linear'}),
+            cost_per_pixel=2.0 * size
+        )
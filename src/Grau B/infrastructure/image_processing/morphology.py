@@ -4,7 +4,9 @@ Implementação de transformações morfológicas.
 import cv2 as cv
 import numpy as np
 from domain.entities.image import Image
+from domain.entities.processor_descriptor import ProcessorDescriptor
 from domain.interfaces.image_processor import ImageProcessorInterface
+from infrastructure.image_processing.multiresolution import scale_kernel_size
 
 
 class MorphologyProcessor(ImageProcessorInterface):
@@ -19,6 +21,7 @@ class MorphologyProcessor(ImageProcessorInterface):
             kernel_shape: Forma do elemento ('rect', 'ellipse', 'cross')
         """
         self.kernel_size = kernel_size
+        self.kernel_shape = kernel_shape
         self.kernel = self._create_kernel(kernel_shape)
     
     def _create_kernel(self, shape: str) -> np.ndarray:
@@ -33,6 +36,25 @@ class MorphologyProcessor(ImageProcessorInterface):
     def process(self, image: Image) -> Image:
         """Método abstrato a ser implementado pelas subclasses."""
         raise NotImplementedError
+    
+    def at_scale(self, scale: float) -> 'MorphologyProcessor':
+        """Reescala o elemento estruturante para a resolução do preview."""
+        if scale == 1.0:
+            return self
+        
+        return type(self)(
+            kernel_size=tuple(scale_kernel_size(k, scale) for k in self.kernel_size),
+            kernel_shape=self.kernel_shape
+        )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Operação de vizinhança do tamanho do elemento estruturante."""
+        return ProcessorDescriptor(
+            kind='morphological',
+            radius=max(self.kernel_size) // 2,
+            in_place=True,
+            cost_per_pixel=float(self.kernel_size[0] + self.kernel_size[1])
+        )
 
 
 class ErosionProcessor(MorphologyProcessor):
@@ -84,6 +106,15 @@ class OpeningProcessor(MorphologyProcessor):
             name=f"{image.name}_opening",
             path=None
         )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Duas passadas morfológicas: o halo e o custo dobram."""
+        return ProcessorDescriptor(
+            kind='morphological',
+            radius=2 * (max(self.kernel_size) // 2),
+            in_place=True,
+            cost_per_pixel=2.0 * (self.kernel_size[0] + self.kernel_size[1])
+        )
 
 
 class ClosingProcessor(MorphologyProcessor):
@@ -101,6 +132,15 @@ class ClosingProcessor(MorphologyProcessor):
             name=f"{image.name}_closing",
             path=None
         )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Duas passadas morfológicas: o halo e o custo dobram."""
+        return ProcessorDescriptor(
+            kind='morphological',
+            radius=2 * (max(self.kernel_size) // 2),
+            in_place=True,
+            cost_per_pixel=2.0 * (self.kernel_size[0] + self.kernel_size[1])
+        )
 
 
 class GradientProcessor(MorphologyProcessor):
@@ -118,3 +158,12 @@ class GradientProcessor(MorphologyProcessor):
             name=f"{image.name}_gradient",
             path=None
         )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Duas passadas morfológicas: o halo e o custo dobram."""
+        return ProcessorDescriptor(
+            kind='morphological',
+            radius=2 * (max(self.kernel_size) // 2),
+            in_place=False,
+            cost_per_pixel=2.0 * (self.kernel_size[0] + self.kernel_size[1])
+        )
@@ -0,0 +1,231 @@
+"""
+Processamento multi-resolução para previews interativos.
+
+Mantém uma pirâmide de imagens por fonte, escolhe o nível adequado ao
+tamanho da janela e registra os parâmetros da edição para reaplicá-los
+em resolução completa apenas ao salvar.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import cv2 as cv
+import numpy as np
+
+from domain.entities.image import Image
+from domain.interfaces.image_processor import ImageProcessorInterface
+from infrastructure.image_processing.color_conversion import ChannelSeparator
+from infrastructure.image_processing.pipeline import ProcessingPipeline
+
+
+def scale_kernel_size(
+    size: int,
+    scale: float,
+    odd: bool = True,
+    min_size: int = 1,
+    max_size: Optional[int] = None
+) -> int:
+    """
+    Reescala o tamanho de um kernel para outra resolução.
+    
+    Ex: um kernel 15x15 em escala 0.25 vira ~4x4 (5x5 se precisar ser ímpar).
+    Tamanho 0 (calculado automaticamente pelo OpenCV) é preservado.
+    
+    Args:
+        size: Tamanho original do kernel
+        scale: Fator de escala da imagem
+        odd: Se o kernel deve permanecer ímpar
+        min_size: Tamanho mínimo permitido
+        max_size: Tamanho máximo permitido (opcional)
+    
+    Returns:
+        Tamanho reescalado
+    """
+    if size <= 0:
+        return size
+    
+    scaled = max(min_size, int(round(size * scale)))
+    if odd:
+        scaled |= 1
+    if max_size is not None:
+        scaled = min(max_size, scaled)
+    
+    return scaled
+
+
+class ImagePyramid:
+    """
+    Pirâmide de resoluções de uma imagem fonte.
+    
+    Os níveis são gerados sob demanda com cv.pyrDown (cada nível tem
+    metade da resolução do anterior) e os previews já redimensionados
+    ficam em cache por tamanho de janela.
+    """
+    
+    def __init__(self, image: np.ndarray, min_size: int = 32):
+        """
+        Inicializa a pirâmide.
+        
+        Args:
+            image: Imagem em resolução completa (nível 0)
+            min_size: Menor dimensão permitida para um nível
+        """
+        self.levels: List[np.ndarray] = [image]
+        self.min_size = min_size
+        self._previews: Dict[Tuple[int, int], Tuple[np.ndarray, float]] = {}
+    
+    @property
+    def full_resolution(self) -> np.ndarray:
+        """Retorna a imagem em resolução completa."""
+        return self.levels[0]
+    
+    def level(self, index: int) -> np.ndarray:
+        """
+        Retorna um nível da pirâmide, gerando os níveis faltantes.
+        
+        Args:
+            index: Nível desejado (0 = resolução completa)
+        
+        Returns:
+            Imagem do nível (ou o menor nível possível)
+        """
+        while len(self.levels) <= index:
+            last = self.levels[-1]
+            if min(last.shape[:2]) // 2 < self.min_size:
+                break
+            self.levels.append(cv.pyrDown(last))
+        
+        return self.levels[min(index, len(self.levels) - 1)]
+    
+    def preview(self, max_width: int, max_height: int) -> Tuple[np.ndarray, float]:
+        """
+        Retorna a imagem ajustada ao tamanho da janela.
+        
+        Parte do menor nível que ainda tem resolução maior ou igual à
+        desejada, de modo que o custo dependa da janela e não do arquivo.
+        
+        Args:
+            max_width: Largura máxima da janela
+            max_height: Altura máxima da janela
+        
+        Returns:
+            Tupla (imagem de preview, escala em relação ao original)
+        """
+        key = (max_width, max_height)
+        if key in self._previews:
+            return self._previews[key]
+        
+        height, width = self.full_resolution.shape[:2]
+        scale = min(1.0, max_width / width, max_height / height)
+        
+        if scale >= 1.0:
+            result = (self.full_resolution, 1.0)
+        else:
+            # Nível mais reduzido que ainda não perde resolução
+            index = 0
+            while 0.5 ** (index + 1) >= scale:
+                index += 1
+            base = self.level(index)
+            
+            target = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+            if (base.shape[1], base.shape[0]) != target:
+                base = cv.resize(base, target, interpolation=cv.INTER_AREA)
+            result = (base, target[0] / width)
+        
+        self._previews[key] = result
+        return result
+
+
+class PyramidCache:
+    """Cache LRU de pirâmides, uma por imagem fonte."""
+    
+    def __init__(self, max_entries: int = 4):
+        """
+        Inicializa o cache.
+        
+        Args:
+            max_entries: Número máximo de pirâmides mantidas em memória
+        """
+        self.max_entries = max_entries
+        self._pyramids: 'OrderedDict[Hashable, ImagePyramid]' = OrderedDict()
+    
+    def get(self, key: Hashable, image: np.ndarray) -> ImagePyramid:
+        """
+        Retorna a pirâmide da fonte, criando-a se necessário.
+        
+        Args:
+            key: Identificador da fonte (ex: caminho + data de modificação)
+            image: Imagem em resolução completa
+        
+        Returns:
+            Pirâmide da imagem
+        """
+        if key in self._pyramids:
+            self._pyramids.move_to_end(key)
+            return self._pyramids[key]
+        
+        pyramid = ImagePyramid(image)
+        self._pyramids[key] = pyramid
+        
+        while len(self._pyramids) > self.max_entries:
+            self._pyramids.popitem(last=False)
+        
+        return pyramid
+
+
+@dataclass
+class ProcessingRecipe:
+    """
+    Parâmetros registrados de uma edição.
+    
+    Pode ser renderizada em qualquer escala: o preview usa a escala da
+    janela e o salvamento reaplica a mesma receita em resolução completa.
+    
+    Attributes:
+        processors: Processadores ativos, na ordem de aplicação
+        channel: Canal selecionado ('r', 'g', 'b') ou None para RGB
+    """
+    processors: List[ImageProcessorInterface] = field(default_factory=list)
+    channel: Optional[str] = None
+    
+    def render(self, frame: np.ndarray, scale: float = 1.0) -> np.ndarray:
+        """
+        Aplica a receita em um frame.
+        
+        Args:
+            frame: Frame BGR de entrada
+            scale: Escala do frame em relação à imagem original
+        
+        Returns:
+            Frame BGR processado
+        """
+        if self.channel:
+            frame = self._run(ChannelSeparator(channel=self.channel), frame)
+        
+        # Operações pontuais consecutivas são fundidas em uma única LUT
+        stages = ProcessingPipeline.optimize(
+            [processor.at_scale(scale) for processor in self.processors]
+        )
+        for stage in stages:
+            frame = self._run(stage, frame)
+        
+        return frame
+    
+    @staticmethod
+    def _run(processor: ImageProcessorInterface, frame: np.ndarray) -> np.ndarray:
+        """Aplica um processador e normaliza a saída para BGR uint8."""
+        temp_image = Image(
+            data=frame,
+            width=frame.shape[1],
+            height=frame.shape[0],
+            channels=frame.shape[2] if len(frame.shape) > 2 else 1,
+            name="temp"
+        )
+        frame = processor.process(temp_image).data
+        
+        if len(frame.shape) == 2:
+            frame = cv.cvtColor(frame, cv.COLOR_GRAY2BGR)
+        elif frame.dtype == np.float64:
+            frame = np.uint8(np.clip(frame, 0, 255))
+        
+        return frame
@@ -0,0 +1,115 @@
+"""
+Pipeline de processadores com fusão de operações pontuais.
+"""
+from typing import List
+
+from domain.entities.image import Image
+from domain.entities.processor_descriptor import ProcessorDescriptor
+from domain.interfaces.image_processor import ImageProcessorInterface
+from infrastructure.image_processing.point_operations import PointOperation, as_point_operation
+
+
+class ProcessingPipeline(ImageProcessorInterface):
+    """
+    Aplica uma sequência de processadores.
+    
+    Operações pontuais adjacentes são compostas em uma única LUT, de modo
+    que uma cadeia de cinco operações pontuais custa o mesmo que uma.
+    """
+    
+    def __init__(self, processors: List[ImageProcessorInterface]):
+        """
+        Inicializa o pipeline.
+        
+        Args:
+            processors: Processadores na ordem de aplicação
+        """
+        self.processors = list(processors)
+        self.stages = self.optimize(self.processors)
+    
+    @staticmethod
+    def optimize(processors: List[ImageProcessorInterface]) -> List[ImageProcessorInterface]:
+        """
+        Funde operações pontuais consecutivas em uma única LUT.
+        
+        Args:
+            processors: Processadores na ordem de aplicação
+        
+        Returns:
+            Lista equivalente de estágios
+        """
+        stages: List[ImageProcessorInterface] = []
+        
+        for processor in processors:
+            point_operation = as_point_operation(processor)
+            
+            if point_operation is None:
+                stages.append(processor)
+                continue
+            
+            previous = stages[-1] if stages else None
+            if isinstance(previous, PointOperation) and previous.can_fuse_with(point_operation):
+                stages[-1] = previous.then(point_operation)
+            else:
+                stages.append(point_operation)
+        
+        return stages
+    
+    def process(self, image: Image) -> Image:
+        """
+        Aplica todos os estágios na imagem.
+        
+        Args:
+            image: Imagem de entrada
+        
+        Returns:
+            Imagem processada
+        """
+        for stage in self.stages:
+            image = stage.process(image)
+        
+        return image
+    
+    def at_scale(self, scale: float) -> 'ProcessingPipeline':
+        """Reescala todos os processadores para a resolução do preview."""
+        if scale == 1.0:
+            return self
+        
+        return ProcessingPipeline([processor.at_scale(scale) for processor in self.processors])
+    
+    def describe(self) -> ProcessorDescriptor:
+        """
+        Combina os descritores dos estágios.
+        
+        O halo é a soma dos raios (None se algum estágio é global) e o
+        custo é a soma dos custos, já considerando as LUTs fundidas.
+        """
+        descriptors = [stage.describe() for stage in self.stages]
+        if not descriptors:
+            return ProcessorDescriptor(kind='point', radius=0, point_operation=True,
+                                       in_place=True, cost_per_pixel=0.0)
+        
+        radius = 0
+        for descriptor in descriptors:
+            if descriptor.radius is None:
+                radius = None
+                break
+            radius += descriptor.radius
+        
+        output_channels = None
+        for descriptor in descriptors:
+            if descriptor.output_channels is not None:
+                output_channels = descriptor.output_channels
+        
+        point_operation = all(d.point_operation for d in descriptors)
+        
+        return ProcessorDescriptor(
+            kind='point' if point_operation else 'generic',
+            radius=radius,
+            point_operation=point_operation,
+            input_channels=descriptors[0].input_channels,
+            output_channels=output_channels,
+            output_dtype=descriptors[-1].output_dtype,
+            in_place=all(d.in_place for d in descriptors),
+            cost_per_pixel=sum(d.cost_per_pixel for d in descriptors)
+        )
@@ -0,0 +1,241 @@
+"""
+Implementação de operações pontuais via tabelas de consulta (LUT).
+
+Operações que mapeiam cada valor de pixel de forma independente
+(limiarização, negativo, colorização, gama, brilho/contraste) são
+representadas por uma LUT de 256 entradas, por canal quando necessário.
+LUTs consecutivas podem ser compostas em uma única tabela, aplicada
+com uma só chamada a cv.LUT.
+"""
+from typing import Optional, Sequence
+
+import cv2 as cv
+import numpy as np
+from domain.entities.image import Image
+from domain.entities.processor_descriptor import ProcessorDescriptor
+from domain.interfaces.image_processor import ImageProcessorInterface
+
+
+class PointOperation(ImageProcessorInterface):
+    """Operação pontual representada por uma LUT de 256 entradas."""
+    
+    def __init__(self, lut: np.ndarray, name: str = "lut", to_grayscale: bool = False):
+        """
+        Inicializa a operação pontual.
+        
+        Args:
+            lut: Tabela uint8 com formato (256,) para todos os canais
+                 ou (256, 3) com uma tabela por canal BGR
+            name: Nome da operação (usado no nome da imagem resultante)
+            to_grayscale: Se imagens coloridas são convertidas para
+                          grayscale antes da consulta (como na limiarização)
+        """
+        lut = np.asarray(lut)
+        if lut.shape not in [(256,), (256, 3)]:
+            raise ValueError("LUT must have shape (256,) or (256, 3)")
+        
+        self.lut = np.clip(lut, 0, 255).astype(np.uint8)
+        self.name = name
+        self.to_grayscale = to_grayscale
+        
+        # Formato esperado pelo OpenCV: 256 elementos com 1 ou 3 canais
+        self._cv_lut = self.lut.reshape(1, 256, -1)
+    
+    @property
+    def per_channel(self) -> bool:
+        """Retorna True se há uma tabela diferente por canal."""
+        return self.lut.ndim == 2
+    
+    def process(self, image: Image) -> Image:
+        """
+        Aplica a LUT na imagem com uma única passada.
+        
+        Args:
+            image: Imagem de entrada
+        
+        Returns:
+            Imagem com a operação aplicada
+        """
+        data = image.data
+        
+        if self.to_grayscale and data.ndim == 3:
+            data = cv.cvtColor(data, cv.COLOR_BGR2GRAY)
+        
+        if self.per_channel and data.ndim == 2:
+            # Tabela por canal exige imagem de 3 canais
+            data = cv.cvtColor(data, cv.COLOR_GRAY2BGR)
+        
+        processed_data = cv.LUT(data, self._cv_lut)
+        
+        return Image(
+            data=processed_data,
+            width=image.width,
+            height=image.height,
+            channels=processed_data.shape[2] if processed_data.ndim == 3 else 1,
+            name=f"{image.name}_{self.name}",
+            path=None
+        )
+    
+    def then(self, other: 'PointOperation') -> 'PointOperation':
+        """
+        Compõe esta operação com outra (aplica self e depois other).
+        
+        Args:
+            other: Operação aplicada em seguida
+        
+        Returns:
+            Operação equivalente com uma única LUT
+        
+        Raises:
+            ValueError: Se other converte para grayscale e self não produz
+                        uma imagem em grayscale (a composição não é pontual)
+        """
+        if other.to_grayscale and not self.to_grayscale:
+            raise ValueError(f"Cannot fuse '{self.name}' with grayscale operation '{other.name}'")
+        
+        if not self.per_channel and not other.per_channel:
+            lut = other.lut[self.lut]
+        else:
+            first = self.lut.reshape(256, -1)
+            second = other.lut.reshape(256, -1)
+            channels = max(first.shape[1], second.shape[1])
+            first = np.broadcast_to(first, (256, channels))
+            second = np.broadcast_to(second, (256, channels))
+            lut = np.stack([second[first[:, c], c] for c in range(channels)], axis=1)
+        
+        return PointOperation(
+            lut,
+            name=f"{self.name}+{other.name}",
+            to_grayscale=self.to_grayscale
+        )
+    
+    def can_fuse_with(self, other: 'PointOperation') -> bool:
+        """Retorna True se other pode ser composta após esta operação."""
+        return not other.to_grayscale or self.to_grayscale
+    
+    @classmethod
+    def identity(cls) -> 'PointOperation':
+        """Cria operação identidade."""
+        return cls(np.arange(256, dtype=np.uint8), name="identity")
+    
+    @classmethod
+    def threshold(cls, threshold: int = 127, max_value: int = 255) -> 'PointOperation':
+        """
+        Cria limiarização binária (equivalente a cv.THRESH_BINARY).
+        
+        Args:
+            threshold: Valor de limiar (0-255)
+            max_value: Valor para pixels acima do limiar
+        """
+        values = np.arange(256)
+        lut = np.where(values > threshold, max_value, 0)
+        return cls(lut, name=f"binary_thresh_{threshold}", to_grayscale=True)
+    
+    @classmethod
+    def negative(cls) -> 'PointOperation':
+        """Cria inversão de cores (valor XOR 255)."""
+        return cls(np.arange(256, dtype=np.uint8) ^ 255, name="negative")
+    
+    @classmethod
+    def colorize(cls, color: Sequence[int]) -> 'PointOperation':
+        """
+        Cria colorização por OU bit a bit com uma cor.
+        
+        Args:
+            color: Cor BGR (ex: [0, 0, 255] para vermelho)
+        """
+        values = np.arange(256, dtype=np.uint8)
+        lut = np.stack([values | np.uint8(c) for c in color], axis=1)
+        return cls(lut, name="colorized")
+    
+    @classmethod
+    def gamma(cls, gamma: float) -> 'PointOperation':
+        """
+        Cria correção gama.
+        
+        Args:
+            gamma: Expoente (< 1 clareia, > 1 escurece)
+        """
+        values = np.arange(256) / 255.0
+        lut = np.round(np.power(values, gamma) * 255.0)
+        return cls(lut, name=f"gamma_{gamma}")
+    
+    @classmethod
+    def brightness_contrast(cls, alpha: float = 1.0, beta: float = 0.0) -> 'PointOperation':
+        """
+        Cria ajuste linear de brilho e contraste (alpha * valor + beta).
+        
+        Args:
+            alpha: Ganho (contraste)
+            beta: Deslocamento (brilho)
+        """
+        lut = np.round(np.arange(256) * alpha + beta)
+        return cls(lut, name=f"brightness_{alpha}_{beta}")
+    
+    @classmethod
+    def equalization(cls, image: Image) -> 'PointOperation':
+        """
+        Cria a LUT de equalização de histograma de uma imagem.
+        
+        A tabela depende do histograma da imagem informada, mas depois
+        de criada pode ser composta e reaplicada como qualquer outra.
+        
+        Args:
+            image: Imagem de referência
+        """
+        data = image.data
+        if data.ndim == 3:
+            data = cv.cvtColor(data, cv.COLOR_BGR2GRAY)
+        
+        hist = np.bincount(data.ravel(), minlength=256)
+        cdf = hist.cumsum()
+        cdf_min = cdf[np.nonzero(cdf)[0][0]]
+        total = cdf[-1]
+        
+        if total == cdf_min:
+            lut = np.arange(256)
+        else:
+            lut = np.round((cdf - cdf_min) * 255.0 / (total - cdf_min))
+        
+        return cls(lut, name="equalized", to_grayscale=True)
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Consulta em LUT: pontual e segura para escrita no próprio buffer."""
+        if self.per_channel:
+            output_channels = 3
+        elif self.to_grayscale:
+            output_channels = 1
+        else:
+            output_channels = None
+        
+        return ProcessorDescriptor(
+            kind='point',
+            radius=0,
+            point_operation=True,
+            output_channels=output_channels,
+            in_place=not self.to_grayscale and not self.per_channel,
+            cost_per_pixel=1.0
+        )
+
+
+def as_point_operation(processor: ImageProcessorInterface) -> Optional[PointOperation]:
+    """
+    Retorna a representação em LUT de um processador, se houver.
+    
+    Apenas processadores descritos como pontuais e que expõem o método
+    to_point_operation() são considerados.
+    
+    Args:
+        processor: Processador qualquer
+    
+    Returns:
+        Operação pontual equivalente ou None
+    """
+    if isinstance(processor, PointOperation):
+        return processor
+    
+    to_point_operation = getattr(processor, 'to_point_operation', None)
+    if to_point_operation is None or not processor.describe().point_operation:
+        return None
+    
+    return to_point_operation()
@@ -4,7 +4,10 @@ Implementação de operações de limiarização (thresholding).
 import cv2 as cv
 import numpy as np
 from domain.entities.image import Image
+from domain.entities.processor_descriptor import ProcessorDescriptor
 from domain.interfaces.image_processor import ImageProcessorInterface
+from infrastructure.image_processing.multiresolution import scale_kernel_size
+from infrastructure.image_processing.point_operations import PointOperation
 
 
 class BinaryThresholdProcessor(ImageProcessorInterface):
@@ -48,6 +51,20 @@ class BinaryThresholdProcessor(ImageProcessorInterface):
             name=f"{image.name}_binary_thresh_{self.threshold}",
             path=None
         )
+    
+    def to_point_operation(self) -> PointOperation:
+        """Retorna a limiarização como LUT (permite fusão no pipeline)."""
+        return PointOperation.threshold(self.threshold, self.max_value)
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Operação pontual sobre o grayscale."""
+        return ProcessorDescriptor(
+            kind='point',
+            radius=0,
+            point_operation=True,
+            output_channels=1,
+            cost_per_pixel=1.0
+        )
 
 
 class AdaptiveThresholdProcessor(ImageProcessorInterface):
@@ -106,6 +123,26 @@ class AdaptiveThresholdProcessor(ImageProcessorInterface):
             name=f"{image.name}_adaptive_{self.method}",
             path=None
         )
+    
+    def at_scale(self, scale: float) -> 'AdaptiveThresholdProcessor':
+        """Reescala a vizinhança para a resolução do preview."""
+        if scale == 1.0:
+            return self
+        
+        return AdaptiveThresholdProcessor(
+            block_size=scale_kernel_size(self.block_size, scale, min_size=3),
+            c=self.c,
+            method=self.method
+        )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """Limiar local calculado na vizinhança do bloco."""
+        return ProcessorDescriptor(
+            kind='local',
+            radius=self.block_size // 2,
+            output_channels=1,
+            cost_per_pixel=2.0 * self.block_size + 2
+        )
 
 
 class OtsuThresholdProcessor(ImageProcessorInterface):
@@ -145,3 +182,12 @@ class OtsuThresholdProcessor(ImageProcessorInterface):
             name=f"{image.name}_otsu_thresh_{int(threshold_value)}",
             path=None
         )
+    
+    def describe(self) -> ProcessorDescriptor:
+        """O limiar depende do histograma da imagem inteira."""
+        return ProcessorDescriptor(
+            kind='global',
+            radius=None,
+            output_channels=1,
+            cost_per_pixel=3.0
+        )
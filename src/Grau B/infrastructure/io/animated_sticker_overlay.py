@@ -4,15 +4,35 @@ Sistema de sobreposição de stickers animados sobre faces detectadas.
 Cria efeito tipo Instagram com múltiplos sprites animados.
 """
 
-import cv2
+from dataclasses import dataclass
+
 import numpy as np
-from typing import List, Tuple, Optional
-from pathlib import Path
+from typing import List, Optional
 
-from infrastructure.face_detection import FaceDetector, FacePoint
+from infrastructure.face_detection import FaceDetector
+from infrastructure.image_processing.compositing import PremultipliedImage, ResizeCache, composite
+from infrastructure.image_processing.layer_stack import Tile
 from infrastructure.io.spritesheet_manager import SpritesheetManager
 
 
+@dataclass(frozen=True)
+class AnimatedOverlaySettings:
+    """
+    Parâmetros do efeito lidos de uma só vez.
+    
+    Permite ler o estado alterado pelas teclas sob um lock e gerar os
+    tiles fora dele, em outra thread, com valores consistentes.
+    
+    Attributes:
+        enabled: Se o efeito está ligado
+        sticker_scale: Escala dos stickers em relação à face
+        frame_index: Frame atual da animação (None sem spritesheet)
+    """
+    enabled: bool
+    sticker_scale: float
+    frame_index: Optional[int]
+
+
 class AnimatedStickerOverlay:
     """
     Sobrepõe stickers animados sobre pontos faciais detectados.
@@ -20,10 +40,17 @@ class AnimatedStickerOverlay:
     Efeito tipo filtro do Instagram com múltiplas animações.
     """
     
-    def __init__(self):
-        """Inicializa sistema de overlay de stickers animados."""
-        self.face_detector = FaceDetector()
+    def __init__(self, face_detector: Optional[FaceDetector] = None):
+        """
+        Inicializa sistema de overlay de stickers animados.
+        
+        Args:
+            face_detector: Detector compartilhado (ex: FaceAnalysisService);
+                           se omitido, cria um detector próprio
+        """
+        self.face_detector = face_detector if face_detector is not None else FaceDetector(detection_interval=5, eye_interval=10)
         self.spritesheet_manager = SpritesheetManager()
+        self.resize_cache = ResizeCache()
         self.enabled = False
         
         # Configuração de quais pontos receberão stickers
@@ -46,7 +73,8 @@ class AnimatedStickerOverlay:
         spritesheet_path: str,
         frame_width: int = 32,
         frame_height: int = 32,
-        fps: int = 12
+        fps: int = 12,
+        frame_count: Optional[int] = None
     ) -> bool:
         """
         Carrega spritesheet animado.
@@ -56,6 +84,7 @@ class AnimatedStickerOverlay:
             frame_width: Largura de cada frame
             frame_height: Altura de cada frame
             fps: Frames por segundo
+            frame_count: Frames usados da grade (None = todos)
             
         Returns:
             True se carregou com sucesso
@@ -66,134 +95,131 @@ class AnimatedStickerOverlay:
             frame_width=frame_width,
             frame_height=frame_height,
             fps=fps,
-            loop=True
+            loop=True,
+            frame_count=frame_count
         )
         
         if success:
+            self.resize_cache.clear()
             self.enabled = True
             print(f"🎭 Stickers animados habilitados!")
         
         return success
     
-    def _overlay_sprite(
+    def _place_sprites(
         self,
-        background: np.ndarray,
-        sprite: np.ndarray,
-        position: Tuple[int, int],
-        scale: float = 1.0
-    ) -> np.ndarray:
+        sprite: PremultipliedImage,
+        centers: np.ndarray
+    ) -> List[Tile]:
         """
-        Sobrepõe sprite sobre background com transparência.
+        Posiciona todas as instâncias de um sprite.
         
         Args:
-            background: Imagem de fundo
-            sprite: Sprite com canal alfa
-            position: Posição (x, y) do centro do sprite
-            scale: Escala do sprite
+            sprite: Sprite com alfa pré-multiplicado, já no tamanho final
+            centers: Posições (N, 2) dos centros dos sprites
             
         Returns:
-            Imagem com sprite sobreposto
+            Tiles (x, y, sprite) de cada instância
         """
-        x_center, y_center = position
-        
-        # Redimensiona sprite se necessário
-        if scale != 1.0:
-            new_width = int(sprite.shape[1] * scale)
-            new_height = int(sprite.shape[0] * scale)
-            sprite = cv2.resize(sprite, (new_width, new_height), interpolation=cv2.INTER_AREA)
-        
-        sprite_h, sprite_w = sprite.shape[:2]
+        # Cantos superiores esquerdos de todas as instâncias de uma vez
+        corners = centers - (sprite.width // 2, sprite.height // 2)
         
-        # Calcula posição do canto superior esquerdo
-        x = x_center - sprite_w // 2
-        y = y_center - sprite_h // 2
-        
-        # Verifica limites
-        bg_h, bg_w = background.shape[:2]
-        
-        if x >= bg_w or y >= bg_h or x + sprite_w <= 0 or y + sprite_h <= 0:
-            return background  # Sprite fora da imagem
+        return [(x, y, sprite) for x, y in corners.tolist()]
+    
+    def apply(self, image: np.ndarray) -> np.ndarray:
+        """
+        Aplica stickers animados sobre faces detectadas.
         
-        # Ajusta recortes se sprite estiver parcialmente fora
-        sprite_x1 = max(0, -x)
-        sprite_y1 = max(0, -y)
-        sprite_x2 = min(sprite_w, bg_w - x)
-        sprite_y2 = min(sprite_h, bg_h - y)
+        Todas as instâncias de todas as faces são compostas em um único
+        buffer de saída.
         
-        bg_x1 = max(0, x)
-        bg_y1 = max(0, y)
-        bg_x2 = bg_x1 + (sprite_x2 - sprite_x1)
-        bg_y2 = bg_y1 + (sprite_y2 - sprite_y1)
+        Args:
+            image: Imagem BGR de entrada
+            
+        Returns:
+            Imagem com stickers animados
+        """
+        tiles = self.tiles(image)
         
-        # Recorta sprite e área de fundo
-        sprite_crop = sprite[sprite_y1:sprite_y2, sprite_x1:sprite_x2]
-        bg_crop = background[bg_y1:bg_y2, bg_x1:bg_x2]
+        if not tiles:
+            return image
         
-        # Se sprite não tem canal alfa, adiciona um
-        if sprite_crop.shape[2] == 3:
-            # Sem canal alfa, usa preto como transparente
-            alpha = np.all(sprite_crop != [0, 0, 0], axis=-1).astype(float)
-            sprite_crop = np.dstack([sprite_crop, alpha * 255])
+        result = image.copy()
         
-        # Extrai canal alfa e normaliza
-        alpha = sprite_crop[:, :, 3] / 255.0
-        alpha = np.stack([alpha] * 3, axis=-1)
+        for x, y, sprite in tiles:
+            composite(result, sprite, x, y)
         
-        # Combina com transparência
-        blended = (sprite_crop[:, :, :3] * alpha + bg_crop * (1 - alpha)).astype(np.uint8)
+        return result
+    
+    def settings(self) -> AnimatedOverlaySettings:
+        """
+        Lê os parâmetros atuais do efeito (incluindo o frame da animação).
         
-        # Copia de volta para o background
-        result = background.copy()
-        result[bg_y1:bg_y2, bg_x1:bg_x2] = blended
+        Returns:
+            Parâmetros para tiles()
+        """
+        sprite = self.spritesheet_manager.spritesheets.get("main_sprite")
         
-        return result
+        return AnimatedOverlaySettings(
+            enabled=self.enabled,
+            sticker_scale=self.sticker_scale,
+            frame_index=sprite.atlas.current_index() if sprite is not None else None
+        )
     
-    def apply(self, image: np.ndarray) -> np.ndarray:
+    def tiles(self, image: np.ndarray, settings: Optional[AnimatedOverlaySettings] = None) -> List[Tile]:
         """
-        Aplica stickers animados sobre faces detectadas.
+        Gera os tiles dos stickers animados, sem modificar a imagem.
         
         Args:
             image: Imagem BGR de entrada
+            settings: Parâmetros lidos antes com settings() (None = atuais)
             
         Returns:
-            Imagem com stickers animados
+            Lista de tiles (x, y, sprite) para a LayerStack
         """
-        if not self.enabled:
-            return image
+        if settings is None:
+            settings = self.settings()
         
-        # Detecta faces e pontos
-        faces_with_points = self.face_detector.detect_with_points(image)
+        if not settings.enabled or settings.frame_index is None:
+            return []
         
-        if not faces_with_points:
-            return image
+        # Detecta faces e pontos: (K, 4) e (K, P, 2)
+        face_rects, face_points = self.face_detector.detect_with_points_array(image)
         
-        result = image.copy()
+        if len(face_rects) == 0:
+            return []
         
-        # Para cada face detectada
-        for face_rect, face_points in faces_with_points:
-            x, y, w, h = face_rect
-            
-            # Calcula tamanho do sticker baseado no tamanho da face
-            face_size = max(w, h)
-            sticker_size_scale = self.sticker_scale * face_size / 64  # 64 = tamanho padrão do frame
-            
-            # Obtém frame atual da animação
-            sprite_frame = self.spritesheet_manager.get_current_frame("main_sprite")
-            
-            if sprite_frame is None:
-                continue
+        # Frame da animação (o mesmo para todas as faces)
+        frame_index = settings.frame_index
+        sprite_frame = self.spritesheet_manager.spritesheets["main_sprite"].atlas.overlay(frame_index)
+        
+        # Pontos de interesse que recebem sticker, selecionados por índice: (K, S, 2)
+        point_indices = [
+            FaceDetector.FACE_POINT_INDEX[name]
+            for name in self.sticker_points
+            if name in FaceDetector.FACE_POINT_INDEX
+        ]
+        
+        if not point_indices:
+            return []
+        
+        centers = face_points[:, point_indices]
+        
+        # Tamanho do sticker de cada face, calculado em lote
+        face_sizes = face_rects[:, 2:4].max(axis=1)
+        scales = settings.sticker_scale * face_sizes / 64  # 64 = tamanho padrão do frame
+        widths = (sprite_frame.width * scales).astype(np.int32)
+        heights = (sprite_frame.height * scales).astype(np.int32)
+        
+        tiles = []
+        
+        for face_centers, width, height in zip(centers, widths.tolist(), heights.tolist()):
+            # Redimensiona uma única vez por face (em cache por frame e tamanho)
+            sprite = self.resize_cache.get(("main_sprite", frame_index), sprite_frame, width, height)
             
-            # Aplica sticker em cada ponto de interesse
-            for point in face_points:
-                if point.name in self.sticker_points:
-                    result = self._overlay_sprite(
-                        result,
-                        sprite_frame,
-                        (point.x, point.y),
-                        scale=sticker_size_scale
-                    )
+            tiles.extend(self._place_sprites(sprite, face_centers))
         
-        return result
+        return tiles
     
     def toggle(self):
         """Liga/desliga o efeito de stickers animados."""
@@ -220,6 +246,5 @@ class AnimatedStickerOverlay:
         """
         sprite = self.spritesheet_manager.spritesheets.get("main_sprite")
         if sprite:
-            sprite.fps = fps
-            sprite.frame_duration = 1.0 / fps
+            sprite.set_fps(fps)
             print(f"⏱️ FPS da animação: {fps}")
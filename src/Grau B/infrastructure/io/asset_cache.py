@@ -0,0 +1,366 @@
+"""
+Cache persistente de assets pré-processados.
+
+Assets já decodificados e redimensionados (stickers, spritesheets,
+filtros) ficam em um único arquivo binário (bundle), acompanhado de um
+manifesto JSON com a data de modificação e o tamanho de cada arquivo
+fonte. Nas execuções seguintes, os arrays são views de um mapeamento em
+memória do bundle: abrir um editor não decodifica nenhum PNG.
+
+Cada gravação cria uma nova geração (identificador aleatório) em um
+arquivo próprio, bundle_<geração>.bin, e só então troca o manifesto, que
+aponta para ela. O bundle em uso nunca é sobrescrito (no Windows, um
+arquivo mapeado não pode ser substituído); gerações antigas são apagadas
+quando deixam de estar mapeadas. O bundle começa com um cabeçalho com a
+geração, e o manifesto guarda também seu tamanho: um bundle truncado ou
+que não corresponde ao manifesto é ignorado, e os assets voltam a ser
+decodificados.
+"""
+
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2 as cv
+import numpy as np
+
+
+# Decodificador de um asset: recebe o arquivo fonte e devolve o array (ou None)
+Decoder = Callable[[Path], Optional[np.ndarray]]
+
+
+class AssetCache:
+    """
+    Bundle mapeado em memória com assets pré-processados.
+    
+    O bundle e o manifesto só são abertos no primeiro acesso. Assets
+    novos ou desatualizados são decodificados normalmente e gravados no
+    bundle em flush().
+    """
+    
+    VERSION = 3
+    
+    # Alinhamento (bytes) do início de cada array dentro do bundle
+    ALIGNMENT = 64
+    
+    # Prefixo do cabeçalho do bundle (seguido da geração)
+    MAGIC = b"ASSETBUNDLE"
+    
+    def __init__(self, cache_dir: str = "assets/cache/assets", max_workers: int = 4):
+        """
+        Inicializa o cache.
+        
+        Args:
+            cache_dir: Diretório do bundle e do manifesto
+            max_workers: Threads usadas no carregamento em paralelo
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_workers = max_workers
+        self.hits = 0
+        self.misses = 0
+        
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._bundle: Optional[np.memmap] = None
+        self._bundle_path: Optional[Path] = None
+        self._entries: Dict[str, dict] = {}
+        self._pending: Dict[str, Tuple[dict, np.ndarray]] = {}
+    
+    def bundle_path(self, generation: str) -> Path:
+        """Arquivo binário com os arrays de uma geração."""
+        return self.cache_dir / f"bundle_{generation}.bin"
+    
+    @property
+    def manifest_path(self) -> Path:
+        """Manifesto com a descrição de cada array do bundle."""
+        return self.cache_dir / "manifest.json"
+    
+    @staticmethod
+    def make_key(kind: str, path: Path, **params) -> str:
+        """
+        Monta a chave de um asset.
+        
+        Args:
+            kind: Tipo do asset (ex: 'sticker')
+            path: Arquivo fonte
+            **params: Parâmetros do pré-processamento (ex: tamanho máximo)
+        
+        Returns:
+            Chave única do asset processado
+        """
+        options = ",".join(f"{name}={params[name]}" for name in sorted(params))
+        return f"{kind}:{path.resolve()}:{options}"
+    
+    def get(self, kind: str, path: str, decode: Decoder, **params) -> Optional[np.ndarray]:
+        """
+        Retorna um asset pré-processado, decodificando apenas se necessário.
+        
+        Args:
+            kind: Tipo do asset (ex: 'sticker')
+            path: Arquivo fonte
+            decode: Função que decodifica e pré-processa o arquivo fonte
+            **params: Parâmetros do pré-processamento (fazem parte da chave)
+        
+        Returns:
+            Array do asset (somente leitura se veio do bundle) ou None
+        """
+        source = Path(path)
+        try:
+            stat = source.stat()
+        except OSError:
+            return None
+        
+        key = self.make_key(kind, source, **params)
+        
+        with self._lock:
+            self._load()
+            
+            entry = self._entries.get(key)
+            if entry is not None and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+                array = self._view(entry)
+                if array is not None:
+                    self.hits += 1
+                    return array
+                
+                # Entrada inconsistente com o bundle: decodifica de novo
+                del self._entries[key]
+            
+            pending = self._pending.get(key)
+            if pending is not None:
+                return pending[1]
+        
+        array = decode(source)
+        if array is None:
+            return None
+        
+        with self._lock:
+            self.misses += 1
+            entry = {
+                "source": str(source.resolve()),
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "shape": list(array.shape),
+                "dtype": array.dtype.str
+            }
+            self._pending[key] = (entry, np.ascontiguousarray(array))
+        
+        return array
+    
+    def get_many(self, jobs: List[Tuple[str, str, Decoder, dict]]) -> List[Optional[np.ndarray]]:
+        """
+        Carrega vários assets em paralelo (o OpenCV libera o GIL ao decodificar).
+        
+        Args:
+            jobs: Tuplas (kind, path, decode, params) como em get()
+        
+        Returns:
+            Arrays na mesma ordem dos pedidos
+        """
+        if len(jobs) <= 1:
+            return [self.get(kind, path, decode, **params) for kind, path, decode, params in jobs]
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [
+                executor.submit(self.get, kind, path, decode, **params)
+                for kind, path, decode, params in jobs
+            ]
+            return [future.result() for future in futures]
+    
+    def flush(self) -> bool:
+        """
+        Grava os assets novos no bundle (reescrito junto com os válidos).
+        
+        Returns:
+            True se o bundle foi regravado
+        """
+        with self._lock:
+            if not self._pending:
+                return False
+            
+            arrays: List[Tuple[str, dict, np.ndarray]] = [
+                (key, entry, self._view(entry))
+                for key, entry in self._entries.items()
+                if key not in self._pending and self._is_current(entry)
+            ]
+            arrays = [(key, entry, array) for key, entry, array in arrays if array is not None]
+            arrays += [(key, entry, array) for key, (entry, array) in self._pending.items()]
+            
+            entries = {}
+            generation = uuid.uuid4().hex
+            bundle_path = self.bundle_path(generation)
+            manifest_tmp = self.manifest_path.with_suffix(".tmp")
+            
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                
+                # Arquivo novo: o bundle atual (mapeado) não é tocado
+                with open(bundle_path, "wb") as bundle:
+                    bundle.write(self._header(generation))
+                    for key, entry, array in arrays:
+                        # Alinha o início de cada array
+                        bundle.write(b"\0" * (-bundle.tell() % self.ALIGNMENT))
+                        entries[key] = dict(entry, offset=bundle.tell())
+                        bundle.write(np.ascontiguousarray(array).tobytes())
+                    bundle_size = bundle.tell()
+                
+                with open(manifest_tmp, "w") as manifest:
+                    json.dump({
+                        "version": self.VERSION,
+                        "generation": generation,
+                        "bundle": bundle_path.name,
+                        "bundle_size": bundle_size,
+                        "entries": entries
+                    }, manifest, indent=1)
+                
+                # Troca atômica do manifesto: passa a apontar para a nova geração
+                os.replace(manifest_tmp, self.manifest_path)
+            except OSError as e:
+                print(f"⚠️ Não foi possível gravar o cache de assets: {e}")
+                self._remove_stale_bundles()
+                return False
+            
+            # Views da geração anterior continuam válidas (arquivo mapeado)
+            self._entries = entries
+            self._pending.clear()
+            self._bundle_path = bundle_path
+            self._bundle = self._map_bundle(bundle_path)
+            self._remove_stale_bundles()
+            return True
+    
+    def _load(self):
+        """Abre o manifesto e mapeia o bundle (apenas no primeiro acesso)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        
+        self._open_bundle()
+        
+        # Gerações de execuções anteriores que não são mais usadas
+        self._remove_stale_bundles()
+    
+    def _open_bundle(self):
+        """Lê o manifesto e mapeia a geração apontada, se for consistente."""
+        try:
+            with open(self.manifest_path) as manifest:
+                data = json.load(manifest)
+        except (OSError, ValueError):
+            return
+        
+        if not isinstance(data, dict) or data.get("version") != self.VERSION:
+            return
+        
+        generation = str(data.get("generation"))
+        bundle_path = self.bundle_path(generation)
+        if data.get("bundle") != bundle_path.name:
+            return
+        
+        bundle = self._map_bundle(bundle_path)
+        if bundle is None or bundle.size != data.get("bundle_size"):
+            print("⚠️ Cache de assets incompleto; os assets serão decodificados.")
+            return
+        
+        header = self._header(generation)
+        if bytes(bundle[:len(header)]) != header:
+            print("⚠️ Cache de assets não corresponde ao manifesto; os assets serão decodificados.")
+            return
+        
+        self._bundle = bundle
+        self._bundle_path = bundle_path
+        self._entries = data.get("entries", {})
+    
+    @staticmethod
+    def _map_bundle(bundle_path: Path) -> Optional[np.memmap]:
+        """Mapeia o bundle em memória (somente leitura)."""
+        try:
+            if bundle_path.stat().st_size == 0:
+                return None
+            return np.memmap(bundle_path, dtype=np.uint8, mode="r")
+        except (OSError, ValueError):
+            return None
+    
+    def _remove_stale_bundles(self):
+        """
+        Apaga gerações e temporários que não são o bundle atual.
+        
+        Um arquivo ainda mapeado (views antigas, no Windows) não pode ser
+        apagado: fica para uma próxima execução.
+        """
+        if not self.cache_dir.is_dir():
+            return
+        
+        stale = list(self.cache_dir.glob("bundle*.bin")) + list(self.cache_dir.glob("*.tmp"))
+        for path in stale:
+            if path == self._bundle_path:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass
+    
+    def _header(self, generation: str) -> bytes:
+        """Cabeçalho do bundle de uma geração (ocupa um bloco alinhado)."""
+        return (self.MAGIC + b":" + generation.encode()).ljust(self.ALIGNMENT, b"\0")[:self.ALIGNMENT]
+    
+    def _view(self, entry: dict) -> Optional[np.ndarray]:
+        """Cria a view de um array do bundle, sem cópia (None se fora do bundle)."""
+        if self._bundle is None:
+            return None
+        
+        try:
+            dtype = np.dtype(entry["dtype"])
+            shape = tuple(int(size) for size in entry["shape"])
+            offset = int(entry["offset"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        
+        count = int(np.prod(shape)) * dtype.itemsize
+        if offset < self.ALIGNMENT or offset + count > self._bundle.size:
+            return None
+        
+        data = self._bundle[offset:offset + count]
+        return data.view(dtype).reshape(shape)
+    
+    @staticmethod
+    def _is_current(entry: dict) -> bool:
+        """Verifica se o arquivo fonte de uma entrada não mudou."""
+        try:
+            stat = os.stat(entry["source"])
+        except OSError:
+            return False
+        return (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size)
+
+
+def read_unchanged(path: Path) -> Optional[np.ndarray]:
+    """
+    Decodificador padrão: lê a imagem como está (mantém o canal alfa).
+    
+    Args:
+        path: Arquivo de imagem
+    
+    Returns:
+        Imagem ou None se não pôde ser lida
+    """
+    return cv.imread(str(path), cv.IMREAD_UNCHANGED)
+
+
+_shared_cache: Optional[AssetCache] = None
+_shared_lock = threading.Lock()
+
+
+def shared_asset_cache() -> AssetCache:
+    """
+    Retorna o cache de assets do processo (criado no primeiro uso).
+    
+    Returns:
+        Instância compartilhada por todos os editores
+    """
+    global _shared_cache
+    
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = AssetCache()
+        return _shared_cache
@@ -4,12 +4,13 @@ Filtro de cachorro estilo Snapchat.
 Sobrepõe imagem completa de cachorro (orelhas + nariz) mapeada no rosto detectado.
 """
 
-import cv2
 import numpy as np
-from typing import Tuple, Optional
-from pathlib import Path
+from typing import List, Tuple, Optional
 
 from infrastructure.face_detection import FaceDetector
+from infrastructure.image_processing.compositing import PremultipliedImage, ResizeCache, composite
+from infrastructure.image_processing.layer_stack import Tile
+from infrastructure.io.asset_cache import AssetCache, read_unchanged, shared_asset_cache
 
 
 class DogFilterOverlay:
@@ -19,14 +20,32 @@ class DogFilterOverlay:
     Efeito tipo filtro do Snapchat/Instagram.
     """
     
-    def __init__(self):
-        """Inicializa filtro de cachorro."""
-        self.face_detector = FaceDetector()
+    def __init__(
+        self,
+        face_detector: Optional[FaceDetector] = None,
+        asset_cache: Optional[AssetCache] = None
+    ):
+        """
+        Inicializa filtro de cachorro.
+        
+        Args:
+            face_detector: Detector compartilhado (ex: FaceAnalysisService);
+                           se omitido, cria um detector próprio
+            asset_cache: Cache de assets decodificados (padrão: o do processo)
+        """
+        self.face_detector = face_detector if face_detector is not None else FaceDetector(detection_interval=5, eye_interval=10)
         self.enabled = False
+        self.asset_cache = asset_cache if asset_cache is not None else shared_asset_cache()
         
         # Imagem completa do filtro (orelhas + nariz)
         self.dog_overlay: Optional[np.ndarray] = None
         
+        # Mesma imagem com alfa pré-multiplicado (convertida no carregamento)
+        self.overlay_asset: Optional[PremultipliedImage] = None
+        
+        # Versões redimensionadas do filtro (o tamanho da face varia pouco)
+        self.resize_cache = ResizeCache()
+        
     def load_filter(self, filter_path: str) -> bool:
         """
         Carrega imagem do filtro de cachorro.
@@ -39,7 +58,7 @@ class DogFilterOverlay:
         """
         try:
             # Carrega imagem com canal alfa (RGBA)
-            self.dog_overlay = cv2.imread(filter_path, cv2.IMREAD_UNCHANGED)
+            self.dog_overlay = self.asset_cache.get("dog_filter", filter_path, read_unchanged)
             
             if self.dog_overlay is None:
                 print(f"❌ Erro ao carregar filtro: {filter_path}")
@@ -50,6 +69,8 @@ class DogFilterOverlay:
                 print("⚠️ Imagem deve ter canal alfa (PNG com transparência)")
                 return False
             
+            self.overlay_asset = PremultipliedImage.from_bgra(self.dog_overlay)
+            self.resize_cache.clear()
             self.enabled = True
             print(f"🐶 Filtro de cachorro carregado! ({self.dog_overlay.shape[1]}x{self.dog_overlay.shape[0]})")
             return True
@@ -68,18 +89,41 @@ class DogFilterOverlay:
         Returns:
             Imagem com filtro aplicado
         """
-        if not self.enabled or self.dog_overlay is None:
+        tiles = self.tiles(image)
+        
+        if not tiles:
             return image
         
+        result = image.copy()
+        
+        for x, y, overlay in tiles:
+            composite(result, overlay, x, y)
+        
+        return result
+    
+    def tiles(self, image: np.ndarray, enabled: Optional[bool] = None) -> List[Tile]:
+        """
+        Gera os tiles do filtro para cada face, sem modificar a imagem.
+        
+        Args:
+            image: Imagem de entrada (BGR)
+            enabled: Estado lido antes (ex: sob um lock); None = atual
+            
+        Returns:
+            Lista de tiles (x, y, overlay) para a LayerStack
+        """
+        if enabled is None:
+            enabled = self.enabled
+        
+        if not enabled or self.overlay_asset is None:
+            return []
+        
         # Detecta faces
         faces = self.face_detector.detect_faces(image)
         
-        if len(faces) == 0:
-            return image
-        
-        result = image.copy()
+        tiles = []
         
-        # Aplica filtro em cada face detectada
+        # Posiciona filtro em cada face detectada
         for face_rect in faces:
             x, y, w, h = face_rect
             
@@ -93,95 +137,40 @@ class DogFilterOverlay:
             overlay_x = x + w // 2
             overlay_y = y + int(h * 0.35)  # Centro vertical ajustado
             
-            result = self._overlay_filter(
-                result,
+            tiles.append(self._filter_tile(
                 (overlay_x, overlay_y),
                 overlay_width,
                 overlay_height
-            )
+            ))
         
-        return result
+        return tiles
     
-    def _overlay_filter(
+    def _filter_tile(
         self,
-        background: np.ndarray,
         center_position: Tuple[int, int],
         width: int,
         height: int
-    ) -> np.ndarray:
+    ) -> Tile:
         """
-        Sobrepõe filtro completo na posição especificada.
+        Posiciona o filtro completo centralizado no ponto especificado.
         
         Args:
-            background: Imagem de fundo
             center_position: Posição (x, y) do centro
             width: Largura do overlay
             height: Altura do overlay
             
         Returns:
-            Imagem com filtro sobreposto
+            Tile (x, y, overlay) com o filtro redimensionado
         """
-        if self.dog_overlay is None:
-            return background
+        # Redimensiona overlay para o tamanho da face
+        overlay_resized = self.resize_cache.get("dog_filter", self.overlay_asset, width, height)
         
         x_center, y_center = center_position
-        
-        # Redimensiona overlay mantendo proporção
-        overlay_resized = cv2.resize(
-            self.dog_overlay,
-            (width, height),
-            interpolation=cv2.INTER_AREA
+        return (
+            x_center - overlay_resized.width // 2,
+            y_center - overlay_resized.height // 2,
+            overlay_resized
         )
-        
-        # Calcula posição do canto superior esquerdo
-        x1 = x_center - width // 2
-        y1 = y_center - height // 2
-        x2 = x1 + width
-        y2 = y1 + height
-        
-        # Verifica limites da imagem
-        if x1 >= background.shape[1] or y1 >= background.shape[0]:
-            return background
-        if x2 <= 0 or y2 <= 0:
-            return background
-        
-        # Ajusta para limites da imagem
-        overlay_x1 = max(0, -x1)
-        overlay_y1 = max(0, -y1)
-        overlay_x2 = width - max(0, x2 - background.shape[1])
-        overlay_y2 = height - max(0, y2 - background.shape[0])
-        
-        bg_x1 = max(0, x1)
-        bg_y1 = max(0, y1)
-        bg_x2 = min(background.shape[1], x2)
-        bg_y2 = min(background.shape[0], y2)
-        
-        # Extrai região de interesse
-        roi = background[bg_y1:bg_y2, bg_x1:bg_x2]
-        overlay_crop = overlay_resized[overlay_y1:overlay_y2, overlay_x1:overlay_x2]
-        
-        if roi.shape[0] == 0 or roi.shape[1] == 0:
-            return background
-        if overlay_crop.shape[0] == 0 or overlay_crop.shape[1] == 0:
-            return background
-        
-        # Garante que ROI e overlay têm o mesmo tamanho
-        if roi.shape[:2] != overlay_crop.shape[:2]:
-            return background
-        
-        # Separa canal alfa
-        overlay_bgr = overlay_crop[:, :, :3]
-        alpha = overlay_crop[:, :, 3] / 255.0
-        
-        # Expande alpha para 3 canais
-        alpha_3ch = np.stack([alpha, alpha, alpha], axis=2)
-        
-        # Alpha blending
-        blended = (alpha_3ch * overlay_bgr + (1 - alpha_3ch) * roi).astype(np.uint8)
-        
-        background[bg_y1:bg_y2, bg_x1:bg_x2] = blended
-        
-        return background
     
     def toggle(self):
         """Liga/desliga filtro."""
@@ -0,0 +1,171 @@
+"""
+Atlas de frames de animação.
+
+Todos os frames de uma animação são decodificados uma única vez em um
+array contíguo (N, H, W, 4) BGRA (possivelmente mapeado do cache de
+assets); a versão pré-multiplicada de cada frame é criada no primeiro
+uso. O frame exibido é calculado a partir do
+relógio, e não do número de chamadas, de modo que a animação mantém a
+velocidade correta mesmo quando o laço de renderização perde frames.
+"""
+
+import time
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from infrastructure.image_processing.compositing import PremultipliedImage, premultiply, to_bgra
+
+
+class SpriteAtlas:
+    """Frames de uma animação em um único array, indexados pelo tempo."""
+    
+    def __init__(
+        self,
+        frames: np.ndarray,
+        fps: float = 10,
+        loop: bool = True,
+        clock: Callable[[], float] = time.perf_counter
+    ):
+        """
+        Inicializa o atlas.
+        
+        Args:
+            frames: Frames BGRA (N, H, W, 4) uint8
+            fps: Frames por segundo da animação
+            loop: Se a animação repete (senão para no último frame)
+            clock: Função que retorna o tempo atual em segundos (injetável
+                   para renderização determinística)
+        """
+        if frames.ndim != 4 or frames.shape[3] != 4 or len(frames) == 0:
+            raise ValueError("Frames must have shape (N, H, W, 4) with N >= 1")
+        
+        self.frames = np.ascontiguousarray(frames, dtype=np.uint8)
+        self.loop = loop
+        self.clock = clock
+        self.fps = float(fps)
+        self.start_time = clock()
+        
+        # Versões pré-multiplicadas, criadas sob demanda (abrir o editor não
+        # paga a conversão de frames que ainda não foram exibidos)
+        self._overlays: List[Optional[PremultipliedImage]] = [None] * len(self.frames)
+    
+    @classmethod
+    def from_grid(
+        cls,
+        sheet: np.ndarray,
+        frame_width: int,
+        frame_height: int,
+        frame_count: Optional[int] = None,
+        black_is_transparent: bool = True,
+        **kwargs
+    ) -> 'SpriteAtlas':
+        """
+        Decodifica um spritesheet em grade (linhas x colunas).
+        
+        Os frames são lidos linha por linha, da esquerda para a direita.
+        
+        Args:
+            sheet: Imagem completa do spritesheet
+            frame_width: Largura de cada frame
+            frame_height: Altura de cada frame
+            frame_count: Número de frames usados (None = grade inteira)
+            black_is_transparent: Em folhas sem alfa, trata preto como transparente
+            **kwargs: Repassados ao construtor (fps, loop, clock)
+        
+        Returns:
+            Atlas com os frames da grade
+        """
+        rows = sheet.shape[0] // frame_height
+        cols = sheet.shape[1] // frame_width
+        if rows == 0 or cols == 0:
+            raise ValueError("Frame size is larger than the spritesheet")
+        
+        bgra = to_bgra(sheet, black_is_transparent)
+        grid = bgra[:rows * frame_height, :cols * frame_width]
+        
+        # (rows, H, cols, W, 4) -> (rows, cols, H, W, 4) -> (N, H, W, 4)
+        frames = grid.reshape(rows, frame_height, cols, frame_width, 4)
+        frames = frames.transpose(0, 2, 1, 3, 4).reshape(-1, frame_height, frame_width, 4)
+        
+        if frame_count is not None:
+            frames = frames[:max(1, frame_count)]
+        
+        return cls(frames, **kwargs)
+    
+    @property
+    def frame_count(self) -> int:
+        """Número de frames."""
+        return len(self.frames)
+    
+    @property
+    def frame_width(self) -> int:
+        """Largura de cada frame."""
+        return self.frames.shape[2]
+    
+    @property
+    def frame_height(self) -> int:
+        """Altura de cada frame."""
+        return self.frames.shape[1]
+    
+    def index_at(self, now: float) -> int:
+        """
+        Calcula o frame exibido em um instante.
+        
+        Args:
+            now: Instante, na mesma base do relógio
+        
+        Returns:
+            Índice floor((now - t0) * fps), com repetição ou parada no último
+        """
+        index = int(np.floor((now - self.start_time) * self.fps))
+        
+        if self.loop:
+            return index % self.frame_count
+        return min(max(index, 0), self.frame_count - 1)
+    
+    def current_index(self) -> int:
+        """Retorna o índice do frame atual segundo o relógio."""
+        return self.index_at(self.clock())
+    
+    def frame(self, index: int) -> np.ndarray:
+        """Retorna um frame BGRA (view, sem cópia)."""
+        return self.frames[index]
+    
+    def overlay(self, index: int) -> PremultipliedImage:
+        """Retorna um frame pronto para composição (convertido no primeiro uso)."""
+        overlay = self._overlays[index]
+        
+        if overlay is None:
+            color, alpha = premultiply(self.frames[index])
+            overlay = PremultipliedImage(color, alpha)
+            overlay.regions  # Análise de alfa feita uma vez por frame
+            self._overlays[index] = overlay
+        
+        return overlay
+    
+    @property
+    def overlays(self) -> List[PremultipliedImage]:
+        """Todos os frames prontos para composição."""
+        return [self.overlay(i) for i in range(self.frame_count)]
+    
+    def set_fps(self, fps: float):
+        """
+        Altera a velocidade sem saltar de frame.
+        
+        Args:
+            fps: Novos frames por segundo
+        """
+        now = self.clock()
+        position = (now - self.start_time) * self.fps
+        self.fps = float(fps)
+        self.start_time = now - position / self.fps
+    
+    def reset(self):
+        """Reinicia a animação a partir do primeiro frame."""
+        self.start_time = self.clock()
+    
+    @property
+    def nbytes(self) -> int:
+        """Memória ocupada pelos frames e suas versões pré-multiplicadas."""
+        return self.frames.nbytes + sum(overlay.nbytes for overlay in self._overlays if overlay is not None)
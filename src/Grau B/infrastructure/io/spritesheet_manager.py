@@ -4,12 +4,15 @@ Gerenciador de spritesheets animados.
 Permite carregar e animar spritesheets com múltiplos frames.
 """
 
-import cv2
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Optional
 from pathlib import Path
 import time
 
+from infrastructure.image_processing.compositing import PremultipliedImage
+from infrastructure.io.asset_cache import AssetCache, read_unchanged, shared_asset_cache
+from infrastructure.io.sprite_atlas import SpriteAtlas
+
 
 class AnimatedSprite:
     """Representa um sprite animado."""
@@ -20,77 +23,96 @@ class AnimatedSprite:
         frame_width: int, 
         frame_height: int,
         fps: int = 10,
-        loop: bool = True
+        loop: bool = True,
+        frame_count: Optional[int] = None,
+        clock: Callable[[], float] = time.perf_counter
     ):
         """
         Inicializa sprite animado.
         
         Args:
-            spritesheet: Imagem completa do spritesheet
+            spritesheet: Imagem completa do spritesheet (grade linhas x colunas)
             frame_width: Largura de cada frame
             frame_height: Altura de cada frame
             fps: Frames por segundo da animação
             loop: Se a animação deve repetir
+            frame_count: Número de frames usados da grade (None = todos)
+            clock: Relógio em segundos (injetável para renderização offline)
         """
         self.spritesheet = spritesheet
         self.frame_width = frame_width
         self.frame_height = frame_height
-        self.fps = fps
-        self.loop = loop
         
-        # Extrai frames do spritesheet
-        self.frames = self._extract_frames()
+        # Decodifica a grade uma única vez em um atlas (N, H, W, 4)
+        # (sem canal alfa, preto é tratado como transparente)
+        self.atlas = SpriteAtlas.from_grid(
+            spritesheet,
+            frame_width,
+            frame_height,
+            frame_count=frame_count,
+            fps=fps,
+            loop=loop,
+            clock=clock
+        )
+        self.frames = self.atlas.frames
         self.current_frame = 0
-        self.last_update = time.time()
-        self.frame_duration = 1.0 / fps
+    
+    @property
+    def overlays(self) -> List[PremultipliedImage]:
+        """Todos os frames prontos para composição."""
+        return self.atlas.overlays
+    
+    @property
+    def fps(self) -> float:
+        """Frames por segundo da animação."""
+        return self.atlas.fps
+    
+    @property
+    def frame_duration(self) -> float:
+        """Duração de cada frame, em segundos."""
+        return 1.0 / self.atlas.fps
+    
+    @property
+    def loop(self) -> bool:
+        """Se a animação repete."""
+        return self.atlas.loop
+    
+    def set_fps(self, fps: float):
+        """
+        Ajusta a velocidade da animação sem saltar de frame.
         
-    def _extract_frames(self) -> List[np.ndarray]:
+        Args:
+            fps: Frames por segundo
+        """
+        self.atlas.set_fps(fps)
+    
+    def get_current_overlay(self) -> PremultipliedImage:
         """
-        Extrai frames individuais do spritesheet.
+        Retorna o frame atual pronto para composição.
         
         Returns:
-            Lista de frames
+            Frame atual com alfa pré-multiplicado
         """
-        frames = []
-        sheet_height, sheet_width = self.spritesheet.shape[:2]
-        
-        # Calcula quantos frames cabem horizontalmente
-        num_frames = sheet_width // self.frame_width
-        
-        for i in range(num_frames):
-            x = i * self.frame_width
-            frame = self.spritesheet[0:self.frame_height, x:x+self.frame_width]
-            frames.append(frame)
-            
-        return frames
+        self.current_frame = self.atlas.current_index()
+        return self.atlas.overlay(self.current_frame)
     
     def get_current_frame(self) -> np.ndarray:
         """
         Retorna o frame atual da animação.
         
+        O índice vem do relógio, então frames são pulados quando o laço
+        de renderização é mais lento que a animação.
+        
         Returns:
-            Frame atual
+            Frame atual (BGRA, view do atlas)
         """
-        current_time = time.time()
-        
-        # Atualiza frame se passou tempo suficiente
-        if current_time - self.last_update >= self.frame_duration:
-            self.current_frame += 1
-            
-            if self.current_frame >= len(self.frames):
-                if self.loop:
-                    self.current_frame = 0
-                else:
-                    self.current_frame = len(self.frames) - 1
-                    
-            self.last_update = current_time
-            
-        return self.frames[self.current_frame]
+        self.current_frame = self.atlas.current_index()
+        return self.atlas.frame(self.current_frame)
     
     def reset(self):
         """Reinicia a animação."""
+        self.atlas.reset()
         self.current_frame = 0
-        self.last_update = time.time()
 
 
 class SpritesheetManager:
@@ -98,9 +120,21 @@ class SpritesheetManager:
     Gerencia spritesheets animados.
     """
     
-    def __init__(self):
-        """Inicializa gerenciador de spritesheets."""
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.perf_counter,
+        asset_cache: Optional[AssetCache] = None
+    ):
+        """
+        Inicializa gerenciador de spritesheets.
+        
+        Args:
+            clock: Relógio em segundos compartilhado pelas animações
+            asset_cache: Cache de assets decodificados (padrão: o do processo)
+        """
         self.spritesheets: Dict[str, AnimatedSprite] = {}
+        self.clock = clock
+        self.asset_cache = asset_cache if asset_cache is not None else shared_asset_cache()
         
     def load_spritesheet(
         self, 
@@ -109,7 +143,8 @@ class SpritesheetManager:
         frame_width: int, 
         frame_height: int,
         fps: int = 10,
-        loop: bool = True
+        loop: bool = True,
+        frame_count: Optional[int] = None
     ) -> bool:
         """
         Carrega spritesheet do disco.
@@ -121,6 +156,7 @@ class SpritesheetManager:
             frame_height: Altura de cada frame
             fps: Frames por segundo
             loop: Se a animação repete
+            frame_count: Frames usados da grade, linha por linha (None = todos)
             
         Returns:
             True se carregou com sucesso
@@ -129,8 +165,8 @@ class SpritesheetManager:
             print(f"⚠️ Spritesheet não encontrado: {path}")
             return False
             
-        # Carrega com canal alfa
-        spritesheet_img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        # Carrega com canal alfa (do cache de assets, se atualizado)
+        spritesheet_img = self.asset_cache.get("spritesheet", path, read_unchanged)
         
         if spritesheet_img is None:
             print(f"❌ Erro ao carregar spritesheet: {path}")
@@ -142,7 +178,9 @@ class SpritesheetManager:
             frame_width, 
             frame_height,
             fps,
-            loop
+            loop,
+            frame_count=frame_count,
+            clock=self.clock
         )
         
         self.spritesheets[name] = sprite
@@ -165,6 +203,21 @@ class SpritesheetManager:
             
         return self.spritesheets[name].get_current_frame()
     
+    def get_current_overlay(self, name: str) -> Optional[PremultipliedImage]:
+        """
+        Retorna frame atual de um spritesheet pronto para composição.
+        
+        Args:
+            name: Nome do spritesheet
+            
+        Returns:
+            Frame atual com alfa pré-multiplicado ou None
+        """
+        if name not in self.spritesheets:
+            return None
+            
+        return self.spritesheets[name].get_current_overlay()
+    
     def reset_animation(self, name: str):
         """
         Reinicia animação de um spritesheet.
@@ -1,109 +1,209 @@
 """
 Gerenciador de stickers para imagens.
 
-Permite sobrepor imagens PNG com canal alfa sobre frames.
+Permite sobrepor imagens PNG com canal alfa sobre frames, incluindo
+stickers animados (GIF / APNG).
 """
 
+import time
 import cv2
 import numpy as np
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional, Union
 from pathlib import Path
 
+from infrastructure.image_processing.compositing import (
+    PremultipliedImage,
+    ResizeCache,
+    composite,
+    flatten,
+    merge_rects,
+    to_bgra
+)
+from infrastructure.image_processing.layer_stack import Tile
+from infrastructure.io.asset_cache import AssetCache, shared_asset_cache
+from infrastructure.io.sprite_atlas import SpriteAtlas
+
 
 class Sticker:
     """Representa um sticker posicionado."""
     
-    def __init__(self, image: np.ndarray, x: int, y: int):
+    def __init__(self, image: PremultipliedImage, x: int, y: int, animation: Optional[SpriteAtlas] = None):
         """
         Inicializa sticker.
         
         Args:
-            image: Imagem do sticker (com canal alfa se possível)
+            image: Imagem do sticker (alfa pré-multiplicado; primeiro frame se animado)
             x: Posição X
             y: Posição Y
+            animation: Frames do sticker animado (None para sticker estático)
         """
         self.image = image
         self.x = x
         self.y = y
-        
+        self.animation = animation
+
 
 class StickerManager:
     """
     Gerencia sobreposição de stickers em imagens.
     """
     
-    def __init__(self):
-        """Inicializa gerenciador de stickers."""
+    # Maior dimensão de um sticker após o carregamento
+    MAX_DIMENSION = 150
+    
+    # Formatos aceitos
+    SUPPORTED_FORMATS = ['.png', '.apng', '.jpg', '.jpeg', '.gif', '.bmp']
+    
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.perf_counter,
+        asset_cache: Optional[AssetCache] = None
+    ):
+        """
+        Inicializa gerenciador de stickers.
+        
+        Args:
+            clock: Relógio em segundos usado pelos stickers animados
+            asset_cache: Cache de assets pré-processados (padrão: o do processo)
+        """
         self.stickers: List[Sticker] = []
         self.available_stickers: dict = {}
+        self.clock = clock
+        self.asset_cache = asset_cache if asset_cache is not None else shared_asset_cache()
+        
+        # Frames de stickers animados redimensionados (preview em escala)
+        self.resize_cache = ResizeCache()
         
-    def load_sticker(self, name: str, path: str) -> bool:
+        # Stickers estáticos achatados, por (altura, largura, escala): uma
+        # camada para cada sequência de estáticos entre dois animados (mantém
+        # a ordem de colocação), dividida nos retângulos disjuntos cobertos.
+        # Refeita só quando a lista muda.
+        self._layers: Dict[tuple, List[Union[List[Tile], Sticker]]] = {}
+    
+    def load_sticker(self, name: str, path: str, fps: float = 10) -> bool:
         """
         Carrega sticker do disco.
         
-        Suporta formatos: PNG (melhor - com transparência), JPG, GIF (sem animação)
-        Redimensiona automaticamente stickers grandes para 150x150 pixels.
+        Suporta formatos: PNG (melhor - com transparência), APNG e GIF
+        animados, JPG e BMP. Redimensiona automaticamente stickers grandes
+        para 150x150 pixels. Os frames decodificados ficam no cache de
+        assets e são mapeados em memória nas próximas execuções.
         
         Args:
             name: Nome identificador do sticker
             path: Caminho do arquivo de imagem
-            
+            fps: Velocidade de stickers animados
+        
         Returns:
             True se carregou com sucesso
         """
-        path_obj = Path(path)
+        return self.load_stickers({name: path}, fps)[name]
+    
+    def load_stickers(self, paths: Dict[str, str], fps: float = 10) -> Dict[str, bool]:
+        """
+        Carrega vários stickers, decodificando em paralelo.
         
-        if not path_obj.exists():
-            print(f"⚠️ Sticker não encontrado: {path}")
-            return False
+        Args:
+            paths: Caminho do arquivo de cada nome identificador
+            fps: Velocidade de stickers animados
         
-        # Verifica extensão
-        ext = path_obj.suffix.lower()
-        supported_formats = ['.png', '.jpg', '.jpeg', '.gif', '.bmp']
+        Returns:
+            Se cada sticker foi carregado com sucesso
+        """
+        valid = {}
+        results = {}
         
-        if ext not in supported_formats:
-            print(f"⚠️ Formato não suportado: {ext}")
-            print(f"   Formatos aceitos: {', '.join(supported_formats)}")
-            return False
+        for name, path in paths.items():
+            path_obj = Path(path)
+            results[name] = False
             
-        # Carrega com canal alfa (RGBA) se disponível
-        sticker_img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+            if not path_obj.exists():
+                print(f"⚠️ Sticker não encontrado: {path}")
+                continue
+            
+            # Verifica extensão
+            ext = path_obj.suffix.lower()
+            
+            if ext not in self.SUPPORTED_FORMATS:
+                print(f"⚠️ Formato não suportado: {ext}")
+                print(f"   Formatos aceitos: {', '.join(self.SUPPORTED_FORMATS)}")
+                continue
+            
+            valid[name] = path_obj
         
-        if sticker_img is None:
-            print(f"❌ Erro ao carregar sticker: {path}")
-            return False
+        all_frames = self.asset_cache.get_many([
+            ("sticker", str(path_obj), self._decode_frames, {"max_dimension": self.MAX_DIMENSION})
+            for path_obj in valid.values()
+        ])
+        
+        for (name, path_obj), frames in zip(valid.items(), all_frames):
+            if frames is None:
+                print(f"❌ Erro ao carregar sticker: {path_obj}")
+                continue
+            
+            # Alfa pré-multiplicado (animados: convertidos frame a frame no primeiro uso)
+            if len(frames) > 1:
+                self.available_stickers[name] = SpriteAtlas(frames, fps=fps, clock=self.clock)
+                print(f"   🎞️ {path_obj.name}: {len(frames)} frames animados")
+            else:
+                self.available_stickers[name] = PremultipliedImage.from_bgra(frames[0])
+            
+            results[name] = True
+        
+        return results
+    
+    def _decode_frames(self, path: Path) -> Optional[np.ndarray]:
+        """
+        Decodifica todos os frames de um arquivo de imagem.
+        
+        Args:
+            path: Caminho do arquivo
+        
+        Returns:
+            Frames BGRA (N, H, W, 4), limitados a MAX_DIMENSION, ou None
+        """
+        # Imagens com vários frames (GIF / APNG)
+        ok, images = cv2.imreadmulti(str(path), flags=cv2.IMREAD_UNCHANGED)
+        images = list(images) if ok else []
+        
+        if len(images) <= 1 and path.suffix.lower() == '.gif':
+            # Alternativa: leitura do GIF como vídeo (backend FFmpeg)
+            capture = cv2.VideoCapture(str(path))
+            while True:
+                ret, image = capture.read()
+                if not ret:
+                    break
+                images.append(image)
+            capture.release()
+        
+        if not images:
+            image = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+            if image is None:
+                return None
+            images = [image]
         
         # Redimensiona stickers grandes (limite: 150x150)
-        max_dimension = 150
-        height, width = sticker_img.shape[:2]
+        height, width = images[0].shape[:2]
         
-        if height > max_dimension or width > max_dimension:
+        if height > self.MAX_DIMENSION or width > self.MAX_DIMENSION:
             # Calcula novo tamanho mantendo proporção
-            scale = max_dimension / max(height, width)
+            scale = self.MAX_DIMENSION / max(height, width)
             new_width = int(width * scale)
             new_height = int(height * scale)
             
             # Redimensiona mantendo o canal alfa se presente
-            sticker_img = cv2.resize(
-                sticker_img, 
-                (new_width, new_height), 
-                interpolation=cv2.INTER_AREA
-            )
+            images = [
+                cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
+                for image in images
+            ]
             print(f"   📐 Redimensionado de {width}x{height} para {new_width}x{new_height}")
         
         # Aviso para formatos sem transparência
-        if ext in ['.jpg', '.jpeg', '.gif']:
-            print(f"ℹ️  {path_obj.name}: Formato sem transparência (use PNG para melhor resultado)")
-            # Converte para RGBA adicionando canal alfa opaco
-            if len(sticker_img.shape) == 2:
-                # Grayscale -> RGBA
-                sticker_img = cv2.cvtColor(sticker_img, cv2.COLOR_GRAY2BGRA)
-            elif sticker_img.shape[2] == 3:
-                # BGR -> BGRA (adiciona canal alfa 100% opaco)
-                sticker_img = cv2.cvtColor(sticker_img, cv2.COLOR_BGR2BGRA)
-        
-        self.available_stickers[name] = sticker_img
-        return True
+        if images[0].ndim == 2 or images[0].shape[2] != 4:
+            print(f"ℹ️  {path.name}: Formato sem transparência (use PNG para melhor resultado)")
+        
+        # Converte para BGRA adicionando canal alfa opaco quando necessário
+        return np.stack([to_bgra(image) for image in images])
     
     def add_sticker(self, name: str, x: int, y: int) -> bool:
         """
@@ -113,88 +213,200 @@ class StickerManager:
             name: Nome do sticker previamente carregado
             x: Posição X
             y: Posição Y
-            
+        
         Returns:
             True se adicionou com sucesso, False se sticker não existe
         """
         if name not in self.available_stickers:
             return False
-            
+        
         sticker_img = self.available_stickers[name]
-        self.stickers.append(Sticker(sticker_img, x, y))
+        if isinstance(sticker_img, SpriteAtlas):
+            self.stickers.append(Sticker(sticker_img.overlay(0), x, y, animation=sticker_img))
+        else:
+            self.stickers.append(Sticker(sticker_img, x, y))
+        self._layers.clear()
         return True
-        
+    
     def clear_stickers(self):
         """Remove todos os stickers aplicados."""
         self.stickers.clear()
-        
-    def apply_stickers(self, frame: np.ndarray) -> np.ndarray:
+        self._layers.clear()
+    
+    def apply_stickers(self, frame: np.ndarray, scale: float = 1.0) -> np.ndarray:
         """
         Aplica todos os stickers no frame.
         
         Args:
             frame: Frame base
-            
+            scale: Escala do frame em relação às coordenadas dos stickers
+                   (ex: preview reduzido de uma imagem grande)
+        
         Returns:
             Frame com stickers aplicados
         """
+        # Compõe apenas as regiões cobertas por stickers
         result = frame.copy()
+        for x, y, region in self.tiles(frame, scale):
+            composite(result, region, x, y)
         
-        for sticker in self.stickers:
-            result = self._overlay_sticker(
-                result, 
-                sticker.image, 
-                sticker.x, 
-                sticker.y
-            )
-            
         return result
     
+    def tiles(self, frame: np.ndarray, scale: float = 1.0) -> List[Tile]:
+        """
+        Gera os tiles dos stickers, sem modificar o frame.
+        
+        Stickers estáticos vêm das camadas em cache; os animados, com o
+        frame atual de cada um, ficam entre elas na ordem de colocação.
+        
+        Args:
+            frame: Frame base
+            scale: Escala do frame em relação às coordenadas dos stickers
+        
+        Returns:
+            Lista de tiles (x, y, imagem) para a LayerStack
+        """
+        if not self.stickers:
+            return []
+        
+        tiles = []
+        
+        for segment in self._get_layers(frame.shape[:2], scale):
+            if isinstance(segment, list):
+                tiles.extend(segment)
+                continue
+            
+            sticker = segment
+            index = sticker.animation.current_index()
+            sticker_img = sticker.animation.overlay(index)
+            x, y = sticker.x, sticker.y
+            
+            if scale != 1.0:
+                sticker_img = self.resize_cache.get(
+                    (id(sticker.animation), index),
+                    sticker_img,
+                    int(sticker_img.width * scale),
+                    int(sticker_img.height * scale)
+                )
+                x, y = int(x * scale), int(y * scale)
+            
+            if self._fits(frame.shape, sticker_img, x, y):
+                tiles.append((x, y, sticker_img))
+        
+        return tiles
+    
+    def _get_layers(
+        self,
+        frame_size: Tuple[int, int],
+        scale: float
+    ) -> List[Union[List[Tile], Sticker]]:
+        """
+        Retorna as camadas de stickers para o tamanho de frame, criando se necessário.
+        
+        Args:
+            frame_size: (altura, largura) do frame
+            scale: Escala do frame em relação às coordenadas dos stickers
+        
+        Returns:
+            Na ordem de colocação: para cada sequência de stickers estáticos,
+            as regiões (x, y, recorte) da sua camada, disjuntas (a análise de
+            alfa fica em cache junto); cada sticker animado, entre elas
+        """
+        key = (frame_size[0], frame_size[1], scale)
+        
+        layers = self._layers.get(key)
+        if layers is None:
+            height, width = frame_size
+            layers = []
+            layer, rects = None, []
+            
+            for sticker in self.stickers:
+                if sticker.animation is not None:
+                    # Animados mudam a cada frame: encerram a camada atual
+                    if rects:
+                        layers.append(self._split_layer(layer, rects))
+                    layer, rects = None, []
+                    layers.append(sticker)
+                    continue
+                
+                if layer is None:
+                    layer = PremultipliedImage.empty(width, height)
+                
+                sticker_img = sticker.image
+                x, y = sticker.x, sticker.y
+                
+                if scale != 1.0:
+                    sticker_img = sticker_img.resize(
+                        int(sticker_img.width * scale),
+                        int(sticker_img.height * scale)
+                    )
+                    x, y = int(x * scale), int(y * scale)
+                
+                rect = self._overlay_sticker(layer, sticker_img, x, y)
+                if rect is not None:
+                    rects.append(rect)
+            
+            if rects:
+                layers.append(self._split_layer(layer, rects))
+            
+            self._layers[key] = layers
+        
+        return layers
+    
+    @staticmethod
+    def _split_layer(layer: PremultipliedImage, rects: List[Tuple[int, int, int, int]]) -> List[Tile]:
+        """Recorta a camada nos retângulos disjuntos cobertos por stickers."""
+        return [
+            (x, y, layer.crop(x, y, width, height))
+            for x, y, width, height in merge_rects(rects)
+        ]
+    
     def _overlay_sticker(
         self, 
-        background: np.ndarray, 
-        sticker: np.ndarray, 
+        layer: PremultipliedImage, 
+        sticker: PremultipliedImage, 
         x: int, 
         y: int
-    ) -> np.ndarray:
+    ) -> Optional[Tuple[int, int, int, int]]:
         """
-        Sobrepõe sticker no background considerando canal alfa.
+        Achata sticker na camada considerando canal alfa.
         
         Args:
-            background: Imagem de fundo
-            sticker: Imagem do sticker
+            layer: Camada de stickers
+            sticker: Imagem do sticker (alfa pré-multiplicado)
             x: Posição X
             y: Posição Y
-            
+        
         Returns:
-            Imagem com sticker aplicado
+            Retângulo ocupado pelo sticker ou None se ficou de fora
         """
-        sticker_height, sticker_width = sticker.shape[:2]
+        if not self._fits(layer.color.shape, sticker, x, y):
+            return None
         
+        return flatten(layer, sticker, x, y)
+    
+    @staticmethod
+    def _fits(shape: Tuple[int, ...], sticker: PremultipliedImage, x: int, y: int) -> bool:
+        """
+        Verifica se o sticker cabe inteiro na imagem.
+        
+        Args:
+            shape: Formato da imagem de destino
+            sticker: Imagem do sticker
+            x: Posição X
+            y: Posição Y
+        
+        Returns:
+            True se o sticker fica totalmente dentro da imagem
+        """
         # Limites da área do sticker
-        y1, y2 = y, y + sticker_height
-        x1, x2 = x, x + sticker_width
+        y1, y2 = y, y + sticker.height
+        x1, x2 = x, x + sticker.width
         
         # Verifica se sticker cabe na imagem
-        if y2 > background.shape[0] or x2 > background.shape[1]:
-            return background
+        if y2 > shape[0] or x2 > shape[1]:
+            return False
         if y1 < 0 or x1 < 0:
-            return background
-            
-        # Sticker com canal alfa (RGBA)
-        if sticker.shape[2] == 4:
-            # Canal alfa normalizado
-            alpha = sticker[:, :, 3] / 255.0
-            bg_alpha = 1.0 - alpha
-            
-            # Combina sticker com background usando alfa
-            for c in range(3):
-                background[y1:y2, x1:x2, c] = (
-                    alpha * sticker[:, :, c] +
-                    bg_alpha * background[y1:y2, x1:x2, c]
-                )
-        else:
-            # Sem canal alfa, aplica diretamente
-            background[y1:y2, x1:x2] = sticker[:, :, :3]
-            
-        return background
+            return False
+        
+        return True
@@ -0,0 +1,192 @@
+"""
+Gravação de vídeo em segundo plano.
+
+Os frames processados são entregues a uma thread que cria o arquivo e os
+codifica com cv2.VideoWriter, através de uma fila limitada. O laço de
+exibição apenas copia o frame para a fila (nem a inicialização do
+codificador roda nele): com a política 'drop', frames são descartados
+quando o codificador não acompanha, e a exibição nunca trava.
+
+Frames com instante de captura são posicionados na linha do tempo do
+vídeo: frames descartados ou que chegaram atrasados são compensados
+repetindo o anterior, e o vídeo gravado dura o mesmo que a gravação.
+"""
+
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class VideoRecorder:
+    """
+    Grava frames em um arquivo de vídeo usando uma thread codificadora.
+    """
+    
+    # Políticas quando a fila está cheia
+    POLICIES = ('drop', 'block')
+    
+    def __init__(
+        self,
+        output_path: str,
+        fps: float = 30.0,
+        codec: str = 'mp4v',
+        queue_size: int = 32,
+        policy: str = 'drop',
+        writer_factory: Callable[..., cv2.VideoWriter] = cv2.VideoWriter
+    ):
+        """
+        Inicializa o gravador (o arquivo é criado pela thread, no primeiro frame).
+        
+        Args:
+            output_path: Arquivo de saída (ex: .mp4 ou .avi)
+            fps: Frames por segundo do vídeo
+            codec: Código FourCC do codificador
+            queue_size: Frames aguardando codificação, no máximo
+            policy: 'drop' descarta frames com a fila cheia; 'block'
+                    espera a fila esvaziar (nenhum frame é perdido)
+            writer_factory: Cria o VideoWriter (injetável para testes)
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Policy must be one of {self.POLICIES}")
+        
+        self.output_path = output_path
+        self.fps = fps
+        self.codec = codec
+        self.policy = policy
+        self.writer_factory = writer_factory
+        
+        self.frames_written = 0
+        self.frames_dropped = 0
+        
+        # O arquivo não pôde ser criado: write() passa a ignorar os frames
+        self.failed = False
+        
+        self._queue: 'queue.Queue[Optional[Tuple[np.ndarray, Optional[float]]]]' = queue.Queue(
+            maxsize=max(1, queue_size)
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._writer: Optional[cv2.VideoWriter] = None
+        self._frame_size: Optional[tuple] = None
+        self._start_time: Optional[float] = None
+    
+    @property
+    def recording(self) -> bool:
+        """Se a thread codificadora está ativa."""
+        return self._thread is not None
+    
+    def write(self, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """
+        Enfileira um frame para gravação (copiado; o chamador pode reutilizá-lo).
+        
+        Args:
+            frame: Frame BGR (ou grayscale)
+            timestamp: Instante do frame em segundos (ex: time.perf_counter);
+                       None grava os frames em sequência, um por posição
+        
+        Returns:
+            True se o frame foi enfileirado, False se foi descartado (ou se
+            o arquivo não pôde ser criado; ver 'failed')
+        """
+        if self.failed:
+            return False
+        
+        if frame.ndim == 2:
+            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        
+        if self._thread is None:
+            # O tamanho do vídeo é o do primeiro frame
+            self._frame_size = frame.shape[:2]
+            self._thread = threading.Thread(target=self._run, name="video-recorder", daemon=True)
+            self._thread.start()
+        
+        if frame.shape[:2] != self._frame_size:
+            # O VideoWriter tem tamanho fixo
+            frame = cv2.resize(frame, self._frame_size[::-1])
+        else:
+            frame = frame.copy()
+        
+        if self.policy == 'block':
+            self._queue.put((frame, timestamp))
+            return True
+        
+        try:
+            self._queue.put_nowait((frame, timestamp))
+            return True
+        except queue.Full:
+            self.frames_dropped += 1
+            return False
+    
+    def stop(self):
+        """Grava os frames pendentes e fecha o arquivo."""
+        if self._thread is None:
+            return
+        
+        # Sentinela: a thread termina depois de esvaziar a fila
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+    
+    def _open(self) -> bool:
+        """Cria o VideoWriter com o tamanho do primeiro frame (na thread codificadora)."""
+        try:
+            Path(self.output_path).parent.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"❌ Erro ao criar vídeo: {self.output_path} ({e})")
+            return False
+        
+        height, width = self._frame_size
+        fourcc = cv2.VideoWriter_fourcc(*self.codec)
+        writer = self.writer_factory(self.output_path, fourcc, self.fps, (width, height))
+        
+        if not writer.isOpened():
+            print(f"❌ Erro ao criar vídeo: {self.output_path}")
+            return False
+        
+        self._writer = writer
+        return True
+    
+    def _repeats(self, timestamp: Optional[float]) -> int:
+        """
+        Quantas vezes o frame ocupa a linha do tempo do vídeo.
+        
+        Args:
+            timestamp: Instante do frame (None = próxima posição)
+        
+        Returns:
+            Número de gravações do frame (0 se chegou adiantado demais)
+        """
+        if timestamp is None:
+            return 1
+        
+        if self._start_time is None:
+            self._start_time = timestamp
+        
+        # Posição do frame no vídeo; lacunas são preenchidas com este frame
+        position = int(round((timestamp - self._start_time) * self.fps))
+        return max(0, position + 1 - self.frames_written)
+    
+    def _run(self):
+        """Laço da thread: abre o arquivo e codifica os frames na ordem em que chegaram."""
+        if not self._open():
+            self.failed = True
+        
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            
+            if self.failed:
+                continue  # Esvazia a fila até a sentinela (write() pode estar bloqueado)
+            
+            frame, timestamp = item
+            for _ in range(self._repeats(timestamp)):
+                self._writer.write(frame)
+                self.frames_written += 1
@@ -1,12 +1,44 @@
 """
 Módulo de captura de vídeo da webcam.
 
-Implementa funcionalidade de captura em tempo real usando OpenCV.
+Implementa funcionalidade de captura em tempo real usando OpenCV. A
+fonte pode ser uma câmera ou um arquivo de vídeo (reprodução de gravações
+de teste sem câmera).
+
+No modo com thread, uma thread dedicada lê a câmera continuamente para
+um anel de buffers pré-alocados; o laço de renderização recebe sempre o
+frame mais recente e os frames que ficaram velhos são descartados, em
+vez de se acumularem no driver (o que aumentaria a latência).
 """
 
+import threading
+import time
+
 import cv2
 import numpy as np
-from typing import Optional, Callable
+from typing import Optional, Callable, List, Union
+
+
+class CapturedFrame:
+    """Frame capturado com seu instante e número sequencial."""
+    
+    def __init__(self, frame: np.ndarray, timestamp: float, sequence: int):
+        """
+        Inicializa frame capturado.
+        
+        Args:
+            frame: Imagem BGR
+            timestamp: Instante da captura (time.perf_counter)
+            sequence: Número sequencial do frame na câmera (a partir de 1)
+        """
+        self.frame = frame
+        self.timestamp = timestamp
+        self.sequence = sequence
+    
+    @property
+    def age(self) -> float:
+        """Tempo, em segundos, desde a captura."""
+        return time.perf_counter() - self.timestamp
 
 
 class WebcamCapture:
@@ -16,16 +48,62 @@ class WebcamCapture:
     Permite capturar frames em tempo real e aplicar processamento.
     """
     
-    def __init__(self, camera_index: int = 0):
+    def __init__(
+        self,
+        camera_index: Union[int, str] = 0,
+        threaded: bool = False,
+        buffer_size: int = 3,
+        capture_factory: Callable[[Union[int, str]], cv2.VideoCapture] = cv2.VideoCapture
+    ):
         """
         Inicializa captura da webcam.
         
         Args:
-            camera_index: Índice da câmera (0 para câmera padrão)
+            camera_index: Índice da câmera (0 para câmera padrão) ou caminho
+                          de um arquivo de vídeo
+            threaded: Se a câmera é lida por uma thread dedicada
+            buffer_size: Buffers pré-alocados do anel (mínimo 3: um sendo
+                         escrito, o mais recente e o entregue ao consumidor)
+            capture_factory: Cria o VideoCapture (injetável para testes)
         """
         self.camera_index = camera_index
         self.capture: Optional[cv2.VideoCapture] = None
+        self.threaded = threaded
+        self.buffer_size = max(3, buffer_size)
+        self.capture_factory = capture_factory
+        
+        # Frames lidos da câmera e frames descartados por estarem velhos
+        self.frames_captured = 0
+        self.frames_dropped = 0
         
+        # Estado do modo com thread
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._buffers: List[np.ndarray] = []
+        self._latest: Optional[CapturedFrame] = None
+        self._latest_slot = -1
+        self._lent_slot = -1
+        self._last_sequence = 0
+    
+    @property
+    def is_file(self) -> bool:
+        """Se a fonte é um arquivo de vídeo."""
+        return isinstance(self.camera_index, str)
+    
+    @property
+    def ended(self) -> bool:
+        """Se a thread de leitura terminou (fim do vídeo ou câmera desconectada)."""
+        with self._condition:
+            return self.threaded and self._thread is not None and not self._running
+    
+    @property
+    def fps(self) -> float:
+        """Frames por segundo informados pela fonte (0 se desconhecido)."""
+        if self.capture is None:
+            return 0.0
+        return float(self.capture.get(cv2.CAP_PROP_FPS) or 0.0)
+    
     def start(self) -> bool:
         """
         Inicia captura da webcam.
@@ -33,40 +111,159 @@ class WebcamCapture:
         Returns:
             True se iniciou com sucesso, False caso contrário
         """
-        self.capture = cv2.VideoCapture(self.camera_index)
+        self.capture = self.capture_factory(self.camera_index)
         if not self.capture.isOpened():
-            print("❌ Erro: Não foi possível abrir a câmera.")
+            if self.is_file:
+                print(f"❌ Erro: Não foi possível abrir o vídeo: {self.camera_index}")
+            else:
+                print("❌ Erro: Não foi possível abrir a câmera.")
             return False
+        
+        if self.threaded:
+            self._start_thread()
         return True
     
     def read_frame(self) -> Optional[np.ndarray]:
         """
         Captura um frame da webcam.
         
+        No modo com thread, o frame é um buffer do anel, válido até a
+        próxima chamada.
+        
         Returns:
             Frame capturado ou None se houver erro
         """
+        captured = self.read()
+        return captured.frame if captured is not None else None
+    
+    def read(self, timeout: Optional[float] = None) -> Optional[CapturedFrame]:
+        """
+        Captura o frame mais recente, com instante e número sequencial.
+        
+        Args:
+            timeout: Tempo máximo (s) de espera por um frame novo (modo com
+                     thread); None espera até chegar um frame ou a fonte
+                     terminar (câmeras podem levar segundos para iniciar)
+        
+        Returns:
+            Frame capturado ou None se houver erro, se a fonte terminou ou
+            se o tempo de espera esgotou (nesse caso, 'ended' é False)
+        """
         if self.capture is None:
             return None
-            
+        
+        if self.threaded:
+            return self._read_latest(timeout)
+        
         ret, frame = self.capture.read()
         if not ret:
-            print("❌ Erro ao capturar frame.")
+            print("🎬 Fim do vídeo." if self.is_file else "❌ Erro ao capturar frame.")
             return None
-            
-        return frame
+        
+        self.frames_captured += 1
+        self._last_sequence = self.frames_captured
+        return CapturedFrame(frame, time.perf_counter(), self.frames_captured)
     
     def release(self):
         """Libera recursos da webcam."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        
         if self.capture is not None:
             self.capture.release()
             self.capture = None
-            
+    
     def __enter__(self):
         """Context manager: inicia captura."""
         self.start()
         return self
-        
+    
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Context manager: libera recursos."""
         self.release()
+    
+    def _start_thread(self):
+        """Inicia a thread de leitura (anel alocado no primeiro frame)."""
+        self._buffers = []
+        self._latest = None
+        self._latest_slot = self._lent_slot = -1
+        self._running = True
+        
+        self._thread = threading.Thread(target=self._run, name="webcam-capture", daemon=True)
+        self._thread.start()
+    
+    def _read_latest(self, timeout: Optional[float]) -> Optional[CapturedFrame]:
+        """Entrega o frame mais recente ainda não lido, descartando os anteriores."""
+        deadline = time.perf_counter() + timeout if timeout is not None else None
+        
+        with self._condition:
+            while self._running and (self._latest is None or self._latest.sequence <= self._last_sequence):
+                if deadline is None:
+                    self._condition.wait()
+                    continue
+                
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            
+            latest = self._latest
+            if latest is None or latest.sequence <= self._last_sequence:
+                if self._running:
+                    # Tempo esgotado, mas a fonte continua ativa
+                    return None
+                print("🎬 Fim do vídeo." if self.is_file else "❌ Erro ao capturar frame.")
+                return None
+            
+            # Frames publicados depois do último lido e antes deste nunca serão entregues
+            self.frames_dropped += latest.sequence - self._last_sequence - 1
+            self._last_sequence = latest.sequence
+            
+            # O buffer entregue não é reescrito até a próxima leitura
+            self._lent_slot = self._latest_slot
+            return latest
+    
+    def _next_slot(self) -> int:
+        """Escolhe um buffer que não é o mais recente nem o entregue ao consumidor."""
+        for slot in range(len(self._buffers)):
+            if slot != self._latest_slot and slot != self._lent_slot:
+                return slot
+        return -1
+    
+    def _run(self):
+        """Laço da thread: lê a câmera continuamente para o anel de buffers."""
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                slot = self._next_slot()
+            
+            buffer = self._buffers[slot] if slot >= 0 else None
+            ret, frame = self.capture.read(buffer)
+            timestamp = time.perf_counter()
+            
+            if not ret or frame is None:
+                # Câmera desconectada (ou fim do vídeo): encerra a leitura
+                with self._condition:
+                    self._running = False
+                    self._condition.notify_all()
+                return
+            
+            with self._condition:
+                if frame is not buffer:
+                    # Primeiro frame (ou mudança de resolução): aloca o anel
+                    if not self._buffers or self._buffers[0].shape != frame.shape:
+                        self._buffers = [np.empty_like(frame) for _ in range(self.buffer_size)]
+                        self._latest_slot = self._lent_slot = -1
+                        slot = self._next_slot()
+                    np.copyto(self._buffers[slot], frame)
+                
+                self.frames_captured += 1
+                self._latest = CapturedFrame(self._buffers[slot], timestamp, self.frames_captured)
+                self._latest_slot = slot
+                self._condition.notify_all()
@@ -0,0 +1,181 @@
+"""
+Pipeline de estágios em threads para processamento de vídeo.
+
+Cada estágio (ex: captura, filtro, composição) roda em sua própria
+thread, ligado ao seguinte por uma fila limitada. Enquanto um frame é
+composto, o próximo já está sendo filtrado e o seguinte capturado: a
+vazão passa a ser limitada pelo estágio mais lento, e não pela soma de
+todos. O OpenCV libera o GIL durante o processamento, então os estágios
+rodam de fato em paralelo.
+
+O consumidor final (ex: exibição, que precisa ficar na thread principal)
+lê os resultados com get(), na ordem dos números sequenciais.
+"""
+
+import queue
+import threading
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class _EndOfStream:
+    """Marca o fim dos frames (fonte esgotada ou erro em um estágio)."""
+    
+    def __init__(self, error: Optional[BaseException] = None):
+        self.error = error
+
+
+class StagePipeline:
+    """
+    Estágios encadeados por filas limitadas, um por thread.
+    """
+    
+    def __init__(
+        self,
+        source: Callable[[], Optional[Any]],
+        stages: List[Tuple[str, Callable[[Any], Any]]],
+        queue_size: int = 2
+    ):
+        """
+        Inicializa o pipeline.
+        
+        Args:
+            source: Produz o próximo item (ex: lê um frame); None encerra
+            stages: Estágios (nome, função) aplicados em ordem a cada item
+            queue_size: Itens aguardando entre dois estágios, no máximo
+                        (limita a latência e a memória em uso)
+        """
+        self.source = source
+        self.stages = list(stages)
+        self.queue_size = max(1, queue_size)
+        
+        # Itens concluídos por estágio (inclui a fonte)
+        self.counts = {name: 0 for name in ['source'] + [name for name, _ in self.stages]}
+        
+        self._queues: List[queue.Queue] = []
+        self._threads: List[threading.Thread] = []
+        self._stopping = threading.Event()
+        self._next_sequence = 1
+    
+    def start(self):
+        """Cria as filas e inicia uma thread por estágio."""
+        self._stopping.clear()
+        self._queues = [queue.Queue(maxsize=self.queue_size) for _ in range(len(self.stages) + 1)]
+        self._next_sequence = 1
+        
+        workers = [('source', self._run_source, ())]
+        workers += [
+            (name, self._run_stage, (name, function, self._queues[i], self._queues[i + 1]))
+            for i, (name, function) in enumerate(self.stages)
+        ]
+        
+        self._threads = [
+            threading.Thread(target=target, args=args, name=f"stage-{name}", daemon=True)
+            for name, target, args in workers
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def get(self) -> Optional[Tuple[int, Any]]:
+        """
+        Retorna o próximo resultado, na ordem de entrada (bloqueia).
+        
+        Returns:
+            Tupla (número sequencial, resultado) ou None no fim dos frames
+        
+        Raises:
+            Exception: Erro ocorrido em algum estágio (repassado ao consumidor)
+        """
+        while True:
+            try:
+                item = self._queues[-1].get(timeout=0.1)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return None
+                continue
+            
+            if isinstance(item, _EndOfStream):
+                if item.error is not None:
+                    raise item.error
+                return None
+            
+            sequence, result = item
+            if sequence < self._next_sequence:
+                continue  # Fora de ordem (não ocorre com um worker por estágio)
+            
+            self._next_sequence = sequence + 1
+            return sequence, result
+    
+    def stop(self):
+        """Interrompe os estágios e aguarda as threads."""
+        self._stopping.set()
+        
+        # Esvazia as filas para destravar estágios bloqueados em put()
+        for stage_queue in self._queues:
+            while True:
+                try:
+                    stage_queue.get_nowait()
+                except queue.Empty:
+                    break
+        
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+    
+    def _put(self, stage_queue: queue.Queue, item: Any) -> bool:
+        """Coloca um item na fila, desistindo se o pipeline for interrompido."""
+        while not self._stopping.is_set():
+            try:
+                stage_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _run_source(self):
+        """Thread da fonte: numera os itens produzidos."""
+        sequence = 0
+        
+        while not self._stopping.is_set():
+            try:
+                item = self.source()
+            except Exception as e:
+                self._put(self._queues[0], _EndOfStream(e))
+                return
+            
+            if item is None:
+                self._put(self._queues[0], _EndOfStream())
+                return
+            
+            sequence += 1
+            self.counts['source'] += 1
+            if not self._put(self._queues[0], (sequence, item)):
+                return
+    
+    def _run_stage(
+        self,
+        name: str,
+        function: Callable[[Any], Any],
+        input_queue: queue.Queue,
+        output_queue: queue.Queue
+    ):
+        """Thread de um estágio: aplica a função a cada item, em ordem."""
+        while not self._stopping.is_set():
+            try:
+                item = input_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            
+            if isinstance(item, _EndOfStream):
+                self._put(output_queue, item)
+                return
+            
+            sequence, value = item
+            try:
+                result = function(value)
+            except Exception as e:
+                self._put(output_queue, _EndOfStream(e))
+                return
+            
+            self.counts[name] += 1
+            if not self._put(output_queue, (sequence, result)):
+                return
@@ -16,8 +16,10 @@ from infrastructure.image_processing.high_pass_filters import LaplacianFilterPro
 from infrastructure.image_processing.morphology import (
     ErosionProcessor, DilationProcessor, OpeningProcessor, ClosingProcessor, GradientProcessor
 )
-from infrastructure.image_processing.color_conversion import GrayscaleProcessor
+from infrastructure.image_processing.color_conversion import GrayscaleProcessor, SaturationProcessor
+from infrastructure.image_processing.color_lut import ColorLUT3DProcessor
 from infrastructure.image_processing.thresholding import BinaryThresholdProcessor, OtsuThresholdProcessor
+from infrastructure.image_processing.point_operations import PointOperation
 
 # Imports da aplicação
 from application.use_cases.apply_filter import ApplyFilterUseCase
@@ -217,7 +219,7 @@ def modo_foto():
     editor.register_processor('g', 'Grayscale', GrayscaleProcessor())
     editor.register_processor('t', 'Binary Threshold', BinaryThresholdProcessor(threshold=127))
     editor.register_processor('o', 'Otsu Threshold', OtsuThresholdProcessor())
-    editor.register_processor('n', 'Negative', LaplacianFilterProcessor(kernel_size=3))  # Placeholder
+    editor.register_processor('n', 'Negative', PointOperation.negative())
     
     # Inicia edição
     editor.edit_image(image_path)
@@ -229,8 +231,15 @@ def modo_video():
     print("MODO VÍDEO - WEBCAM INTERATIVA")
     print("=" * 60)
     
+    # Fonte: webcam padrão ou arquivo de vídeo (ex: gravação de teste)
+    source = input("\n➤ Caminho de um vídeo (Enter para usar a webcam): ").strip().strip('"')
+    
+    if source and not Path(source).exists():
+        print(f"❌ Vídeo não encontrado: {source}")
+        return
+    
     # Cria editor de webcam
-    editor = InteractiveWebcamEditor(camera_index=0)
+    editor = InteractiveWebcamEditor(camera_index=source or 0)
     
     # Registra filtros disponíveis com teclas de atalho
     editor.register_processor('b', 'Gaussian Blur', GaussianFilterProcessor(kernel_size=(15, 15), sigma=0))
@@ -244,6 +253,20 @@ def modo_video():
     editor.register_processor('o', 'Otsu Threshold', OtsuThresholdProcessor())
     editor.register_processor('n', 'Gradient', GradientProcessor(kernel_size=(5, 5)))
     
+    # Gradação de cor pré-calculada em LUT 3D (uma consulta por frame)
+    color_grade = ColorLUT3DProcessor.from_processors(
+        [SaturationProcessor(factor=1.6), PointOperation.gamma(0.85)],
+        name="vivid"
+    )
+    editor.register_processor('h', 'Color Grade (LUT 3D)', color_grade)
+    
+    # Vídeo sem janela: processa tudo e grava o resultado
+    if source and input("➤ Processar sem janela e salvar o resultado? (s/N): ").strip().lower() == 's':
+        output_path = Path("assets/images/output/webcam") / f"{Path(source).stem}_editado.mp4"
+        editor.replay(str(output_path))
+        print(f"💾 Resultado salvo: {output_path}")
+        return
+    
     # Inicia captura
     editor.start_editing()
 
@@ -78,7 +78,7 @@ class HistogramTool:
             equalizer = HistogramEqualizer(color_equalization='value')
             title_suffix = "HSV"
         elif method == "ycrcb":
-            equalizer = HistogramEqualizer(color_equalization='value')
+            equalizer = HistogramEqualizer(color_equalization='ycrcb')
             title_suffix = "YCrCb"
         else:
             raise ValueError(f"Método desconhecido: {method}")
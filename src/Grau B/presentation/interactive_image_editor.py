@@ -6,12 +6,15 @@ Permite editar imagens estáticas com filtros em tempo real.
 
 import cv2
 import numpy as np
-from typing import Dict, Optional, Callable
+from typing import Dict, Optional, Callable, Tuple
 from pathlib import Path
 
 from domain.interfaces.image_processor import ImageProcessorInterface
 from infrastructure.io.sticker_manager import StickerManager
 from infrastructure.image_processing.color_conversion import ChannelSeparator
+from infrastructure.image_processing.multiresolution import (
+    ImagePyramid, PyramidCache, ProcessingRecipe
+)
 
 
 class InteractiveImageEditor:
@@ -21,12 +24,23 @@ class InteractiveImageEditor:
     Permite aplicar filtros e stickers usando teclas de atalho.
     """
     
-    def __init__(self):
-        """Inicializa editor interativo."""
+    def __init__(self, preview_size: Tuple[int, int] = (1280, 720)):
+        """
+        Inicializa editor interativo.
+        
+        Args:
+            preview_size: Tamanho máximo (largura, altura) da janela de preview.
+                          Imagens maiores são editadas em resolução reduzida e
+                          reprocessadas em resolução completa ao salvar.
+        """
         self.processors: Dict[str, ImageProcessorInterface] = {}
         self.active_processors: Dict[str, bool] = {}  # Filtros ativos
         self.sticker_manager = StickerManager()
         self.original_image: Optional[np.ndarray] = None
+        self.preview_size = preview_size
+        self.pyramid_cache = PyramidCache()
+        self.pyramid: Optional[ImagePyramid] = None
+        self.preview_scale = 1.0
         self.save_counter = 0
         self.mouse_x = 0
         self.mouse_y = 0
@@ -71,23 +85,42 @@ class InteractiveImageEditor:
         supported_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.bmp']
         
         print(f"\n🎭 Carregando stickers de: {stickers_dir}")
+        
+        # Arquivos existentes de cada sticker, na ordem das extensões
+        candidates = {
+            key: [
+                stickers_dir / f"{base_name}{ext}"
+                for ext in supported_extensions
+                if (stickers_dir / f"{base_name}{ext}").exists()
+            ]
+            for key, base_name in sticker_mapping.items()
+        }
+        
+        # Decodifica em paralelo (ou mapeia do cache de assets); se um
+        # arquivo não puder ser lido, tenta a próxima extensão
+        sticker_paths = {}
+        pending = {key: paths for key, paths in candidates.items() if paths}
+        while pending:
+            loaded = self.sticker_manager.load_stickers({key: str(paths[0]) for key, paths in pending.items()})
+            sticker_paths.update({key: paths[0] for key, paths in pending.items() if loaded.get(key)})
+            pending = {
+                key: paths[1:]
+                for key, paths in pending.items()
+                if not loaded.get(key) and len(paths) > 1
+            }
+        
         loaded_count = 0
         
         for key, base_name in sticker_mapping.items():
-            # Tenta carregar com diferentes extensões
-            found = False
-            for ext in supported_extensions:
-                sticker_path = stickers_dir / f"{base_name}{ext}"
-                if sticker_path.exists():
-                    if self.sticker_manager.load_sticker(key, str(sticker_path)):
-                        print(f"   ✅ '{key.upper()}' -> {sticker_path.name}")
-                        loaded_count += 1
-                        found = True
-                        break
-            
-            if not found:
+            if key in sticker_paths:
+                print(f"   ✅ '{key.upper()}' -> {sticker_paths[key].name}")
+                loaded_count += 1
+            else:
                 print(f"   ⚠️  '{key.upper()}' -> Nenhum arquivo encontrado ({base_name}.*)")
         
+        # Grava no cache de assets o que precisou ser decodificado
+        self.sticker_manager.asset_cache.flush()
+        
         if loaded_count > 0:
             print(f"✨ Total: {loaded_count} stickers carregados!\n")
         else:
@@ -156,6 +189,14 @@ class InteractiveImageEditor:
         if self.original_image is None:
             print(f"❌ Erro ao carregar imagem: {image_path}")
             return
+        
+        # Pirâmide da imagem (preview na resolução da janela)
+        source_key = (str(Path(image_path).resolve()), Path(image_path).stat().st_mtime_ns)
+        self.pyramid = self.pyramid_cache.get(source_key, self.original_image)
+        preview, self.preview_scale = self.pyramid.preview(*self.preview_size)
+        if self.preview_scale < 1.0:
+            print(f"🔍 Preview em {preview.shape[1]}x{preview.shape[0]} "
+                  f"({self.preview_scale:.0%} do original)")
             
         self.display_instructions()
         
@@ -166,8 +207,8 @@ class InteractiveImageEditor:
         
         # Loop de edição
         while True:
-            # Frame atual
-            frame = self._apply_current_processing(self.original_image.copy())
+            # Frame atual (em resolução de preview)
+            frame = self._apply_current_processing(preview.copy())
             
             # Exibe
             cv2.imshow(window_name, frame)
@@ -193,75 +234,50 @@ class InteractiveImageEditor:
             param: Parâmetros extras
         """
         if event == cv2.EVENT_LBUTTONDOWN:
-            # Salva posição do mouse
-            self.mouse_x = x
-            self.mouse_y = y
-            print(f"🖱️  Click em ({x}, {y})")
+            # Salva posição do mouse (em coordenadas da imagem original)
+            self.mouse_x = int(x / self.preview_scale)
+            self.mouse_y = int(y / self.preview_scale)
+            print(f"🖱️  Click em ({self.mouse_x}, {self.mouse_y})")
+        
+    def _current_recipe(self) -> ProcessingRecipe:
+        """
+        Registra os parâmetros da edição atual.
+        
+        Returns:
+            Receita com filtros ativos e canal selecionado
+        """
+        processors = [
+            self.processors[key]['processor']
+            for key, active in self.active_processors.items()
+            if active
+        ]
+        return ProcessingRecipe(processors=processors, channel=self.selected_channel)
+        
+    def _render_full_resolution(self) -> np.ndarray:
+        """
+        Reaplica a edição atual na imagem em resolução completa.
+        
+        Returns:
+            Imagem final em resolução original
+        """
+        frame = self._current_recipe().render(self.original_image.copy())
+        return self.sticker_manager.apply_stickers(frame)
         
     def _apply_current_processing(self, frame: np.ndarray) -> np.ndarray:
         """
-        Aplica processamento atual no frame.
+        Aplica processamento atual no frame de preview.
         
         Args:
-            frame: Frame original
+            frame: Frame original (na escala do preview)
             
         Returns:
             Frame processado
         """
-        # Se canal selecionado, extrai canal antes de aplicar filtros
-        if self.selected_channel:
-            from infrastructure.image_processing.color_conversion import ChannelSeparator
-            from domain.entities.image import Image
-            temp_image = Image(
-                data=frame,
-                width=frame.shape[1],
-                height=frame.shape[0],
-                channels=frame.shape[2] if len(frame.shape) > 2 else 1,
-                name="temp"
-            )
-            channel_img = ChannelSeparator(channel=self.selected_channel).process(temp_image)
-            frame = channel_img.data
-            # Converte para 3 canais para visualização
-            if len(frame.shape) == 2:
-                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-            # Aplica todos os filtros ativos sequencialmente ao canal
-            for key, active in self.active_processors.items():
-                if active:
-                    processor = self.processors[key]['processor']
-                    temp_image = Image(
-                        data=frame,
-                        width=frame.shape[1],
-                        height=frame.shape[0],
-                        channels=frame.shape[2] if len(frame.shape) > 2 else 1,
-                        name="temp"
-                    )
-                    processed = processor.process(temp_image)
-                    frame = processed.data
-                    if len(frame.shape) == 2:
-                        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-                    elif frame.dtype == np.float64:
-                        frame = np.uint8(np.clip(frame, 0, 255))
-        else:
-            # Modo RGB completo: aplica todos os filtros ativos sequencialmente
-            from domain.entities.image import Image
-            for key, active in self.active_processors.items():
-                if active:
-                    processor = self.processors[key]['processor']
-                    temp_image = Image(
-                        data=frame,
-                        width=frame.shape[1],
-                        height=frame.shape[0],
-                        channels=frame.shape[2] if len(frame.shape) > 2 else 1,
-                        name="temp"
-                    )
-                    processed = processor.process(temp_image)
-                    frame = processed.data
-                    if len(frame.shape) == 2:
-                        frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-                    elif frame.dtype == np.float64:
-                        frame = np.uint8(np.clip(frame, 0, 255))
+        # Aplica canal selecionado e filtros ativos com kernels reescalados
+        frame = self._current_recipe().render(frame, self.preview_scale)
+        
         # Aplica stickers
-        frame = self.sticker_manager.apply_stickers(frame)
+        frame = self.sticker_manager.apply_stickers(frame, self.preview_scale)
         
         # Exibe filtros ativos
         active_names = [self.processors[k]['name'] for k, v in self.active_processors.items() if v]
@@ -284,7 +300,7 @@ class InteractiveImageEditor:
         
         Args:
             key: Código da tecla
-            current_frame: Frame atual para salvar
+            current_frame: Frame atual exibido (preview)
             
         Returns:
             True para continuar, False para sair
@@ -310,9 +326,9 @@ class InteractiveImageEditor:
             print("🧹 Stickers removidos.")
             return True
             
-        # Salvar (Q)
+        # Salvar (Q) - reprocessa em resolução completa
         if key_char == 'q':
-            self._save_frame(current_frame)
+            self._save_frame(self._render_full_resolution())
             return True
             
         # Ativar/desativar filtro
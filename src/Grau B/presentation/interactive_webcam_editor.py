@@ -4,16 +4,26 @@ Editor interativo de vídeo da webcam.
 Permite aplicar filtros em tempo real na webcam.
 """
 
+import threading
+import time
+
 import cv2
 import numpy as np
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple, Union
 from pathlib import Path
 
 from domain.interfaces.image_processor import ImageProcessorInterface
+from infrastructure.cascade_registry import cascade_registry
+from infrastructure.face_analysis import FaceAnalysisService
+from infrastructure.frame_timing import FrameTimer
+from infrastructure.image_processing.compositing import PremultipliedImage
+from infrastructure.image_processing.layer_stack import LayerStack, Tile, circle_tile, text_panel, text_tile
+from infrastructure.io.video_recorder import VideoRecorder
 from infrastructure.io.webcam_capture import WebcamCapture
 from infrastructure.io.sticker_manager import StickerManager
-from infrastructure.io.animated_sticker_overlay import AnimatedStickerOverlay
+from infrastructure.io.animated_sticker_overlay import AnimatedOverlaySettings, AnimatedStickerOverlay
 from infrastructure.io.dog_filter_overlay import DogFilterOverlay
+from infrastructure.stage_pipeline import StagePipeline
 
 
 class InteractiveWebcamEditor:
@@ -23,20 +33,64 @@ class InteractiveWebcamEditor:
     Permite aplicar filtros e stickers na webcam usando teclas de atalho.
     """
     
-    def __init__(self, camera_index: int = 0):
+    # Camadas geradas sob o lock de estado no modo pipeline
+    STATE_LAYERS = ('stickers',)
+    
+    def __init__(self, camera_index: Union[int, str] = 0):
         """
         Inicializa editor de webcam.
         
         Args:
-            camera_index: Índice da câmera (0 para padrão)
+            camera_index: Índice da câmera (0 para padrão) ou caminho de um
+                          arquivo de vídeo
         """
-        self.webcam = WebcamCapture(camera_index)
+        # Câmera lida em uma thread dedicada (sempre o frame mais recente);
+        # arquivos de vídeo são lidos em sequência, sem perder frames
+        self.webcam = WebcamCapture(camera_index, threaded=not isinstance(camera_index, str))
         self.processors: Dict[str, ImageProcessorInterface] = {}
         self.active_processor: Optional[str] = None
         self.sticker_manager = StickerManager()
-        self.animated_overlay = AnimatedStickerOverlay()
-        self.dog_filter = DogFilterOverlay()
+        
+        # Análise facial única por frame (em segundo plano), compartilhada pelos overlays
+        self.face_analysis = FaceAnalysisService(asynchronous=True)
+        self.animated_overlay = AnimatedStickerOverlay(face_detector=self.face_analysis)
+        self.dog_filter = DogFilterOverlay(face_detector=self.face_analysis)
+        
+        # Camadas sobre o frame filtrado, de baixo para cima (uma única escrita por frame)
+        self.layer_stack = LayerStack()
+        self.layer_stack.add_layer("animated_overlay", self._animated_tiles)
+        self.layer_stack.add_layer("dog_filter", self._dog_filter_tiles)
+        self.layer_stack.add_layer("stickers", self.sticker_manager.tiles)
+        
+        # Informações na tela: compostas só no frame exibido, na thread
+        # principal (a gravação e o replay recebem o frame sem elas)
+        self.hud_stack = LayerStack(composite_stage="composicao (hud)")
+        self.hud_stack.add_layer("hud", self._hud_tiles)
+        self.hud_stack.add_layer("timing", self._timing_tiles)
+        
+        # Tempos por estágio (HUD com a tecla P; resumo impresso ao sair)
+        self.timer = FrameTimer()
+        self.layer_stack.timer = self.timer
+        self.hud_stack.timer = self.timer
+        self.face_analysis.timer = self.timer
+        self.show_timing = False
+        self._timing_panel: Optional[PremultipliedImage] = None
+        self._timing_updated = 0.0
+        
+        # Protege o estado alterado pelas teclas (filtro, stickers, overlays)
+        # enquanto os estágios do pipeline leem esse estado em outras threads
+        self._state_lock = threading.RLock()
+        
+        # Parâmetros das camadas faciais lidos sob o lock a cada frame
+        # (escritos e lidos pela thread que compõe o frame)
+        self._animated_settings: Optional[AnimatedOverlaySettings] = None
+        self._dog_filter_enabled: Optional[bool] = None
+        
         self.save_counter = 0
+        
+        # Gravação do vídeo editado (tecla W)
+        self.recorder: Optional[VideoRecorder] = None
+        self.recording_counter = 0
         self.mouse_x = 0
         self.mouse_y = 0
         
@@ -49,6 +103,9 @@ class InteractiveWebcamEditor:
         # Carrega filtro de cachorro
         self._load_dog_filter()
         
+        # Grava no cache de assets o que precisou ser decodificado
+        self.sticker_manager.asset_cache.flush()
+        
     def _load_stickers(self):
         """Carrega stickers da pasta assets/stickers."""
         stickers_dir = Path("assets/stickers")
@@ -72,20 +129,37 @@ class InteractiveWebcamEditor:
         supported_extensions = ['.png', '.jpg', '.jpeg', '.gif', '.bmp']
         
         print(f"\n🎭 Carregando stickers de: {stickers_dir}")
+        
+        # Arquivos existentes de cada sticker, na ordem das extensões
+        candidates = {
+            key: [
+                stickers_dir / f"{base_name}{ext}"
+                for ext in supported_extensions
+                if (stickers_dir / f"{base_name}{ext}").exists()
+            ]
+            for key, base_name in sticker_mapping.items()
+        }
+        
+        # Decodifica em paralelo (ou mapeia do cache de assets); se um
+        # arquivo não puder ser lido, tenta a próxima extensão
+        sticker_paths = {}
+        pending = {key: paths for key, paths in candidates.items() if paths}
+        while pending:
+            loaded = self.sticker_manager.load_stickers({key: str(paths[0]) for key, paths in pending.items()})
+            sticker_paths.update({key: paths[0] for key, paths in pending.items() if loaded.get(key)})
+            pending = {
+                key: paths[1:]
+                for key, paths in pending.items()
+                if not loaded.get(key) and len(paths) > 1
+            }
+        
         loaded_count = 0
         
         for key, base_name in sticker_mapping.items():
-            found = False
-            for ext in supported_extensions:
-                sticker_path = stickers_dir / f"{base_name}{ext}"
-                if sticker_path.exists():
-                    if self.sticker_manager.load_sticker(key, str(sticker_path)):
-                        print(f"   ✅ '{key}' -> {sticker_path.name}")
-                        loaded_count += 1
-                        found = True
-                        break
-            
-            if not found:
+            if key in sticker_paths:
+                print(f"   ✅ '{key}' -> {sticker_paths[key].name}")
+                loaded_count += 1
+            else:
                 print(f"   ⚠️  '{key}' -> Não encontrado ({base_name}.*)")
         
         if loaded_count > 0:
@@ -103,7 +177,8 @@ class InteractiveWebcamEditor:
                 str(spritesheet_path),
                 frame_width=64,
                 frame_height=64,
-                fps=12
+                fps=12,
+                frame_count=12
             )
             
             if success:
@@ -172,14 +247,22 @@ class InteractiveWebcamEditor:
             
         print("\n⚙️  COMANDOS:")
         print("-" * 50)
+        print("  W: Iniciar/Parar gravação do vídeo editado")
+        print("  P: Mostrar/Ocultar tempos por estágio")
         print("  R: Remover filtro ativo")
         print("  C: Limpar todos os stickers")
         print("  Q: Capturar screenshot")
         print("  F: Finalizar (ou ESC)")
         print("=" * 50)
         
-    def start_editing(self):
-        """Inicia edição de vídeo da webcam."""
+    def start_editing(self, pipelined: bool = True):
+        """
+        Inicia edição de vídeo da webcam.
+        
+        Args:
+            pipelined: Se captura, filtro e composição rodam em estágios
+                       paralelos (a exibição fica sempre na thread principal)
+        """
         # Inicia captura
         if not self.webcam.start():
             return
@@ -192,30 +275,114 @@ class InteractiveWebcamEditor:
         cv2.setMouseCallback(window_name, self._mouse_callback)
         
         try:
-            # Loop de captura
-            while True:
-                # Captura frame
-                frame = self.webcam.read_frame()
-                if frame is None:
-                    break
+            if pipelined:
+                self._run_pipelined(window_name)
+            else:
+                # Loop de captura
+                while True:
+                    # Captura frame
+                    with self.timer.measure("captura"):
+                        frame = self.webcam.read_frame()
+                    if frame is None:
+                        break
+                        
+                    # Processa frame
+                    processed_frame = self._apply_current_processing(frame)
                     
-                # Processa frame
-                processed_frame = self._apply_current_processing(frame)
-                
-                # Exibe
-                cv2.imshow(window_name, processed_frame)
-                
-                # Aguarda tecla
-                key = cv2.waitKey(1) & 0xFF
-                
-                # Processa tecla
-                if not self._handle_key(key, processed_frame):
-                    break
+                    # O buffer da câmera não recebe o HUD (é reutilizado)
+                    in_place = processed_frame is not frame
+                    if not self._display_frame(window_name, processed_frame, in_place):
+                        break
                     
         finally:
             # Libera recursos
+            self._stop_recording()
+            self.face_analysis.stop()
             self.webcam.release()
             cv2.destroyAllWindows()
+            self._print_timing_summary()
+    
+    def _run_pipelined(self, window_name: str):
+        """
+        Executa o laço em estágios: captura -> filtro -> composição -> exibição.
+        
+        Cada estágio roda em sua própria thread, ligado ao próximo por uma
+        fila limitada; a exibição (imshow/waitKey) fica na thread principal.
+        
+        Args:
+            window_name: Janela de exibição
+        """
+        pipeline = StagePipeline(
+            source=self._capture_stage,
+            stages=[
+                ("process", self._process_stage),
+                ("overlay", self._overlay_stage),
+            ]
+        )
+        pipeline.start()
+        
+        try:
+            while True:
+                item = pipeline.get()
+                if item is None:
+                    break
+                
+                _, processed_frame = item
+                if not self._display_frame(window_name, processed_frame):
+                    break
+        finally:
+            pipeline.stop()
+    
+    def _display_frame(self, window_name: str, processed_frame: np.ndarray, in_place: bool = True) -> bool:
+        """
+        Grava (se ativo) e exibe o frame com o HUD, e processa a tecla pressionada.
+        
+        Args:
+            window_name: Janela de exibição
+            processed_frame: Frame editado (sem HUD)
+            in_place: Se o HUD pode ser desenhado no próprio frame
+            
+        Returns:
+            True para continuar, False para sair
+        """
+        with self.timer.measure("exibicao"):
+            # Grava o frame editado, sem o HUD (apenas enfileira uma cópia;
+            # a codificação roda em outra thread)
+            self._record(processed_frame, time.perf_counter())
+            
+            # HUD só na imagem exibida; lê o estado das teclas, que é
+            # alterado nesta mesma thread
+            shown_frame = self.hud_stack.render(processed_frame, in_place=in_place)
+            cv2.imshow(window_name, shown_frame)
+            
+            # Aguarda tecla
+            key = cv2.waitKey(1) & 0xFF
+        
+        self.timer.tick()
+        
+        # Nenhuma tecla: não disputa o lock com os estágios do pipeline
+        if key == 255:
+            return True
+        
+        # Processa tecla
+        with self._state_lock:
+            return self._handle_key(key, shown_frame)
+    
+    def _capture_stage(self) -> Optional[np.ndarray]:
+        """Estágio de captura: cópia do frame (o buffer da câmera é reutilizado)."""
+        with self.timer.measure("captura"):
+            frame = self.webcam.read_frame()
+            return frame.copy() if frame is not None else None
+    
+    def _process_stage(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray, bool]:
+        """Estágio de filtro: mantém o frame original para a análise facial."""
+        filtered, in_place = self._filter_frame(frame)
+        return frame, filtered, in_place
+    
+    def _overlay_stage(self, item: Tuple[np.ndarray, np.ndarray, bool]) -> np.ndarray:
+        """Estágio de composição: análise facial e camadas."""
+        frame, filtered, in_place = item
+        return self._compose_frame(frame, filtered, in_place)
             
     def _mouse_callback(self, event, x, y, flags, param):
         """Callback para eventos do mouse."""
@@ -233,86 +400,171 @@ class InteractiveWebcamEditor:
         Returns:
             Frame processado
         """
-        # Aplica filtro ativo
-        if self.active_processor:
-            processor_info = self.processors[self.active_processor]
-            processor = processor_info['processor']
-            
-            # Cria Image entity temporário
-            from domain.entities.image import Image
-            temp_image = Image(
-                data=frame,
-                width=frame.shape[1],
-                height=frame.shape[0],
-                channels=frame.shape[2] if len(frame.shape) > 2 else 1,
-                name="webcam"
-            )
+        filtered, in_place = self._filter_frame(frame)
+        return self._compose_frame(frame, filtered, in_place)
+    
+    def _filter_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, bool]:
+        """
+        Aplica o filtro ativo.
+        
+        Args:
+            frame: Frame original da webcam
             
-            # Processa
+        Returns:
+            Tupla (frame filtrado, se é um buffer novo que pode ser modificado)
+        """
+        with self._state_lock:
+            processor_info = self.processors.get(self.active_processor) if self.active_processor else None
+        
+        # Frame da câmera não é modificado; a saída de um filtro pode ser
+        if processor_info is None:
+            return frame, False
+        
+        processor = processor_info['processor']
+        
+        # Cria Image entity temporário
+        from domain.entities.image import Image
+        temp_image = Image(
+            data=frame,
+            width=frame.shape[1],
+            height=frame.shape[0],
+            channels=frame.shape[2] if len(frame.shape) > 2 else 1,
+            name="webcam"
+        )
+        
+        # Processa
+        with self.timer.measure(f"filtro: {processor_info['name']}"):
             processed = processor.process(temp_image)
-            frame = processed.data
-            
-            # Converte para 3 canais se necessário
-            if len(frame.shape) == 2:
-                frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-            elif frame.dtype == np.float64:
-                frame = np.uint8(np.clip(frame, 0, 255))
+        filtered = processed.data
         
-        # Aplica stickers animados (overlay facial)
-        frame = self.animated_overlay.apply(frame)
+        # Converte para 3 canais se necessário
+        if len(filtered.shape) == 2:
+            filtered = cv2.cvtColor(filtered, cv2.COLOR_GRAY2BGR)
+        elif filtered.dtype == np.float64:
+            filtered = np.uint8(np.clip(filtered, 0, 255))
         
-        # Aplica filtro de cachorro
-        frame = self.dog_filter.apply(frame)
-                
-        # Aplica stickers estáticos
-        frame = self.sticker_manager.apply_stickers(frame)
+        return filtered, not np.shares_memory(filtered, frame)
+    
+    def _compose_frame(self, frame: np.ndarray, filtered: np.ndarray, in_place: bool) -> np.ndarray:
+        """
+        Compõe efeitos faciais e stickers sobre o frame filtrado.
         
-        # Overlay de informações
-        self._draw_overlay(frame)
+        Args:
+            frame: Frame original (usado na análise facial)
+            filtered: Frame filtrado
+            in_place: Se o frame filtrado pode ser modificado
+            
+        Returns:
+            Frame processado
+        """
+        with self._state_lock:
+            # Parâmetros das camadas faciais (estado, escala e frame da
+            # animação), para gerar os tiles fora do lock com valores coerentes
+            self._animated_settings = self.animated_overlay.settings()
+            self._dog_filter_enabled = self.dog_filter.enabled
+            
+            # Camadas que leem o estado alterado pelas teclas (stickers
+            # colocados, filtro ativo, gravação): tiles em cache, baratos
+            snapshot = dict(self.layer_stack.collect(filtered, self.STATE_LAYERS))
+        
+        # Registra o frame original para a análise facial (não bloqueia)
+        if self._animated_settings.enabled or self._dog_filter_enabled:
+            self.face_analysis.begin_frame(frame)
+        
+        # Stickers animados, filtro de cachorro e stickers estáticos:
+        # compostos em uma única passada, fora do lock (a análise facial
+        # e as camadas faciais não seguram a exibição)
+        return self.layer_stack.render(filtered, in_place=in_place, collected=snapshot)
+    
+    def _animated_tiles(self, frame: np.ndarray) -> List[Tile]:
+        """
+        Gera os tiles dos stickers animados com os parâmetros do frame.
         
-        return frame
+        Args:
+            frame: Frame base
+            
+        Returns:
+            Lista de tiles (x, y, imagem) para a LayerStack
+        """
+        return self.animated_overlay.tiles(frame, self._animated_settings)
+    
+    def _dog_filter_tiles(self, frame: np.ndarray) -> List[Tile]:
+        """
+        Gera os tiles do filtro de cachorro com o estado do frame.
+        
+        Args:
+            frame: Frame base
+            
+        Returns:
+            Lista de tiles (x, y, imagem) para a LayerStack
+        """
+        return self.dog_filter.tiles(frame, self._dog_filter_enabled)
         
-    def _draw_overlay(self, frame: np.ndarray):
+    def _hud_tiles(self, frame: np.ndarray) -> List[Tile]:
         """
-        Desenha overlay de informações no frame.
+        Gera os tiles do overlay de informações.
         
         Args:
-            frame: Frame a modificar
+            frame: Frame base
+            
+        Returns:
+            Lista de tiles (x, y, imagem) para a LayerStack
         """
+        tiles = []
+        
         # Filtro ativo
         if self.active_processor:
             filter_name = self.processors[self.active_processor]['name']
-            cv2.putText(
-                frame, 
-                f"Filtro: {filter_name}", 
-                (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (0, 255, 0),
-                2
-            )
+            text, color = f"Filtro: {filter_name}", (0, 255, 0)
         else:
-            cv2.putText(
-                frame, 
-                "Sem filtro", 
-                (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (200, 200, 200),
-                2
-            )
-            
+            text, color = "Sem filtro", (200, 200, 200)
+        
+        tile, (dx, dy) = text_tile(text, color, 0.7, 2)
+        tiles.append((10 - dx, 30 - dy, tile))
+        
         # Indicador de gravação
-        cv2.circle(frame, (frame.shape[1] - 30, 30), 10, (0, 0, 255), -1)
-        cv2.putText(
-            frame,
-            "REC",
-            (frame.shape[1] - 70, 35),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.5,
-            (0, 0, 255),
-            2
-        )
+        if self.recorder is not None:
+            width = frame.shape[1]
+            tiles.append((width - 30 - 10, 30 - 10, circle_tile(10, (0, 0, 255))))
+            
+            tile, (dx, dy) = text_tile("REC", (0, 0, 255), 0.5, 2)
+            tiles.append((width - 70 - dx, 35 - dy, tile))
+        
+        return tiles
+    
+    def _timing_tiles(self, frame: np.ndarray) -> List[Tile]:
+        """
+        Gera o painel de tempos por estágio (tecla P).
+        
+        O painel é refeito duas vezes por segundo, para ficar legível e
+        não custar um rasterizador de texto por frame.
+        
+        Args:
+            frame: Frame base
+            
+        Returns:
+            Lista de tiles (x, y, imagem) para a LayerStack
+        """
+        if not self.show_timing:
+            return []
+        
+        now = time.perf_counter()
+        if self._timing_panel is None or now - self._timing_updated >= 0.5:
+            self._timing_panel = text_panel(self.timer.report_rows())
+            self._timing_updated = now
+        
+        return [(10, 45, self._timing_panel)]
+    
+    def _print_timing_summary(self):
+        """Imprime os tempos por estágio e o carregamento dos cascades."""
+        if self.timer.frames == 0:
+            return
+        
+        print("\n" + self.timer.summary())
+        
+        registry = cascade_registry()
+        for name, seconds in registry.load_times.items():
+            print(f"   cascade '{name}': carregado em {seconds * 1000:.2f}ms")
         
     def _handle_key(self, key: int, current_frame: np.ndarray) -> bool:
         """
@@ -332,6 +584,20 @@ class InteractiveWebcamEditor:
             print("✅ Captura finalizada.")
             return False
             
+        # Iniciar/Parar gravação (W)
+        if key_char == 'w':
+            if self.recorder is None:
+                self._start_recording()
+            else:
+                self._stop_recording()
+            return True
+            
+        # Mostrar/Ocultar tempos por estágio (P)
+        if key_char == 'p':
+            self.show_timing = not self.show_timing
+            self._timing_panel = None
+            return True
+            
         # Remover filtro (R)
         if key_char == 'r':
             self.active_processor = None
@@ -425,3 +691,88 @@ class InteractiveWebcamEditor:
         
         print(f"📸 Screenshot salvo: {output_path}")
         self.save_counter += 1
+    
+    def replay(self, output_path: Optional[str] = None) -> int:
+        """
+        Processa a fonte inteira sem abrir janelas (ex: vídeo de teste).
+        
+        Args:
+            output_path: Vídeo de saída com o resultado (None = não grava)
+            
+        Returns:
+            Número de frames processados
+        """
+        if not self.webcam.start():
+            return 0
+        
+        if output_path is not None:
+            # Nenhum frame pode ser perdido: a leitura espera o codificador
+            self.recorder = VideoRecorder(output_path, fps=self.webcam.fps or 30.0, policy='block')
+        
+        frames = 0
+        
+        try:
+            while True:
+                with self.timer.measure("captura"):
+                    frame = self.webcam.read_frame()
+                if frame is None:
+                    break
+                
+                processed_frame = self._apply_current_processing(frame)
+                
+                self._record(processed_frame)
+                self.timer.tick()
+                frames += 1
+        finally:
+            self._stop_recording()
+            self.face_analysis.stop()
+            self.webcam.release()
+            self._print_timing_summary()
+        
+        print(f"✅ {frames} frames processados.")
+        return frames
+    
+    def _start_recording(self):
+        """Inicia gravação do vídeo editado em assets/images/output/webcam."""
+        output_dir = Path("assets/images/output/webcam")
+        output_path = output_dir / f"gravacao_{self.recording_counter}.mp4"
+        self.recording_counter += 1
+        
+        # Os frames chegam na taxa do laço de exibição (não na nominal da
+        # câmera); os instantes de cada frame corrigem as variações
+        fps = round(self.timer.fps) or self.webcam.fps or 30.0
+        
+        self.recorder = VideoRecorder(str(output_path), fps=fps)
+        print(f"🔴 Gravando: {output_path} ({fps:.0f} fps)")
+    
+    def _record(self, frame: np.ndarray, timestamp: Optional[float] = None):
+        """
+        Enfileira o frame na gravação ativa, se houver.
+        
+        Se o arquivo não pôde ser criado, a gravação é abandonada (uma
+        única vez), em vez de tentar de novo a cada frame.
+        
+        Args:
+            frame: Frame editado
+            timestamp: Instante de exibição (None = frames em sequência)
+        """
+        if self.recorder is None:
+            return
+        
+        if self.recorder.failed:
+            self._stop_recording()
+            return
+        
+        self.recorder.write(frame, timestamp)
+    
+    def _stop_recording(self):
+        """Finaliza a gravação, se houver, gravando os frames pendentes."""
+        if self.recorder is None:
+            return
+        
+        recorder, self.recorder = self.recorder, None
+        recorder.stop()
+        
+        if recorder.frames_written > 0:
+            print(f"⏹️  Gravação salva: {recorder.output_path} ({recorder.frames_written} frames, {recorder.frames_dropped} descartados)")
+
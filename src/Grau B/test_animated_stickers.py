@@ -32,7 +32,8 @@ def test_animated_stickers():
         str(spritesheet_path),
         frame_width=64,
         frame_height=64,
-        fps=12
+        fps=12,
+        frame_count=12  # Apenas a primeira linha da grade 4x12
     )
     
     if not success: